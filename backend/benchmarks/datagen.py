@@ -0,0 +1,336 @@
+"""Deterministic synthetic dataset for benchmarks.
+
+Usage, from backend/:
+
+    python -m benchmarks.datagen sqlite:///bench.db --size medium
+    python -m benchmarks.datagen postgresql://user:pw@localhost/bench --size large
+
+The same size and seed always produce the same rows, with explicit ids, so
+benchmark runs on different machines or databases see identical data.
+"""
+
+import argparse
+import random
+from datetime import date, timedelta
+from typing import Dict, Iterable, Iterator, List, NamedTuple
+
+from sqlalchemy import create_engine, func, insert, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from models.product import Base, ProductDB
+from models.recipe import RecipeDB, RecipeIngredientDB
+from models.weekmenu import WeekMenuDB, MenuDayDB
+from models.daily_food_log import DailyFoodLogDB, DailyFoodEntryDB, MealType
+from models.table_version import TableVersionDB
+from repositories.daily_nutrition_totals_repository import (
+    DailyNutritionTotalsRepository,
+)
+from repositories.recipe_nutrition_repository import RecipeNutritionRepository
+
+CHUNK_SIZE = 5000
+END_DATE = date(2025, 6, 29)  # A Sunday, so week menus run Monday to Sunday
+
+
+class DatasetSize(NamedTuple):
+    products: int
+    recipes: int
+    days: int  # Daily logs, ending at END_DATE
+    weeks: int  # Week menus, ending at END_DATE
+
+
+SIZES: Dict[str, DatasetSize] = {
+    "tiny": DatasetSize(products=200, recipes=40, days=14, weeks=2),
+    "small": DatasetSize(products=2_000, recipes=400, days=90, weeks=12),
+    "medium": DatasetSize(products=10_000, recipes=2_000, days=365, weeks=52),
+    "large": DatasetSize(products=50_000, recipes=10_000, days=5 * 365, weeks=260),
+}
+
+FOODS = [
+    "appel",
+    "banaan",
+    "peer",
+    "aardbei",
+    "blauwe bes",
+    "sinaasappel",
+    "kiwi",
+    "tomaat",
+    "komkommer",
+    "paprika",
+    "ui",
+    "knoflook",
+    "wortel",
+    "broccoli",
+    "spinazie",
+    "boerenkool",
+    "aardappel",
+    "zoete aardappel",
+    "rijst",
+    "pasta",
+    "couscous",
+    "quinoa",
+    "havermout",
+    "volkorenbrood",
+    "wit brood",
+    "bloem",
+    "melk",
+    "karnemelk",
+    "yoghurt",
+    "kwark",
+    "kaas",
+    "roomboter",
+    "ei",
+    "kipfilet",
+    "rundergehakt",
+    "zalm",
+    "tonijn",
+    "tofu",
+    "tempeh",
+    "linzen",
+    "kikkererwten",
+    "zwarte bonen",
+    "pindakaas",
+    "amandelen",
+    "walnoten",
+    "olijfolie",
+    "honing",
+    "suiker",
+    "chocolade",
+    "hummus",
+]
+VARIANTS = [
+    "",
+    "biologisch",
+    "light",
+    "volvet",
+    "halfvol",
+    "gerookt",
+    "gekookt",
+    "ongezouten",
+    "naturel",
+    "bevroren",
+    "uit blik",
+    "gedroogd",
+    "vers",
+]
+BRANDS = ["", "AH", "Jumbo", "Lidl", "Plus", "Campina", "Alpro", "Zonnatura"]
+DISHES = [
+    "stamppot",
+    "ovenschotel",
+    "salade",
+    "soep",
+    "wraps",
+    "curry",
+    "pasta",
+    "risotto",
+    "roerbak",
+    "pannenkoeken",
+    "quiche",
+    "bowl",
+    "tosti",
+    "chili",
+]
+UNITS = ["gram", "gram", "gram", "ml", "stuk"]
+MEAL_TYPES = [meal_type.value for meal_type in MealType]
+
+
+def _chunks(rows: Iterable[Dict], size: int = CHUNK_SIZE) -> Iterator[List[Dict]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def product_rows(size: DatasetSize, seed: int) -> Iterator[Dict]:
+    rng = random.Random(f"{seed}-products")
+    for product_id in range(1, size.products + 1):
+        name = " ".join(
+            part
+            for part in (rng.choice(BRANDS), rng.choice(FOODS), rng.choice(VARIANTS))
+            if part
+        )
+        serving_size = rng.choice([100.0, 100.0, 100.0, 30.0, 250.0])
+        carbohydrates = round(rng.uniform(0, 80), 1)
+        fats = round(rng.uniform(0, 40), 1)
+        proteins = round(rng.uniform(0, 35), 1)
+        yield {
+            "id": product_id,
+            "name": f"{name} {product_id}",
+            "serving_size": serving_size,
+            "serving_unit": "gram",
+            "serving_amount": serving_size,
+            "energy_kcal": round(carbohydrates * 4 + fats * 9 + proteins * 4, 1),
+            "fats": fats,
+            "carbohydrates": carbohydrates,
+            "sugars": round(carbohydrates * rng.uniform(0, 0.6), 1),
+            "fibers": round(rng.uniform(0, 12), 1),
+            "proteins": proteins,
+        }
+
+
+def recipe_rows(size: DatasetSize, seed: int) -> Iterator[Dict]:
+    rng = random.Random(f"{seed}-recipes")
+    for recipe_id in range(1, size.recipes + 1):
+        yield {
+            "id": recipe_id,
+            "name": f"{rng.choice(FOODS)} {rng.choice(DISHES)} {recipe_id}",
+            "servings": rng.choice([1, 2, 2, 4, 4, 6]),
+            "preparation_time": rng.randrange(5, 120, 5),
+            "instructions": "Alles mengen en bereiden.",
+            "image_url": None,
+        }
+
+
+def ingredient_rows(size: DatasetSize, seed: int) -> Iterator[Dict]:
+    rng = random.Random(f"{seed}-ingredients")
+    for recipe_id in range(1, size.recipes + 1):
+        for product_id in rng.sample(range(1, size.products + 1), rng.randint(4, 12)):
+            yield {
+                "recipe_id": recipe_id,
+                "product_id": product_id,
+                "amount": float(rng.randrange(10, 500, 10)),
+                "unit": rng.choice(UNITS),
+            }
+
+
+def week_menu_rows(size: DatasetSize) -> Iterator[Dict]:
+    first_monday = END_DATE - timedelta(days=7 * size.weeks - 1)
+    for week in range(size.weeks):
+        start = first_monday + timedelta(days=7 * week)
+        yield {
+            "id": week + 1,
+            "start_date": start,
+            "end_date": start + timedelta(days=6),
+        }
+
+
+def menu_day_rows(size: DatasetSize, seed: int) -> Iterator[Dict]:
+    rng = random.Random(f"{seed}-menu-days")
+    for menu in week_menu_rows(size):
+        for offset in range(7):
+            yield {
+                "week_menu_id": menu["id"],
+                "date": menu["start_date"] + timedelta(days=offset),
+                "recipe_id": rng.randint(1, size.recipes),
+                "servings": rng.choice([2, 2, 3, 4]),
+                "add_to_shopping_list": rng.random() < 0.9,
+            }
+
+
+def daily_log_rows(size: DatasetSize) -> Iterator[Dict]:
+    first_day = END_DATE - timedelta(days=size.days - 1)
+    for day in range(size.days):
+        yield {"id": day + 1, "date": first_day + timedelta(days=day)}
+
+
+def entry_rows(size: DatasetSize, seed: int) -> Iterator[Dict]:
+    rng = random.Random(f"{seed}-entries")
+    for log in daily_log_rows(size):
+        for _ in range(rng.randint(4, 9)):
+            if rng.random() < 0.3:
+                entry = {
+                    "product_id": None,
+                    "recipe_id": rng.randint(1, size.recipes),
+                    "amount": float(rng.choice([1, 1, 2])),
+                    "unit": "portie",
+                }
+            else:
+                entry = {
+                    "product_id": rng.randint(1, size.products),
+                    "recipe_id": None,
+                    "amount": float(rng.randrange(10, 300, 10)),
+                    "unit": "gram",
+                }
+            yield {
+                "daily_log_id": log["id"],
+                "meal_type": rng.choice(MEAL_TYPES),
+                **entry,
+            }
+
+
+TABLES = [
+    (ProductDB, product_rows),
+    (RecipeDB, recipe_rows),
+    (RecipeIngredientDB, ingredient_rows),
+    (WeekMenuDB, lambda size, seed: week_menu_rows(size)),
+    (MenuDayDB, menu_day_rows),
+    (DailyFoodLogDB, lambda size, seed: daily_log_rows(size)),
+    (DailyFoodEntryDB, entry_rows),
+]
+
+
+def is_empty(engine: Engine) -> bool:
+    with engine.connect() as connection:
+        return not connection.execute(select(func.count(ProductDB.id))).scalar()
+
+
+def reset(engine: Engine) -> None:
+    """Drop and recreate every table of the models"""
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+
+def load(engine: Engine, size: DatasetSize, seed: int = 42) -> Dict[str, int]:
+    """Bulk-load a dataset into empty tables and return the row count per table"""
+    Base.metadata.create_all(engine)
+    if not is_empty(engine):
+        raise ValueError("The database already contains products; use reset first")
+
+    counts = {}
+    with engine.begin() as connection:
+        for model, rows in TABLES:
+            counts[model.__tablename__] = 0
+            for chunk in _chunks(rows(size, seed)):
+                connection.execute(insert(model), chunk)
+                counts[model.__tablename__] += len(chunk)
+        if engine.dialect.name == "postgresql":
+            _reset_sequences(connection)
+
+    with Session(engine) as session:
+        recipe_ids = list(range(1, size.recipes + 1))
+        for start in range(0, len(recipe_ids), 1000):
+            RecipeNutritionRepository(session).refresh(recipe_ids[start : start + 1000])
+        DailyNutritionTotalsRepository(session).rebuild()
+        session.query(TableVersionDB).delete()
+        session.commit()
+    return counts
+
+
+def _reset_sequences(connection) -> None:
+    # Rows were inserted with explicit ids; move the id sequences past them
+    for model, _ in TABLES:
+        table = model.__tablename__
+        connection.execute(
+            text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table}), 0) + 1, false)"
+            )
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("url", help="SQLAlchemy database URL")
+    parser.add_argument("--size", choices=list(SIZES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="drop and recreate all tables first (deletes existing data)",
+    )
+    args = parser.parse_args()
+
+    engine = create_engine(args.url)
+    if args.reset:
+        reset(engine)
+    counts = load(engine, SIZES[args.size], args.seed)
+    for table, count in counts.items():
+        print(f"{table}: {count}")
+
+
+if __name__ == "__main__":
+    main()
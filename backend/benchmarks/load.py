@@ -0,0 +1,481 @@
+"""Load-test the API with concurrent user flows.
+
+Usage, from backend/:
+
+    python -m benchmarks.load --size small --concurrency 1 8 32 --duration 20
+    python -m benchmarks.load --database-url postgresql://... --mix write_heavy
+    python -m benchmarks.load --size small --uvicorn --pool-size 5
+
+Every virtual user is an asyncio task that repeatedly picks a flow from the
+mix (weighted) and runs its requests one after another, like a browser tab
+would. Requests go to main.app through httpx's in-process ASGI transport, or
+with --uvicorn through a real socket served by uvicorn in this process. The
+report has throughput, a latency histogram, percentiles and the error rate
+per route, once for every concurrency level, plus the pool status after the
+run: where throughput stops growing with concurrency either the pool or the
+event loop, which also runs the run_sync repository calls, is saturated.
+
+Without --database-url a temporary SQLite file is loaded with the benchmarks
+dataset of --size. An existing database is used as is, so it has to contain
+data already (see benchmarks.datagen); write flows undo their own changes
+where the API allows it.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+from sqlalchemy import create_engine, distinct, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from benchmarks.datagen import SIZES, load, reset
+from benchmarks.run import ASYNC_DRIVERS, percentile
+from models.daily_food_log import DailyFoodLogDB
+from models.product import ProductDB
+from models.recipe import RecipeDB
+from models.weekmenu import WeekMenuDB
+
+# Upper bounds of the latency histogram buckets in milliseconds
+HISTOGRAM_BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000]
+SEARCH_TERMS = ["kwark", "appel", "kip", "yoghurt", "brood", "kaas", "rijst"]
+MEAL_TYPES = ["ontbijt", "lunch", "diner", "tussendoortje"]
+
+
+class Dataset(NamedTuple):
+    """Ids and dates the flows pick from, read once from the database"""
+
+    product_ids: List[int]
+    recipe_ids: List[int]
+    menus: List[tuple]  # (id, start_date, end_date)
+    log_dates: List[date]
+
+
+class Recorder:
+    """Latency samples and status codes per route template"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route: str, status: int, elapsed: float) -> None:
+        self.samples[route].append(elapsed)
+        self.statuses[route][status] += 1
+        if status == 0 or status >= 400:
+            self.errors[route] += 1
+
+    def report(self, wall_time: float) -> Dict[str, Dict]:
+        routes = {}
+        for route, samples in sorted(self.samples.items()):
+            histogram = [0] * (len(HISTOGRAM_BUCKETS_MS) + 1)
+            for sample in samples:
+                milliseconds = sample * 1000
+                bucket = next(
+                    (
+                        i
+                        for i, bound in enumerate(HISTOGRAM_BUCKETS_MS)
+                        if milliseconds <= bound
+                    ),
+                    len(HISTOGRAM_BUCKETS_MS),
+                )
+                histogram[bucket] += 1
+            routes[route] = {
+                "requests": len(samples),
+                "throughput_rps": round(len(samples) / wall_time, 2),
+                "error_rate": round(self.errors[route] / len(samples), 4),
+                "statuses": dict(self.statuses[route]),
+                "p50_ms": round(percentile(samples, 0.50) * 1000, 2),
+                "p95_ms": round(percentile(samples, 0.95) * 1000, 2),
+                "p99_ms": round(percentile(samples, 0.99) * 1000, 2),
+                "max_ms": round(max(samples) * 1000, 2),
+                "histogram_ms": {
+                    **{
+                        f"<={bound}": count
+                        for bound, count in zip(HISTOGRAM_BUCKETS_MS, histogram)
+                    },
+                    f">{HISTOGRAM_BUCKETS_MS[-1]}": histogram[-1],
+                },
+            }
+        return routes
+
+
+class User:
+    """One virtual user: a client, a seeded random generator and the recorder"""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        dataset: Dataset,
+        recorder: Recorder,
+        rng: random.Random,
+    ):
+        self.client = client
+        self.dataset = dataset
+        self.recorder = recorder
+        self.rng = rng
+
+    async def request(
+        self, method: str, route: str, path: str, **kwargs
+    ) -> Optional[httpx.Response]:
+        """Send one request and record it under its route template"""
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(f"{method} {route}", 0, time.perf_counter() - started)
+            return None
+        self.recorder.record(
+            f"{method} {route}", response.status_code, time.perf_counter() - started
+        )
+        return response if response.is_success else None
+
+
+async def day_overview(user: User) -> None:
+    """Opening DayOverview: product and recipe lists plus the day itself"""
+    day = user.rng.choice(user.dataset.log_dates).isoformat()
+    await user.request("GET", "/api/products/", "/api/products/", params={"limit": 50})
+    await user.request("GET", "/api/recipes/", "/api/recipes/")
+    await user.request("GET", "/api/daily-food/{date}", f"/api/daily-food/{day}")
+    await user.request(
+        "GET", "/api/daily-food/{date}/summary", f"/api/daily-food/{day}/summary"
+    )
+
+
+async def add_entry(user: User) -> None:
+    """Search a product, add it to a day and remove it again"""
+    day = user.rng.choice(user.dataset.log_dates).isoformat()
+    await user.request(
+        "GET",
+        "/api/products/search",
+        "/api/products/search",
+        params={"q": user.rng.choice(SEARCH_TERMS)},
+    )
+    response = await user.request(
+        "POST",
+        "/api/daily-food/{date}/entries",
+        f"/api/daily-food/{day}/entries",
+        json={
+            "product_id": user.rng.choice(user.dataset.product_ids),
+            "amount": float(user.rng.randrange(10, 300, 10)),
+            "unit": "gram",
+            "meal_type": user.rng.choice(MEAL_TYPES),
+        },
+    )
+    await user.request("GET", "/api/daily-food/{date}", f"/api/daily-food/{day}")
+    if response is not None:
+        entry_id = response.json()["id"]
+        await user.request(
+            "DELETE",
+            "/api/daily-food/entries/{id}",
+            f"/api/daily-food/entries/{entry_id}",
+        )
+
+
+async def edit_week_menu(user: User) -> None:
+    """Load a week, swap the recipe of one day and save the days, which
+    writes only the changed day (like WeekMenu.vue)"""
+    menu_id, start_date, end_date = user.rng.choice(user.dataset.menus)
+    response = await user.request(
+        "GET",
+        "/api/weekmenus/by-date",
+        "/api/weekmenus/by-date",
+        params={"start_date": start_date.isoformat(), "end_date": end_date.isoformat()},
+    )
+    await user.request("GET", "/api/recipes/", "/api/recipes/")
+    if response is None or response.status_code != 200:
+        return
+    menu = response.json()
+    days = [
+        {
+            key: day[key]
+            for key in ("date", "recipe_id", "servings", "add_to_shopping_list")
+        }
+        for day in menu["days"]
+    ]
+    if days:
+        user.rng.choice(days)["recipe_id"] = user.rng.choice(user.dataset.recipe_ids)
+    await user.request(
+        "PUT",
+        "/api/weekmenus/{id}/days",
+        f"/api/weekmenus/{menu['id']}/days",
+        json=days,
+    )
+
+
+async def shopping_list(user: User) -> None:
+    """Open a week menu and generate its shopping list"""
+    menu_id = user.rng.choice(user.dataset.menus)[0]
+    await user.request("GET", "/api/weekmenus/{id}", f"/api/weekmenus/{menu_id}")
+    await user.request(
+        "GET", "/api/shopping-list/{id}", f"/api/shopping-list/{menu_id}"
+    )
+
+
+FLOWS: Dict[str, Callable[[User], Awaitable[None]]] = {
+    "day_overview": day_overview,
+    "add_entry": add_entry,
+    "edit_week_menu": edit_week_menu,
+    "shopping_list": shopping_list,
+}
+
+# Relative weights of the flows
+MIXES: Dict[str, Dict[str, int]] = {
+    "default": {
+        "day_overview": 6,
+        "add_entry": 3,
+        "edit_week_menu": 1,
+        "shopping_list": 1,
+    },
+    "read_only": {"day_overview": 4, "shopping_list": 1},
+    "write_heavy": {"day_overview": 2, "add_entry": 6, "edit_week_menu": 3},
+}
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """A named mix, or flow=weight pairs such as "day_overview=3,add_entry=1" """
+    if value in MIXES:
+        return MIXES[value]
+    mix = {}
+    for part in value.split(","):
+        flow, _, weight = part.partition("=")
+        if flow not in FLOWS:
+            raise argparse.ArgumentTypeError(
+                f"Unknown flow {flow!r}; choose from {', '.join(FLOWS)}"
+            )
+        mix[flow] = int(weight or 1)
+    return mix
+
+
+def read_dataset(url: str) -> Dataset:
+    engine = create_engine(url)
+    try:
+        with engine.connect() as connection:
+            dataset = Dataset(
+                product_ids=connection.execute(
+                    select(ProductDB.id).order_by(ProductDB.id).limit(1000)
+                )
+                .scalars()
+                .all(),
+                recipe_ids=connection.execute(
+                    select(RecipeDB.id).order_by(RecipeDB.id).limit(1000)
+                )
+                .scalars()
+                .all(),
+                menus=[
+                    tuple(row)
+                    for row in connection.execute(
+                        select(
+                            WeekMenuDB.id, WeekMenuDB.start_date, WeekMenuDB.end_date
+                        )
+                        .order_by(WeekMenuDB.id)
+                        .limit(200)
+                    )
+                ],
+                log_dates=connection.execute(
+                    select(distinct(DailyFoodLogDB.date))
+                    .order_by(DailyFoodLogDB.date)
+                    .limit(366)
+                )
+                .scalars()
+                .all(),
+            )
+    finally:
+        engine.dispose()
+    if not all(dataset):
+        raise ValueError(
+            "The database needs products, recipes, week menus and daily logs; "
+            "load a dataset with benchmarks.datagen first"
+        )
+    return dataset
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    dataset: Dataset,
+    mix: Dict[str, int],
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> Recorder:
+    """Run `concurrency` users for `duration` seconds"""
+    recorder = Recorder()
+    flows = [FLOWS[name] for name in mix]
+    weights = list(mix.values())
+    deadline = time.perf_counter() + duration
+
+    async def user_loop(number: int) -> None:
+        user = User(client, dataset, recorder, random.Random(f"{seed}-user-{number}"))
+        while time.perf_counter() < deadline:
+            await user.rng.choices(flows, weights)[0](user)
+
+    await asyncio.gather(*(user_loop(number) for number in range(concurrency)))
+    return recorder
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run(args: argparse.Namespace, url: str) -> Dict:
+    from config.database import get_async_db
+    from main import app
+    from repositories.product_repository import (
+        product_nutrition_matrix,
+        product_search_index,
+    )
+
+    dataset = read_dataset(url)
+    async_url = make_url(url).set(
+        drivername=ASYNC_DRIVERS[make_url(url).get_backend_name()]
+    )
+    async_engine = create_async_engine(
+        async_url,
+        pool_size=args.pool_size,
+        max_overflow=args.max_overflow,
+        pool_timeout=args.pool_timeout,
+    )
+    session_factory = async_sessionmaker(async_engine, autoflush=False)
+
+    async def override_get_async_db():
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    product_search_index.clear()
+    product_nutrition_matrix.clear()
+
+    server = server_task = None
+    if args.uvicorn:
+        import uvicorn
+
+        port = _free_port()
+        server = uvicorn.Server(
+            uvicorn.Config(
+                app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"
+            )
+        )
+        server_task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+        client_options = {"base_url": f"http://127.0.0.1:{port}"}
+    else:
+        client_options = {
+            "base_url": "http://load",
+            "transport": httpx.ASGITransport(app=app, raise_app_exceptions=False),
+        }
+
+    levels = {}
+    try:
+        async with httpx.AsyncClient(
+            timeout=args.timeout,
+            limits=httpx.Limits(max_connections=max(args.concurrency)),
+            **client_options,
+        ) as client:
+            # Warm-up, so the first level does not pay for index builds
+            await run_level(client, dataset, args.mix, 1, 1.0, args.seed)
+            for concurrency in args.concurrency:
+                started = time.perf_counter()
+                recorder = await run_level(
+                    client, dataset, args.mix, concurrency, args.duration, args.seed
+                )
+                wall_time = time.perf_counter() - started
+                routes = recorder.report(wall_time)
+                total = sum(route["requests"] for route in routes.values())
+                errors = sum(recorder.errors.values())
+                levels[str(concurrency)] = {
+                    "throughput_rps": round(total / wall_time, 2),
+                    "requests": total,
+                    "error_rate": round(errors / total, 4) if total else 0.0,
+                    "pool": async_engine.pool.status(),
+                    "routes": routes,
+                }
+                print_level(concurrency, levels[str(concurrency)])
+    finally:
+        if server is not None:
+            server.should_exit = True
+            await server_task
+        app.dependency_overrides.pop(get_async_db, None)
+        await async_engine.dispose()
+
+    return {
+        "meta": {
+            "transport": "uvicorn" if args.uvicorn else "asgi",
+            "database": make_url(url).get_backend_name(),
+            "mix": args.mix,
+            "duration_s": args.duration,
+            "pool_size": args.pool_size,
+            "max_overflow": args.max_overflow,
+            "seed": args.seed,
+        },
+        "levels": levels,
+    }
+
+
+def print_level(concurrency: int, level: Dict) -> None:
+    print(
+        f"\nconcurrency {concurrency}: {level['throughput_rps']} req/s, "
+        f"{level['error_rate']:.2%} errors ({level['pool']})"
+    )
+    print(f"  {'route':<42}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'err':>8}")
+    for route, stats in level["routes"].items():
+        print(
+            f"  {route:<42}{stats['throughput_rps']:>9}{stats['p50_ms']:>9}"
+            f"{stats['p95_ms']:>9}{stats['p99_ms']:>9}{stats['error_rate']:>8.2%}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="seconds per level"
+    )
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=MIXES["default"],
+        help=f"{', '.join(MIXES)} or flow=weight pairs ({', '.join(FLOWS)})",
+    )
+    parser.add_argument("--size", choices=list(SIZES), default="small")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", help="use this database as is")
+    parser.add_argument("--uvicorn", action="store_true", help="go through a socket")
+    parser.add_argument("--pool-size", type=int, default=5)
+    parser.add_argument("--max-overflow", type=int, default=10)
+    parser.add_argument("--pool-timeout", type=float, default=30.0)
+    parser.add_argument("--timeout", type=float, default=30.0, help="per request")
+    parser.add_argument("--output", help="write the report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = args.database_url
+        if url is None:
+            url = f"sqlite:///{os.path.join(tmp, args.size)}.db"
+            print(f"Loading {args.size} dataset...", flush=True)
+            engine = create_engine(url)
+            reset(engine)
+            load(engine, SIZES[args.size], args.seed)
+            engine.dispose()
+        report = asyncio.run(run(args, url))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
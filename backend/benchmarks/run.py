@@ -0,0 +1,370 @@
+"""Benchmark the services and routes on synthetic datasets.
+
+Usage, from backend/:
+
+    python -m benchmarks.run --sizes small medium --output results.json
+    python -m benchmarks.run --sizes small --baseline baseline.json
+    python -m benchmarks.run --sizes small --output baseline.json
+
+Every case is timed `--repeat` times after one warm-up call, each call on a
+fresh session. Peak memory comes from one extra call under tracemalloc and
+the statement count from the query stats of that call. Without
+--database-url every size gets its own SQLite file in a temporary directory.
+With --baseline the run exits with status 1 when a case got slower than the
+tolerance allows or runs more statements than before.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from benchmarks.datagen import END_DATE, SIZES, DatasetSize, load, reset
+from repositories.daily_food_repository import DailyFoodRepository
+from repositories.product_repository import (
+    ProductRepository,
+    product_nutrition_matrix,
+    product_search_index,
+)
+from repositories.recipe_repository import RecipeRepository
+from repositories.weekmenu_repository import WeekMenuRepository
+from services.daily_food_service import DailyFoodService
+from services.nutrition_service import NutritionService
+from services.product_service import ProductService
+from services.recipe_service import RecipeService
+from services.shopping_list_service import ShoppingListService
+from services.weekmenu_service import WeekMenuService
+from utils.nutrition_matrix import NutritionMatrix
+from utils.query_stats import instrument, track_queries
+from utils.search_index import SearchIndex
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+class Case(NamedTuple):
+    name: str
+    kind: str  # "service" runs with a sync Session, "route" through the ASGI app
+    target: Callable
+
+
+def service_cases(size: DatasetSize) -> List[Case]:
+    day = END_DATE - timedelta(days=1)
+    month_start = END_DATE - timedelta(days=27)
+    year_start = END_DATE - timedelta(days=min(size.days, 365) - 1)
+    last_menu = size.weeks
+    recipe_ids = list(range(1, min(size.recipes, 100) + 1))
+
+    def products(db: Session) -> ProductService:
+        # Fresh in-memory indexes, so the load cost shows up in the warm-up
+        return ProductService(
+            ProductRepository(db, search_index=index, nutrition_matrix=matrix)
+        )
+
+    index, matrix = SearchIndex(), NutritionMatrix()
+    return [
+        Case(
+            "products.get_products_page",
+            "service",
+            lambda db: products(db).get_products_page(limit=50, sort="name"),
+        ),
+        Case(
+            "products.search_products",
+            "service",
+            lambda db: products(db).search_products("kwark naturel", 10),
+        ),
+        Case(
+            "recipes.get_all_recipes",
+            "service",
+            lambda db: RecipeService(RecipeRepository(db)).get_all_recipes(),
+        ),
+        Case(
+            "recipes.get_recipes_page_summary",
+            "service",
+            lambda db: RecipeService(RecipeRepository(db)).get_recipes_page(
+                50, view="summary"
+            ),
+        ),
+        Case(
+            "recipes.get_recipe_by_id",
+            "service",
+            lambda db: RecipeService(RecipeRepository(db)).get_recipe_by_id(1),
+        ),
+        Case(
+            "nutrition.get_recipes_nutrition",
+            "service",
+            lambda db: NutritionService(
+                RecipeRepository(db),
+                ProductRepository(db, search_index=index, nutrition_matrix=matrix),
+            ).get_recipes_nutrition(recipe_ids),
+        ),
+        Case(
+            "weekmenus.get_all_week_menus",
+            "service",
+            lambda db: WeekMenuService(WeekMenuRepository(db)).get_all_week_menus(),
+        ),
+        Case(
+            "daily_food.get_daily_log",
+            "service",
+            lambda db: DailyFoodService(DailyFoodRepository(db)).get_daily_log(day),
+        ),
+        Case(
+            "daily_food.get_daily_summary",
+            "service",
+            lambda db: DailyFoodService(DailyFoodRepository(db)).get_daily_summary(day),
+        ),
+        Case(
+            "daily_food.get_totals_year_by_week",
+            "service",
+            lambda db: DailyFoodService(DailyFoodRepository(db)).get_totals(
+                year_start, END_DATE, "week"
+            ),
+        ),
+        Case(
+            "shopping_list.generate_shopping_list",
+            "service",
+            lambda db: ShoppingListService(
+                WeekMenuRepository(db), ProductRepository(db)
+            ).generate_shopping_list(last_menu),
+        ),
+        Case(
+            "shopping_list.generate_shopping_list_for_range",
+            "service",
+            lambda db: ShoppingListService(
+                WeekMenuRepository(db), ProductRepository(db)
+            ).generate_shopping_list_for_range(month_start, END_DATE),
+        ),
+    ]
+
+
+def route_cases(size: DatasetSize) -> List[Case]:
+    day = (END_DATE - timedelta(days=1)).isoformat()
+    month_start = (END_DATE - timedelta(days=27)).isoformat()
+    year_start = (END_DATE - timedelta(days=min(size.days, 365) - 1)).isoformat()
+    paths = [
+        "/api/products/?limit=50&sort=name",
+        "/api/products/search?q=kwark",
+        "/api/recipes/?limit=200",
+        "/api/recipes/?limit=200&view=summary",
+        "/api/recipes/1",
+        "/api/weekmenus/",
+        f"/api/weekmenus/?from={month_start}&to={END_DATE}",
+        f"/api/weekmenus/days/{day}",
+        f"/api/weekmenus/{size.weeks}",
+        f"/api/daily-food/{day}",
+        f"/api/daily-food/{day}/summary",
+        f"/api/daily-food/totals?from={month_start}&to={END_DATE}&group=day",
+        f"/api/daily-food/totals?from={year_start}&to={END_DATE}&group=month",
+        f"/api/shopping-list/{size.weeks}",
+    ]
+    return [Case(f"GET {path}", "route", path) for path in paths]
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def summarize(samples: List[float], peak_bytes: int, statements: int) -> Dict:
+    return {
+        "runs": len(samples),
+        "mean_ms": round(statistics.fmean(samples) * 1000, 3),
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 3),
+        "peak_memory_kb": round(peak_bytes / 1024, 1),
+        "statements": statements,
+    }
+
+
+class Runner:
+    """Runs the cases of one dataset against one database"""
+
+    def __init__(self, url: str, repeat: int):
+        self.url = url
+        self.repeat = repeat
+        self.engine: Engine = create_engine(url)
+        self.session_factory = sessionmaker(bind=self.engine, autoflush=False)
+        async_url = make_url(url).set(
+            drivername=ASYNC_DRIVERS[make_url(url).get_backend_name()]
+        )
+        self.async_engine = create_async_engine(async_url)
+        instrument(self.engine)
+        instrument(self.async_engine.sync_engine)
+
+    def run_service(self, case: Case) -> Dict:
+        def call():
+            with self.session_factory() as db:
+                case.target(db)
+
+        call()  # Warm-up: caches, in-memory indexes, connection pool
+        samples = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            call()
+            samples.append(time.perf_counter() - started)
+
+        with track_queries() as stats:
+            tracemalloc.start()
+            call()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        return summarize(samples, peak, stats.statements)
+
+    async def run_route(self, client, case: Case) -> Dict:
+        async def call():
+            response = await client.get(case.target)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{case.name}: HTTP {response.status_code}")
+
+        await call()
+        samples = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            await call()
+            samples.append(time.perf_counter() - started)
+
+        with track_queries() as stats:
+            tracemalloc.start()
+            await call()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        return summarize(samples, peak, stats.statements)
+
+    async def run_routes(self, cases: List[Case]) -> Dict[str, Dict]:
+        import httpx
+        from config.database import get_async_db
+        from main import app
+
+        session_factory = async_sessionmaker(self.async_engine, autoflush=False)
+
+        async def override_get_async_db():
+            async with session_factory() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = override_get_async_db
+        # The module-level indexes may hold another dataset
+        product_search_index.clear()
+        product_nutrition_matrix.clear()
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(
+                transport=transport, base_url="http://bench"
+            ) as client:
+                return {case.name: await self.run_route(client, case) for case in cases}
+        finally:
+            app.dependency_overrides.pop(get_async_db, None)
+
+    def run(self, size: DatasetSize) -> Dict[str, Dict]:
+        results = {}
+        for case in service_cases(size):
+            results[case.name] = self.run_service(case)
+            print(f"  {case.name}: {results[case.name]['p50_ms']} ms", flush=True)
+        route_results = asyncio.run(self.run_routes(route_cases(size)))
+        for name, result in route_results.items():
+            print(f"  {name}: {result['p50_ms']} ms", flush=True)
+        results.update(route_results)
+        return results
+
+    def close(self) -> None:
+        self.engine.dispose()
+        asyncio.run(self.async_engine.dispose())
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Regressions of results against a baseline with the same layout.
+
+    A case regresses when its p50 grew by more than `tolerance` (a fraction)
+    or when it runs more statements. Cases missing from either side are
+    ignored.
+    """
+    regressions = []
+    for size, cases in results.get("sizes", {}).items():
+        baseline_cases = baseline.get("sizes", {}).get(size, {})
+        for name, result in cases.items():
+            before = baseline_cases.get(name)
+            if not before:
+                continue
+            if result["p50_ms"] > before["p50_ms"] * (1 + tolerance):
+                regressions.append(
+                    f"{size} {name}: p50 {before['p50_ms']} -> {result['p50_ms']} ms"
+                )
+            if result["statements"] > before["statements"]:
+                regressions.append(
+                    f"{size} {name}: statements "
+                    f"{before['statements']} -> {result['statements']}"
+                )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small"])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--database-url",
+        help="benchmark this database instead of temporary SQLite files; "
+        "its tables are dropped and reloaded for every size",
+    )
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "database": (
+                make_url(args.database_url).get_backend_name()
+                if args.database_url
+                else "sqlite"
+            ),
+        },
+        "sizes": {},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for size_name in args.sizes:
+            url = args.database_url or f"sqlite:///{os.path.join(tmp, size_name)}.db"
+            print(f"Loading {size_name} dataset...", flush=True)
+            engine = create_engine(url)
+            reset(engine)
+            load(engine, SIZES[size_name], args.seed)
+            engine.dispose()
+
+            runner = Runner(url, args.repeat)
+            try:
+                results["sizes"][size_name] = runner.run(SIZES[size_name])
+            finally:
+                runner.close()
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""Rebuild the daily_nutrition_totals rollup from the daily food entries.
+
+Usage, from backend/:
+
+    python -m commands.rebuild_nutrition_totals
+    python -m commands.rebuild_nutrition_totals --from 2024-01-01 --to 2024-12-31
+    python -m commands.rebuild_nutrition_totals --database-url sqlite:///bench.db
+
+Entry changes keep the rollup current and product or recipe changes through
+the API rebuild the dates they affect. Run this after changing products,
+recipes or entries outside the API, e.g. with SQL or a restore.
+"""
+
+import argparse
+import sys
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session
+
+from models.daily_nutrition_total import DailyNutritionTotalDB
+from repositories.daily_nutrition_totals_repository import (
+    DailyNutritionTotalsRepository,
+)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat)
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat)
+    parser.add_argument(
+        "--database-url", help="defaults to the database configured in .env"
+    )
+    args = parser.parse_args(argv)
+
+    if args.database_url:
+        engine = create_engine(args.database_url)
+    else:
+        from config.database import engine
+
+    with Session(engine) as db:
+        DailyNutritionTotalsRepository(db).rebuild(args.date_from, args.date_to)
+        db.commit()
+        rows = db.scalar(select(func.count()).select_from(DailyNutritionTotalDB))
+    print(f"daily_nutrition_totals: {rows} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
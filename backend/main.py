@@ -1,24 +1,40 @@
-from fastapi import FastAPI
+import asyncio
+import contextlib
+import logging
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from routes.product_routes import router as product_router
 from routes.recipe_routes import router as recipe_router
 from routes.weekmenu_routes import router as weekmenu_router
 from routes.shopping_list_routes import router as shopping_list_router
 from routes.daily_food_routes import router as daily_food_router
-from models.product import Base as ProductBase
-from models.recipe import Base as RecipeBase
-from models.weekmenu import Base as WeekMenuBase
-from models.daily_food_log import Base as DailyFoodBase
-from config.database import engine
-from fastapi.staticfiles import StaticFiles
+from routes.export_routes import router as export_router
+from routes.event_routes import router as event_router
+from config.database import DATABASE_URL, async_engine, engine
+from config.settings import settings
+from utils.change_feed import change_broker, close_on_exit_signals, listen
+from utils.query_stats import instrument, track_queries
 
-# Create tables
-ProductBase.metadata.create_all(bind=engine)
-RecipeBase.metadata.create_all(bind=engine)
-WeekMenuBase.metadata.create_all(bind=engine)
-DailyFoodBase.metadata.create_all(bind=engine)
+# The schema is managed with Alembic: run `alembic upgrade head` from backend/
+# before starting the API.
 
-app = FastAPI(title="Nutrition App API", version="1.0.0")
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Changes committed by any worker arrive through LISTEN and are fanned
+    # out to this worker's event streams, which end once the server is told
+    # to stop so that it does not wait for them
+    listener = asyncio.create_task(listen(change_broker, DATABASE_URL))
+    try:
+        with close_on_exit_signals(change_broker):
+            yield
+    finally:
+        listener.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await listener
+
+
+app = FastAPI(title="Nutrition App API", version="1.0.0", lifespan=lifespan)
 
 # CORS middleware for Vue frontend
 app.add_middleware(
@@ -27,9 +43,30 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Last-Modified"],
 )
 
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+# Debug mode: report statements, rows and DB time per request as headers and
+# log statement shapes that repeat within a request (likely N+1 lazy loads)
+if settings.DEBUG:
+    instrument(engine)
+    instrument(async_engine.sync_engine)
+
+    @app.middleware("http")
+    async def add_query_stats(request: Request, call_next):
+        with track_queries() as stats:
+            response = await call_next(request)
+        response.headers.update(stats.headers())
+        for shape, count in stats.repeated():
+            logging.getLogger(__name__).warning(
+                "N+1 suspect on %s %s: %dx %s",
+                request.method,
+                request.url.path,
+                count,
+                shape,
+            )
+        return response
+
 
 # Include routers
 app.include_router(product_router)
@@ -37,6 +74,8 @@ app.include_router(recipe_router)
 app.include_router(weekmenu_router)
 app.include_router(shopping_list_router)
 app.include_router(daily_food_router)
+app.include_router(export_router)
+app.include_router(event_router)
 
 
 @app.get("/")
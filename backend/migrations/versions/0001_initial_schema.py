@@ -0,0 +1,143 @@
+"""Initial schema, as previously created by metadata.create_all
+
+Revision ID: 0001
+Revises:
+Create Date: 2025-09-01 00:00:00
+
+Databases that were created by the old create_all call in main.py already
+have these tables; they are left alone so `alembic upgrade head` can be run
+on them directly.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _has_table(name: str) -> bool:
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade() -> None:
+    if not _has_table("products"):
+        op.create_table(
+            "products",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("serving_size", sa.Float(), nullable=False),
+            sa.Column("serving_unit", sa.String(), nullable=True),
+            sa.Column("serving_amount", sa.Float(), nullable=True),
+            sa.Column("energy_kcal", sa.Float(), nullable=False),
+            sa.Column("fats", sa.Float(), nullable=False),
+            sa.Column("carbohydrates", sa.Float(), nullable=False),
+            sa.Column("sugars", sa.Float(), nullable=False),
+            sa.Column("fibers", sa.Float(), nullable=False),
+            sa.Column("proteins", sa.Float(), nullable=False),
+        )
+        op.create_index("ix_products_id", "products", ["id"])
+        op.create_index("ix_products_name", "products", ["name"])
+
+    if not _has_table("recipes"):
+        op.create_table(
+            "recipes",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(), nullable=False),
+            sa.Column("servings", sa.Integer(), nullable=False),
+            sa.Column("preparation_time", sa.Integer(), nullable=False),
+            sa.Column("instructions", sa.Text(), nullable=False),
+            sa.Column("image_url", sa.String(), nullable=True),
+        )
+        op.create_index("ix_recipes_id", "recipes", ["id"])
+        op.create_index("ix_recipes_name", "recipes", ["name"])
+
+    if not _has_table("recipe_ingredients"):
+        op.create_table(
+            "recipe_ingredients",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column(
+                "recipe_id", sa.Integer(), sa.ForeignKey("recipes.id"), nullable=False
+            ),
+            sa.Column(
+                "product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=False
+            ),
+            sa.Column("amount", sa.Float(), nullable=False),
+            sa.Column("unit", sa.String(), nullable=False),
+        )
+        op.create_index("ix_recipe_ingredients_id", "recipe_ingredients", ["id"])
+
+    if not _has_table("week_menus"):
+        op.create_table(
+            "week_menus",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("start_date", sa.Date(), nullable=False),
+            sa.Column("end_date", sa.Date(), nullable=False),
+        )
+        op.create_index("ix_week_menus_id", "week_menus", ["id"])
+        op.create_index("ix_week_menus_start_date", "week_menus", ["start_date"])
+        op.create_index("ix_week_menus_end_date", "week_menus", ["end_date"])
+
+    if not _has_table("menu_days"):
+        op.create_table(
+            "menu_days",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column(
+                "week_menu_id",
+                sa.Integer(),
+                sa.ForeignKey("week_menus.id"),
+                nullable=False,
+            ),
+            sa.Column("date", sa.Date(), nullable=False),
+            sa.Column(
+                "recipe_id", sa.Integer(), sa.ForeignKey("recipes.id"), nullable=True
+            ),
+            sa.Column("servings", sa.Integer(), nullable=False),
+            sa.Column("add_to_shopping_list", sa.Boolean(), nullable=False),
+        )
+        op.create_index("ix_menu_days_id", "menu_days", ["id"])
+
+    if not _has_table("daily_food_logs"):
+        op.create_table(
+            "daily_food_logs",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("date", sa.Date(), nullable=False),
+        )
+        op.create_index("ix_daily_food_logs_id", "daily_food_logs", ["id"])
+        op.create_index("ix_daily_food_logs_date", "daily_food_logs", ["date"])
+
+    if not _has_table("daily_food_entries"):
+        op.create_table(
+            "daily_food_entries",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column(
+                "daily_log_id",
+                sa.Integer(),
+                sa.ForeignKey("daily_food_logs.id"),
+                nullable=False,
+            ),
+            sa.Column(
+                "product_id", sa.Integer(), sa.ForeignKey("products.id"), nullable=True
+            ),
+            sa.Column(
+                "recipe_id", sa.Integer(), sa.ForeignKey("recipes.id"), nullable=True
+            ),
+            sa.Column("amount", sa.Float(), nullable=False),
+            sa.Column("unit", sa.String(), nullable=False),
+            sa.Column("meal_type", sa.String(20), nullable=False),
+        )
+        op.create_index("ix_daily_food_entries_id", "daily_food_entries", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_table("daily_food_entries")
+    op.drop_table("daily_food_logs")
+    op.drop_table("menu_days")
+    op.drop_table("week_menus")
+    op.drop_table("recipe_ingredients")
+    op.drop_table("recipes")
+    op.drop_table("products")
@@ -0,0 +1,77 @@
+"""Index foreign keys and filter columns, make daily_food_logs.date unique
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2025-09-01 00:00:01
+
+Before the unique index is created, duplicate daily logs for the same date
+are merged into the oldest one so no entries are lost.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_recipe_ingredients_recipe_id", "recipe_ingredients", ["recipe_id"]),
+    ("ix_recipe_ingredients_product_id", "recipe_ingredients", ["product_id"]),
+    ("ix_daily_food_entries_daily_log_id", "daily_food_entries", ["daily_log_id"]),
+    ("ix_daily_food_entries_product_id", "daily_food_entries", ["product_id"]),
+    ("ix_daily_food_entries_recipe_id", "daily_food_entries", ["recipe_id"]),
+    ("ix_menu_days_week_menu_id", "menu_days", ["week_menu_id"]),
+    ("ix_menu_days_date", "menu_days", ["date"]),
+    ("ix_products_energy_kcal", "products", ["energy_kcal"]),
+    ("ix_products_proteins", "products", ["proteins"]),
+    ("ix_products_carbohydrates", "products", ["carbohydrates"]),
+    ("ix_products_fats", "products", ["fats"]),
+    ("ix_products_fibers", "products", ["fibers"]),
+]
+
+
+def _index_names(table: str) -> set:
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        if name not in _index_names(table):
+            op.create_index(name, table, columns)
+
+    if "ix_products_name_lower" not in _index_names("products"):
+        op.create_index("ix_products_name_lower", "products", [sa.text("lower(name)")])
+
+    # Merge duplicate logs per date into the one with the lowest id
+    op.execute("""
+        UPDATE daily_food_entries
+        SET daily_log_id = (
+            SELECT MIN(keep.id) FROM daily_food_logs keep
+            WHERE keep.date = (
+                SELECT dup.date FROM daily_food_logs dup
+                WHERE dup.id = daily_food_entries.daily_log_id
+            )
+        )
+        WHERE daily_log_id NOT IN (
+            SELECT MIN(id) FROM daily_food_logs GROUP BY date
+        )
+        """)
+    op.execute("""
+        DELETE FROM daily_food_logs
+        WHERE id NOT IN (SELECT MIN(id) FROM daily_food_logs GROUP BY date)
+        """)
+    if "ix_daily_food_logs_date" in _index_names("daily_food_logs"):
+        op.drop_index("ix_daily_food_logs_date", table_name="daily_food_logs")
+    op.create_index("ix_daily_food_logs_date", "daily_food_logs", ["date"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_daily_food_logs_date", table_name="daily_food_logs")
+    op.create_index("ix_daily_food_logs_date", "daily_food_logs", ["date"])
+    op.drop_index("ix_products_name_lower", table_name="products")
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,49 @@
+"""Add the recipe_nutrition cache table
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2025-09-08 00:00:00
+
+The table holds the per-serving nutrition of every recipe and is filled for
+existing recipes in the same migration.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NUTRIENTS = ["energy_kcal", "fats", "carbohydrates", "sugars", "fibers", "proteins"]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "recipe_nutrition",
+        sa.Column(
+            "recipe_id", sa.Integer(), sa.ForeignKey("recipes.id"), primary_key=True
+        ),
+        *[sa.Column(nutrient, sa.Float(), nullable=False) for nutrient in NUTRIENTS],
+    )
+
+    per_serving = ", ".join(
+        f"COALESCE(SUM(p.{n} * ri.amount / p.serving_size), 0.0) / r.servings"
+        for n in NUTRIENTS
+    )
+    columns = ", ".join(NUTRIENTS)
+    op.execute(f"""
+        INSERT INTO recipe_nutrition (recipe_id, {columns})
+        SELECT r.id, {per_serving}
+        FROM recipes r
+        LEFT JOIN recipe_ingredients ri ON ri.recipe_id = r.id
+        LEFT JOIN products p ON p.id = ri.product_id
+        GROUP BY r.id, r.servings
+        """)
+
+
+def downgrade() -> None:
+    op.drop_table("recipe_nutrition")
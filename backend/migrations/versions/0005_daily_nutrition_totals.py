@@ -0,0 +1,52 @@
+"""Add the daily_nutrition_totals rollup table
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2025-10-06 00:00:00
+
+One row per date and meal type with the entry count and summed nutrients,
+filled from the existing entries in the same migration.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NUTRIENTS = ["energy_kcal", "fats", "carbohydrates", "sugars", "fibers", "proteins"]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "daily_nutrition_totals",
+        sa.Column("date", sa.Date(), primary_key=True),
+        sa.Column("meal_type", sa.String(20), primary_key=True),
+        sa.Column("entries", sa.Integer(), nullable=False),
+        *[sa.Column(nutrient, sa.Float(), nullable=False) for nutrient in NUTRIENTS],
+    )
+
+    sums = ", ".join(
+        f"COALESCE(SUM(CASE WHEN e.product_id IS NOT NULL "
+        f"THEN COALESCE(p.{n}, 0.0) * e.amount / p.serving_size "
+        f"ELSE COALESCE(rn.{n}, 0.0) * e.amount END), 0.0)"
+        for n in NUTRIENTS
+    )
+    columns = ", ".join(NUTRIENTS)
+    op.execute(f"""
+        INSERT INTO daily_nutrition_totals (date, meal_type, entries, {columns})
+        SELECT l.date, e.meal_type, COUNT(e.id), {sums}
+        FROM daily_food_entries e
+        JOIN daily_food_logs l ON l.id = e.daily_log_id
+        LEFT JOIN products p ON p.id = e.product_id
+        LEFT JOIN recipe_nutrition rn ON rn.recipe_id = e.recipe_id
+        GROUP BY l.date, e.meal_type
+        """)
+
+
+def downgrade() -> None:
+    op.drop_table("daily_nutrition_totals")
@@ -2,11 +2,12 @@
 from sqlalchemy import Column, Integer, String, Float, Date, ForeignKey, Enum
 from sqlalchemy.orm import relationship
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import date
 from models.product import Base
 from models.product import ProductDB
 from models.recipe import RecipeDB
+from models.nutrition import NutritionValues
 
 import enum
 
@@ -22,7 +23,7 @@ class DailyFoodLogDB(Base):
     __tablename__ = "daily_food_logs"
 
     id = Column(Integer, primary_key=True, index=True)
-    date = Column(Date, nullable=False, index=True)
+    date = Column(Date, nullable=False, unique=True, index=True)
 
     # Relationships
     entries = relationship(
@@ -34,11 +35,13 @@ class DailyFoodEntryDB(Base):
     __tablename__ = "daily_food_entries"
 
     id = Column(Integer, primary_key=True, index=True)
-    daily_log_id = Column(Integer, ForeignKey("daily_food_logs.id"), nullable=False)
+    daily_log_id = Column(
+        Integer, ForeignKey("daily_food_logs.id"), nullable=False, index=True
+    )
 
     # Either product or recipe (not both)
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=True)
-    recipe_id = Column(Integer, ForeignKey("recipes.id"), nullable=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=True, index=True)
+    recipe_id = Column(Integer, ForeignKey("recipes.id"), nullable=True, index=True)
 
     amount = Column(Float, nullable=False)
     unit = Column(String, nullable=False, default="gram")
@@ -65,6 +68,10 @@ class DailyFoodEntryCreate(DailyFoodEntryBase):
     pass
 
 
+class DailyFoodEntryBatch(BaseModel):
+    entries: List[DailyFoodEntryCreate] = Field(..., min_length=1, max_length=100)
+
+
 class DailyFoodEntryResponse(DailyFoodEntryBase):
     id: int
     product: Optional[dict] = None
@@ -88,3 +95,38 @@ class DailyFoodLogResponse(DailyFoodLogBase):
 
     class Config:
         from_attributes = True
+
+
+class DailyFoodEntrySummary(BaseModel):
+    id: int
+    product_id: Optional[int] = None
+    recipe_id: Optional[int] = None
+    name: Optional[str] = None
+    amount: float
+    unit: str
+    meal_type: str
+    nutrition: NutritionValues
+
+
+class DailyFoodRangeEntry(DailyFoodEntrySummary):
+    date: date
+
+
+class DailyFoodSummaryResponse(DailyFoodLogBase):
+    entries: List[DailyFoodEntrySummary] = []
+    meal_types: Dict[str, NutritionValues] = {}
+    total: NutritionValues
+
+
+class DailyFoodTotalsGroup(BaseModel):
+    key: str  # ISO date of the day, week (Monday) or month (1st), else the meal type
+    entries: int
+    nutrition: NutritionValues
+
+
+class DailyFoodTotalsResponse(BaseModel):
+    date_from: date
+    date_to: date
+    group: str
+    groups: List[DailyFoodTotalsGroup] = []
+    total: NutritionValues
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Date, Float, Integer, String
+from models.product import Base
+
+
+class DailyNutritionTotalDB(Base):
+    """Summed nutrients of the daily food entries per date and meal type.
+
+    Maintained by DailyNutritionTotalsRepository: entry changes apply deltas
+    in their own transaction, product and recipe changes rebuild the dates
+    they affect.
+    """
+
+    __tablename__ = "daily_nutrition_totals"
+
+    date = Column(Date, primary_key=True)
+    meal_type = Column(String(20), primary_key=True)
+    entries = Column(Integer, nullable=False, default=0)
+    energy_kcal = Column(Float, nullable=False, default=0.0)
+    fats = Column(Float, nullable=False, default=0.0)
+    carbohydrates = Column(Float, nullable=False, default=0.0)
+    sugars = Column(Float, nullable=False, default=0.0)
+    fibers = Column(Float, nullable=False, default=0.0)
+    proteins = Column(Float, nullable=False, default=0.0)
@@ -0,0 +1,21 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from models.recipe import NutritionValues, RecipeIngredientCreate
+
+
+# Pydantic schemas
+class RecipeNutritionResponse(BaseModel):
+    recipe_id: Optional[int] = None  # None for unsaved drafts
+    servings: int
+    total: NutritionValues
+    per_serving: NutritionValues
+
+
+class RecipeNutritionDraft(BaseModel):
+    servings: int = Field(..., gt=0)
+    ingredients: List[RecipeIngredientCreate] = []
+
+
+class RecipeNutritionRequest(BaseModel):
+    recipe_ids: List[int] = []
+    drafts: List[RecipeNutritionDraft] = []
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, Integer, String, Float, Index, func
 from sqlalchemy.ext.declarative import declarative_base
 from pydantic import BaseModel, Field
+from typing import List, Optional
 
 Base = declarative_base()
 
@@ -15,12 +16,17 @@ class ProductDB(Base):
     )  # in grams (backend storage)
     serving_unit = Column(String, nullable=True, default="gram")  # display unit
     serving_amount = Column(Float, nullable=True, default=100.0)  # display amount
-    energy_kcal = Column(Float, nullable=False)
-    fats = Column(Float, nullable=False)
-    carbohydrates = Column(Float, nullable=False)
+    energy_kcal = Column(Float, nullable=False, index=True)
+    fats = Column(Float, nullable=False, index=True)
+    carbohydrates = Column(Float, nullable=False, index=True)
     sugars = Column(Float, nullable=False)
-    fibers = Column(Float, nullable=False)
-    proteins = Column(Float, nullable=False)
+    fibers = Column(Float, nullable=False, index=True)
+    proteins = Column(Float, nullable=False, index=True)
+
+    __table_args__ = (
+        # Supports the case-insensitive name prefix filter of the product listing
+        Index("ix_products_name_lower", func.lower(name)),
+    )
 
 
 # Pydantic schemas
@@ -48,3 +54,45 @@ class ProductResponse(ProductBase):
 
     class Config:
         from_attributes = True
+
+
+class ProductBatchUpdate(ProductBase):
+    id: int
+
+
+class ProductBatchItemResult(BaseModel):
+    index: int
+    id: Optional[int] = None
+    status: str  # created, updated or not_found
+
+
+class ProductBatchResponse(BaseModel):
+    results: List[ProductBatchItemResult] = []
+    rows: int
+    elapsed_ms: float
+    rows_per_second: float
+
+
+class ProductPage(BaseModel):
+    items: List[ProductResponse] = []
+    next_cursor: Optional[str] = None
+
+
+class ProductSearchResult(BaseModel):
+    id: int
+    name: str
+    score: float
+
+
+class ProductFilter(BaseModel):
+    name_prefix: Optional[str] = Field(default=None, max_length=200)
+    min_energy_kcal: Optional[float] = None
+    max_energy_kcal: Optional[float] = None
+    min_proteins: Optional[float] = None
+    max_proteins: Optional[float] = None
+    min_carbohydrates: Optional[float] = None
+    max_carbohydrates: Optional[float] = None
+    min_fats: Optional[float] = None
+    max_fats: Optional[float] = None
+    min_fibers: Optional[float] = None
+    max_fibers: Optional[float] = None
@@ -1,7 +1,7 @@
 from sqlalchemy import Column, Integer, String, Float, Text, ForeignKey
 from sqlalchemy.orm import relationship
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, Literal, Optional
 from models.product import Base
 from models.product import ProductDB
 
@@ -20,14 +20,18 @@ class RecipeDB(Base):
     ingredients = relationship(
         "RecipeIngredientDB", back_populates="recipe", cascade="all, delete-orphan"
     )
+    # Cached per-serving nutrition, maintained by RecipeNutritionRepository
+    nutrition = relationship(
+        "RecipeNutritionDB", uselist=False, cascade="all, delete-orphan"
+    )
 
 
 class RecipeIngredientDB(Base):
     __tablename__ = "recipe_ingredients"
 
     id = Column(Integer, primary_key=True, index=True)
-    recipe_id = Column(Integer, ForeignKey("recipes.id"), nullable=False)
-    product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
+    recipe_id = Column(Integer, ForeignKey("recipes.id"), nullable=False, index=True)
+    product_id = Column(Integer, ForeignKey("products.id"), nullable=False, index=True)
     amount = Column(Float, nullable=False)
     unit = Column(String, nullable=False, default="gram")  # gram, stuk, lepel, etc.
 
@@ -36,7 +40,29 @@ class RecipeIngredientDB(Base):
     product = relationship("ProductDB")
 
 
+class RecipeNutritionDB(Base):
+    __tablename__ = "recipe_nutrition"
+
+    recipe_id = Column(Integer, ForeignKey("recipes.id"), primary_key=True)
+    # Per serving
+    energy_kcal = Column(Float, nullable=False, default=0.0)
+    fats = Column(Float, nullable=False, default=0.0)
+    carbohydrates = Column(Float, nullable=False, default=0.0)
+    sugars = Column(Float, nullable=False, default=0.0)
+    fibers = Column(Float, nullable=False, default=0.0)
+    proteins = Column(Float, nullable=False, default=0.0)
+
+
 # Pydantic schemas
+class NutritionValues(BaseModel):
+    energy_kcal: float = 0.0
+    fats: float = 0.0
+    carbohydrates: float = 0.0
+    sugars: float = 0.0
+    fibers: float = 0.0
+    proteins: float = 0.0
+
+
 class RecipeIngredientBase(BaseModel):
     product_id: int
     amount: float = Field(..., gt=0)
@@ -67,9 +93,60 @@ class RecipeCreate(RecipeBase):
     ingredients: List[RecipeIngredientCreate] = []
 
 
+class RecipeIngredientOperation(BaseModel):
+    """Change to a single ingredient line; update and remove need the line id"""
+
+    op: Literal["add", "update", "remove"]
+    id: Optional[int] = None
+    product_id: Optional[int] = None
+    amount: Optional[float] = Field(None, gt=0)
+    unit: Optional[str] = Field(None, min_length=1, max_length=50)
+
+
+class RecipePatch(BaseModel):
+    """Partial recipe update: only the fields that are sent are changed.
+
+    ingredients replaces the whole list (reconciled like a PUT), while
+    ingredient_operations change single lines.
+    """
+
+    name: Optional[str] = Field(None, min_length=1, max_length=200)
+    servings: Optional[int] = Field(None, gt=0)
+    preparation_time: Optional[int] = Field(None, gt=0)
+    instructions: Optional[str] = Field(None, min_length=1)
+    image_url: Optional[str] = None
+    ingredients: Optional[List[RecipeIngredientCreate]] = None
+    ingredient_operations: List[RecipeIngredientOperation] = []
+
+
 class RecipeResponse(RecipeBase):
     id: int
     ingredients: List[RecipeIngredientResponse] = []
+    nutrition: Optional[NutritionValues] = None  # Per serving, from the cache
 
     class Config:
         from_attributes = True
+
+
+class RecipePage(BaseModel):
+    items: List[RecipeResponse] = []
+    next_cursor: Optional[str] = None
+
+
+class RecipeSummary(BaseModel):
+    """Narrow recipe row for overview grids"""
+
+    id: int
+    name: str
+    servings: int
+    preparation_time: int
+    image_url: Optional[str] = None
+    ingredient_count: int
+
+    class Config:
+        from_attributes = True
+
+
+class RecipeSummaryPage(BaseModel):
+    items: List[RecipeSummary] = []
+    next_cursor: Optional[str] = None
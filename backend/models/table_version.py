@@ -0,0 +1,12 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from models.product import Base
+
+
+class TableVersionDB(Base):
+    """Change counter per resource table, used for HTTP cache validation"""
+
+    __tablename__ = "table_versions"
+
+    table_name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=True)
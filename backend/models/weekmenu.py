@@ -24,8 +24,10 @@ class MenuDayDB(Base):
     __tablename__ = "menu_days"
 
     id = Column(Integer, primary_key=True, index=True)
-    week_menu_id = Column(Integer, ForeignKey("week_menus.id"), nullable=False)
-    date = Column(Date, nullable=False)
+    week_menu_id = Column(
+        Integer, ForeignKey("week_menus.id"), nullable=False, index=True
+    )
+    date = Column(Date, nullable=False, index=True)
     recipe_id = Column(Integer, ForeignKey("recipes.id"), nullable=True)
     servings = Column(Integer, nullable=False)
     add_to_shopping_list = Column(Boolean, nullable=False, default=True)
@@ -55,6 +57,27 @@ class MenuDayResponse(MenuDayBase):
         from_attributes = True
 
 
+class PlannedDayResponse(MenuDayResponse):
+    """A menu day looked up by date, with the menu it belongs to"""
+
+    week_menu_id: int
+
+
+class MenuDayPatch(BaseModel):
+    """Partial change of one menu day; only the fields that are sent change"""
+
+    recipe_id: Optional[int] = None
+    servings: Optional[int] = None
+    add_to_shopping_list: Optional[bool] = None
+
+
+class WeekMenuDayChanges(BaseModel):
+    """Days written by a week menu update and dates whose day was removed"""
+
+    changed: List[MenuDayResponse] = []
+    removed: List[date] = []
+
+
 class WeekMenuBase(BaseModel):
     start_date: date = Field(..., description="Start date of the week")
     end_date: date = Field(..., description="End date of the week")
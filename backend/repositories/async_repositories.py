@@ -0,0 +1,62 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Any, Callable
+from repositories.daily_food_repository import DailyFoodRepository
+from repositories.product_repository import ProductRepository
+from repositories.recipe_repository import RecipeRepository
+from repositories.weekmenu_repository import WeekMenuRepository
+
+
+class AsyncSessionProxy:
+    """Runs the methods of a Session-bound object on an AsyncSession.
+
+    factory builds the object, a repository or a service, from a sync
+    Session. Every method call becomes a coroutine that runs the complete
+    call through AsyncSession.run_sync: the SQL goes out over the async
+    driver while the event loop serves other requests, and lazy loads or
+    response formatting inside the call work as they do in sync code.
+    """
+
+    def __init__(self, session: AsyncSession, factory: Callable[[Session], Any]):
+        self.session = session
+        self.factory = factory
+
+    def __getattr__(self, name: str) -> Callable:
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        async def call(*args, **kwargs):
+            return await self.session.run_sync(
+                lambda sync_session: getattr(self.factory(sync_session), name)(
+                    *args, **kwargs
+                )
+            )
+
+        return call
+
+    def service(self, service_factory: Callable[[Any], Any]) -> "AsyncSessionProxy":
+        """Proxy for a service built on top of the sync repository"""
+        return AsyncSessionProxy(
+            self.session,
+            lambda sync_session: service_factory(self.factory(sync_session)),
+        )
+
+
+class AsyncProductRepository(AsyncSessionProxy):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, ProductRepository)
+
+
+class AsyncRecipeRepository(AsyncSessionProxy):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, RecipeRepository)
+
+
+class AsyncWeekMenuRepository(AsyncSessionProxy):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, WeekMenuRepository)
+
+
+class AsyncDailyFoodRepository(AsyncSessionProxy):
+    def __init__(self, session: AsyncSession):
+        super().__init__(session, DailyFoodRepository)
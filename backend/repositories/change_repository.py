@@ -0,0 +1,99 @@
+from datetime import date
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+from typing import List
+from utils.change_feed import CHANNEL, change_broker, encode_event
+
+PENDING_KEY = "pending_change_events"
+ENTRY_FIELDS = ("id", "product_id", "recipe_id", "amount", "unit", "meal_type")
+DAY_FIELDS = ("id", "recipe_id", "servings", "add_to_shopping_list")
+
+
+def entry_event(change: str, log_date: date, entry) -> dict:
+    """entry.added or entry.updated with the entry's own columns"""
+    return {
+        "type": f"entry.{change}",
+        "date": log_date.isoformat(),
+        "entry": {field: getattr(entry, field) for field in ENTRY_FIELDS},
+    }
+
+
+def entry_removed_event(log_date: date, entry_id: int) -> dict:
+    return {"type": "entry.removed", "date": log_date.isoformat(), "entry_id": entry_id}
+
+
+def menu_day_event(menu_id: int, day) -> dict:
+    return {
+        "type": "menu_day.changed",
+        "week_menu_id": menu_id,
+        "date": day.date.isoformat(),
+        "day": {field: getattr(day, field) for field in DAY_FIELDS},
+    }
+
+
+def menu_day_removed_event(menu_id: int, day_date: date) -> dict:
+    return {
+        "type": "menu_day.removed",
+        "week_menu_id": menu_id,
+        "date": day_date.isoformat(),
+    }
+
+
+def week_menu_event(menu) -> dict:
+    return {
+        "type": "week_menu.changed",
+        "week_menu_id": menu.id,
+        "start_date": menu.start_date.isoformat(),
+        "end_date": menu.end_date.isoformat(),
+    }
+
+
+def week_menu_removed_event(menu_id: int) -> dict:
+    return {"type": "week_menu.removed", "week_menu_id": menu_id}
+
+
+class ChangeRepository:
+    """Publishes change events as part of the caller's transaction.
+
+    On PostgreSQL publish() runs pg_notify, which is delivered on commit to
+    the listener of every API worker, this one included. Other databases
+    have no NOTIFY; there the events wait in the session and go straight to
+    the in-process broker after the commit. Either way a rolled back change
+    is never announced. Like VersionRepository, the caller commits.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def publish(self, events: List[dict]) -> None:
+        if not events:
+            return
+        if self.db.get_bind().dialect.name == "postgresql":
+            # One statement for the whole batch; each event stays its own
+            # notification, well below the 8000 byte payload limit
+            self.db.execute(
+                text(
+                    "SELECT pg_notify(:channel, payload) "
+                    "FROM unnest(CAST(:payloads AS text[])) AS payload"
+                ),
+                {
+                    "channel": CHANNEL,
+                    "payloads": [encode_event(item) for item in events],
+                },
+            )
+        else:
+            # Held until the transaction ends, which must exist for that
+            if not self.db.in_transaction():
+                self.db.begin()
+            self.db.info.setdefault(PENDING_KEY, []).extend(events)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    for item in session.info.pop(PENDING_KEY, []):
+        change_broker.publish(item)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_pending(session: Session, previous_transaction) -> None:
+    session.info.pop(PENDING_KEY, None)
@@ -1,4 +1,14 @@
 # backend/repositories/daily_food_repository.py
+from sqlalchemy import (
+    ColumnElement,
+    Date,
+    Select,
+    cast,
+    func,
+    insert,
+    literal,
+    select,
+)
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from datetime import date
@@ -8,26 +18,54 @@ from models.daily_food_log import (
     DailyFoodLogCreate,
     DailyFoodEntryCreate,
 )
-from models.recipe import RecipeDB, RecipeIngredientDB
+from models.daily_nutrition_total import DailyNutritionTotalDB
+from models.product import ProductDB
+from models.recipe import RecipeDB, RecipeIngredientDB, RecipeNutritionDB
+from repositories.change_repository import (
+    ENTRY_FIELDS,
+    ChangeRepository,
+    entry_event,
+    entry_removed_event,
+)
+from repositories.daily_nutrition_totals_repository import (
+    DailyNutritionTotalsRepository,
+    entry_nutrients,
+)
+from utils.nutrition_matrix import NUTRIENTS
+from utils.upsert import dialect_insert
+
+TOTALS_GROUPS = ["day", "week", "month", "meal_type"]
 
 
 class DailyFoodRepository:
     def __init__(self, db: Session):
         self.db = db
+        self._totals = DailyNutritionTotalsRepository(db)
+        self._changes = ChangeRepository(db)
 
     def get_or_create_daily_log(self, log_date: date) -> DailyFoodLogDB:
-        """Get existing daily log or create new one for the date"""
-        daily_log = (
-            self.db.query(DailyFoodLogDB)
-            .filter(DailyFoodLogDB.date == log_date)
-            .first()
-        )
+        """Get existing daily log or create new one for the date.
 
-        if not daily_log:
-            daily_log = DailyFoodLogDB(date=log_date)
-            self.db.add(daily_log)
-            self.db.flush()
+        Most writes go to a day that has a log already, which a plain SELECT
+        finds without writing or locking the row. Otherwise an INSERT ... ON
+        CONFLICT (date) DO NOTHING against the unique date index creates it;
+        when a concurrent first entry of the day won, the log is selected
+        again, so both end up in the same log.
+        """
+        query = select(DailyFoodLogDB).where(DailyFoodLogDB.date == log_date)
+        daily_log = self.db.scalars(query).first()
+        if daily_log is not None:
+            return daily_log
 
+        insert_log = (
+            dialect_insert(self.db, DailyFoodLogDB)
+            .values(date=log_date)
+            .on_conflict_do_nothing(index_elements=[DailyFoodLogDB.date])
+            .returning(DailyFoodLogDB)
+        )
+        daily_log = self.db.scalars(insert_log).first()
+        if daily_log is None:
+            daily_log = self.db.scalars(query).one()
         return daily_log
 
     def get_daily_log_by_date(self, log_date: date) -> Optional[DailyFoodLogDB]:
@@ -45,6 +83,86 @@ class DailyFoodRepository:
             .first()
         )
 
+    def get_entry_nutrition(self, date_from: date, date_to: date) -> List:
+        """Per-entry nutrient totals for a date range in a single query.
+
+        Rows hold the log date, the entry columns, the product or recipe name
+        and one column per nutrient; no ingredients are loaded.
+        """
+        query = self._join_nutrition(
+            select(
+                DailyFoodLogDB.date,
+                DailyFoodEntryDB.id,
+                DailyFoodEntryDB.product_id,
+                DailyFoodEntryDB.recipe_id,
+                func.coalesce(ProductDB.name, RecipeDB.name).label("name"),
+                DailyFoodEntryDB.amount,
+                DailyFoodEntryDB.unit,
+                DailyFoodEntryDB.meal_type,
+                *[
+                    expression.label(nutrient)
+                    for nutrient, expression in entry_nutrients().items()
+                ],
+            ).outerjoin(RecipeDB, RecipeDB.id == DailyFoodEntryDB.recipe_id),
+            date_from,
+            date_to,
+        ).order_by(DailyFoodLogDB.date, DailyFoodEntryDB.id)
+        return self.db.execute(query).all()
+
+    def get_nutrition_totals(self, date_from: date, date_to: date, group: str) -> List:
+        """Summed nutrients per day, week, month or meal type.
+
+        Reads the daily_nutrition_totals rollup, a range scan over its
+        (date, meal_type) key, instead of walking the entries. Rows hold the
+        group key, the number of entries and one column per nutrient. Weeks
+        are keyed by the date of their Monday, months by their first day.
+        """
+        if group not in TOTALS_GROUPS:
+            raise ValueError(f"Invalid group. Must be one of: {TOTALS_GROUPS}")
+
+        key = self._group_key(group).label("key")
+        query = (
+            select(
+                key,
+                func.sum(DailyNutritionTotalDB.entries).label("entries"),
+                *[
+                    func.sum(getattr(DailyNutritionTotalDB, nutrient)).label(nutrient)
+                    for nutrient in NUTRIENTS
+                ],
+            )
+            .where(DailyNutritionTotalDB.date.between(date_from, date_to))
+            .group_by(key)
+            .order_by(key)
+        )
+        return self.db.execute(query).all()
+
+    def _join_nutrition(self, query: Select, date_from: date, date_to: date) -> Select:
+        return (
+            query.select_from(DailyFoodEntryDB)
+            .join(DailyFoodLogDB, DailyFoodLogDB.id == DailyFoodEntryDB.daily_log_id)
+            .outerjoin(ProductDB, ProductDB.id == DailyFoodEntryDB.product_id)
+            .outerjoin(
+                RecipeNutritionDB,
+                RecipeNutritionDB.recipe_id == DailyFoodEntryDB.recipe_id,
+            )
+            .where(DailyFoodLogDB.date.between(date_from, date_to))
+        )
+
+    def _group_key(self, group: str) -> ColumnElement:
+        if group == "meal_type":
+            return DailyNutritionTotalDB.meal_type
+        if group == "day":
+            return DailyNutritionTotalDB.date
+        sqlite = self.db.get_bind().dialect.name == "sqlite"
+        if group == "month":
+            if sqlite:
+                return func.date(DailyNutritionTotalDB.date, "start of month")
+            return cast(func.date_trunc("month", DailyNutritionTotalDB.date), Date)
+        if sqlite:
+            # Next Sunday (or the day itself), then back to its Monday
+            return func.date(DailyNutritionTotalDB.date, "weekday 0", "-6 days")
+        return cast(func.date_trunc("week", DailyNutritionTotalDB.date), Date)
+
     def add_entry(
         self, log_date: date, entry_data: DailyFoodEntryCreate
     ) -> DailyFoodEntryDB:
@@ -56,6 +174,8 @@ class DailyFoodRepository:
 
             self.db.add(db_entry)
             self.db.flush()  # Om direct de ID te krijgen zonder commit
+            self._totals.apply_entries([db_entry.id])
+            self._changes.publish([entry_event("added", log_date, db_entry)])
 
             self.db.commit()
             self.db.refresh(db_entry)
@@ -65,22 +185,126 @@ class DailyFoodRepository:
             self.db.rollback()
             raise e
 
+    def add_entries(
+        self, log_date: date, entries: List[DailyFoodEntryCreate]
+    ) -> List[DailyFoodEntryDB]:
+        """Add several entries to a daily log in one transaction.
+
+        The rows go out as a single multi-row INSERT ... RETURNING.
+        """
+        try:
+            daily_log = self.get_or_create_daily_log(log_date)
+            rows = self.db.execute(
+                insert(DailyFoodEntryDB).returning(*self._entry_columns()),
+                [
+                    {"daily_log_id": daily_log.id, **entry_data.dict()}
+                    for entry_data in entries
+                ],
+            ).all()
+            entry_ids = self._apply_new_entries(log_date, rows)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+        return self.get_entries_by_ids(entry_ids)
+
+    def copy_entries(
+        self, log_date: date, source_date: date, meal_type: Optional[str] = None
+    ) -> List[DailyFoodEntryDB]:
+        """Copy the entries of another day, or of one of its meals, with INSERT ... SELECT"""
+        if source_date == log_date:
+            raise ValueError("Cannot copy a day onto itself")
+
+        try:
+            daily_log = self.get_or_create_daily_log(log_date)
+            source = (
+                select(
+                    literal(daily_log.id),
+                    DailyFoodEntryDB.product_id,
+                    DailyFoodEntryDB.recipe_id,
+                    DailyFoodEntryDB.amount,
+                    DailyFoodEntryDB.unit,
+                    DailyFoodEntryDB.meal_type,
+                )
+                .join(
+                    DailyFoodLogDB, DailyFoodLogDB.id == DailyFoodEntryDB.daily_log_id
+                )
+                .where(DailyFoodLogDB.date == source_date)
+                .order_by(DailyFoodEntryDB.id)
+            )
+            if meal_type is not None:
+                source = source.where(DailyFoodEntryDB.meal_type == meal_type)
+
+            rows = self.db.execute(
+                insert(DailyFoodEntryDB)
+                .from_select(
+                    [
+                        DailyFoodEntryDB.daily_log_id,
+                        DailyFoodEntryDB.product_id,
+                        DailyFoodEntryDB.recipe_id,
+                        DailyFoodEntryDB.amount,
+                        DailyFoodEntryDB.unit,
+                        DailyFoodEntryDB.meal_type,
+                    ],
+                    source,
+                )
+                .returning(*self._entry_columns())
+            ).all()
+            entry_ids = self._apply_new_entries(log_date, rows)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+        return self.get_entries_by_ids(entry_ids)
+
+    def _entry_columns(self) -> List:
+        return [getattr(DailyFoodEntryDB, field) for field in ENTRY_FIELDS]
+
+    def _apply_new_entries(self, log_date: date, rows: List) -> List[int]:
+        # Rollup deltas and change events of inserted rows; returns their ids
+        entry_ids = [row.id for row in rows]
+        self._totals.apply_entries(entry_ids)
+        self._changes.publish([entry_event("added", log_date, row) for row in rows])
+        return entry_ids
+
+    def get_entries_by_ids(self, entry_ids: List[int]) -> List[DailyFoodEntryDB]:
+        """Entries with their product, or recipe and its ingredients, in id order"""
+        if not entry_ids:
+            return []
+        return (
+            self.db.query(DailyFoodEntryDB)
+            .options(
+                joinedload(DailyFoodEntryDB.product),
+                joinedload(DailyFoodEntryDB.recipe)
+                .selectinload(RecipeDB.ingredients)
+                .joinedload(RecipeIngredientDB.product),
+            )
+            .filter(DailyFoodEntryDB.id.in_(entry_ids))
+            .order_by(DailyFoodEntryDB.id)
+            .all()
+        )
+
     def update_entry(
         self, entry_id: int, entry_data: DailyFoodEntryCreate
     ) -> Optional[DailyFoodEntryDB]:
         """Update an existing entry"""
-        db_entry = (
-            self.db.query(DailyFoodEntryDB)
-            .filter(DailyFoodEntryDB.id == entry_id)
-            .first()
-        )
+        db_entry = self._get_entry_with_log(entry_id)
 
         if db_entry:
+            # Take the old values out of the totals and add the new ones
+            self._totals.apply_entries([entry_id], sign=-1)
             db_entry.product_id = entry_data.product_id
             db_entry.recipe_id = entry_data.recipe_id
             db_entry.amount = entry_data.amount
             db_entry.unit = entry_data.unit
             db_entry.meal_type = entry_data.meal_type
+            self.db.flush()
+            self._totals.apply_entries([entry_id])
+            self._changes.publish(
+                [entry_event("updated", db_entry.daily_log.date, db_entry)]
+            )
 
             self.db.commit()
             self.db.refresh(db_entry)
@@ -89,14 +313,23 @@ class DailyFoodRepository:
 
     def delete_entry(self, entry_id: int) -> bool:
         """Delete an entry"""
-        db_entry = (
-            self.db.query(DailyFoodEntryDB)
-            .filter(DailyFoodEntryDB.id == entry_id)
-            .first()
-        )
+        db_entry = self._get_entry_with_log(entry_id)
 
         if db_entry:
+            self._totals.apply_entries([entry_id], sign=-1)
+            self._changes.publish(
+                [entry_removed_event(db_entry.daily_log.date, entry_id)]
+            )
             self.db.delete(db_entry)
             self.db.commit()
             return True
         return False
+
+    def _get_entry_with_log(self, entry_id: int) -> Optional[DailyFoodEntryDB]:
+        # The log comes along for the date of the change event
+        return (
+            self.db.query(DailyFoodEntryDB)
+            .options(joinedload(DailyFoodEntryDB.daily_log))
+            .filter(DailyFoodEntryDB.id == entry_id)
+            .first()
+        )
@@ -0,0 +1,161 @@
+from sqlalchemy import ColumnElement, Select, case, delete, func, insert, or_, select
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, Optional
+from datetime import date
+from models.daily_food_log import DailyFoodLogDB, DailyFoodEntryDB
+from models.daily_nutrition_total import DailyNutritionTotalDB
+from models.product import ProductDB
+from models.recipe import RecipeIngredientDB, RecipeNutritionDB
+from utils.nutrition_matrix import NUTRIENTS
+from utils.upsert import dialect_insert
+
+SUMMED_COLUMNS = ["entries", *NUTRIENTS]
+
+
+def entry_nutrients() -> Dict[str, ColumnElement]:
+    """Nutrients of one entry as SQL expressions, by nutrient name.
+
+    Product entries scale the product macros by amount / serving_size, recipe
+    entries multiply the cached per-serving values by the servings eaten.
+    Queries using these must outer join ProductDB and RecipeNutritionDB.
+    """
+    return {
+        nutrient: case(
+            (
+                DailyFoodEntryDB.product_id.isnot(None),
+                func.coalesce(getattr(ProductDB, nutrient), 0.0)
+                * DailyFoodEntryDB.amount
+                / ProductDB.serving_size,
+            ),
+            else_=func.coalesce(getattr(RecipeNutritionDB, nutrient), 0.0)
+            * DailyFoodEntryDB.amount,
+        )
+        for nutrient in NUTRIENTS
+    }
+
+
+class DailyNutritionTotalsRepository:
+    """Maintains the daily_nutrition_totals rollup table.
+
+    Methods only flush SQL; the calling repository commits, so the totals
+    change in the same transaction as the entries, products or recipes.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def apply_entries(self, entry_ids: Iterable[int], sign: int = 1) -> None:
+        """Add (sign 1) or subtract (sign -1) the nutrients of entries.
+
+        One INSERT ... SELECT ... ON CONFLICT adds the per date and meal type
+        deltas to the existing rows; rows left without entries are removed.
+        """
+        entry_ids = list(entry_ids)
+        if not entry_ids:
+            return
+
+        deltas = self._totals(DailyFoodEntryDB.id.in_(entry_ids), sign=sign)
+        upsert = dialect_insert(self.db, DailyNutritionTotalDB).from_select(
+            ["date", "meal_type", *SUMMED_COLUMNS], deltas
+        )
+        upsert = upsert.on_conflict_do_update(
+            index_elements=[
+                DailyNutritionTotalDB.date,
+                DailyNutritionTotalDB.meal_type,
+            ],
+            set_={
+                column: getattr(DailyNutritionTotalDB, column)
+                + getattr(upsert.excluded, column)
+                for column in SUMMED_COLUMNS
+            },
+        )
+        self.db.execute(upsert)
+        if sign < 0:
+            self.db.execute(
+                delete(DailyNutritionTotalDB).where(DailyNutritionTotalDB.entries <= 0)
+            )
+
+    def rebuild(
+        self, date_from: Optional[date] = None, date_to: Optional[date] = None
+    ) -> None:
+        """Recompute the totals of a date range, or of all dates"""
+        conditions = []
+        if date_from is not None:
+            conditions.append(DailyNutritionTotalDB.date >= date_from)
+        if date_to is not None:
+            conditions.append(DailyNutritionTotalDB.date <= date_to)
+        self.db.execute(delete(DailyNutritionTotalDB).where(*conditions))
+
+        log_conditions = []
+        if date_from is not None:
+            log_conditions.append(DailyFoodLogDB.date >= date_from)
+        if date_to is not None:
+            log_conditions.append(DailyFoodLogDB.date <= date_to)
+        self._insert_totals(self._totals(*log_conditions))
+
+    def rebuild_for_products(self, product_ids: Iterable[int]) -> None:
+        """Recompute the dates with entries of the products or of recipes
+        containing them; call after refreshing the recipe nutrition cache"""
+        product_ids = list(product_ids)
+        if product_ids:
+            recipe_ids = select(RecipeIngredientDB.recipe_id).where(
+                RecipeIngredientDB.product_id.in_(product_ids)
+            )
+            self._rebuild_dates(
+                or_(
+                    DailyFoodEntryDB.product_id.in_(product_ids),
+                    DailyFoodEntryDB.recipe_id.in_(recipe_ids),
+                )
+            )
+
+    def rebuild_for_recipes(self, recipe_ids: Iterable[int]) -> None:
+        """Recompute the dates with entries of the recipes"""
+        recipe_ids = list(recipe_ids)
+        if recipe_ids:
+            self._rebuild_dates(DailyFoodEntryDB.recipe_id.in_(recipe_ids))
+
+    def _rebuild_dates(self, entry_condition) -> None:
+        dates = (
+            select(DailyFoodLogDB.date)
+            .join(DailyFoodEntryDB, DailyFoodEntryDB.daily_log_id == DailyFoodLogDB.id)
+            .where(entry_condition)
+            .distinct()
+        )
+        self.db.execute(
+            delete(DailyNutritionTotalDB).where(DailyNutritionTotalDB.date.in_(dates))
+        )
+        self._insert_totals(self._totals(DailyFoodLogDB.date.in_(dates)))
+
+    def _insert_totals(self, totals: Select) -> None:
+        self.db.execute(
+            insert(DailyNutritionTotalDB).from_select(
+                ["date", "meal_type", *SUMMED_COLUMNS], totals
+            )
+        )
+
+    def _totals(self, *conditions, sign: int = 1) -> Select:
+        """Entry count and nutrient sums per date and meal type"""
+
+        def signed(expression):
+            return -expression if sign < 0 else expression
+
+        return (
+            select(
+                DailyFoodLogDB.date,
+                DailyFoodEntryDB.meal_type,
+                signed(func.count(DailyFoodEntryDB.id)),
+                *[
+                    signed(func.coalesce(func.sum(expression), 0.0))
+                    for expression in entry_nutrients().values()
+                ],
+            )
+            .select_from(DailyFoodEntryDB)
+            .join(DailyFoodLogDB, DailyFoodLogDB.id == DailyFoodEntryDB.daily_log_id)
+            .outerjoin(ProductDB, ProductDB.id == DailyFoodEntryDB.product_id)
+            .outerjoin(
+                RecipeNutritionDB,
+                RecipeNutritionDB.recipe_id == DailyFoodEntryDB.recipe_id,
+            )
+            .where(*conditions)
+            .group_by(DailyFoodLogDB.date, DailyFoodEntryDB.meal_type)
+        )
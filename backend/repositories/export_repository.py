@@ -0,0 +1,61 @@
+from sqlalchemy.orm import Session, selectinload
+from typing import Iterator, Optional
+from datetime import date
+from models.product import ProductDB
+from models.recipe import RecipeDB, RecipeIngredientDB
+from models.weekmenu import WeekMenuDB
+from models.daily_food_log import DailyFoodLogDB
+
+EXPORT_BATCH_SIZE = 500
+
+
+class ExportRepository:
+    """Read-only streaming queries for bulk export.
+
+    Every method uses yield_per, which enables a server-side cursor and
+    fetches rows in batches. Child collections are loaded per batch with
+    selectinload, so memory stays bounded by the batch size.
+    """
+
+    def __init__(self, db: Session, batch_size: int = EXPORT_BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+
+    def iter_products(self) -> Iterator[ProductDB]:
+        return (
+            self.db.query(ProductDB).order_by(ProductDB.id).yield_per(self.batch_size)
+        )
+
+    def iter_recipes(self) -> Iterator[RecipeDB]:
+        return (
+            self.db.query(RecipeDB)
+            .options(
+                selectinload(RecipeDB.ingredients).joinedload(
+                    RecipeIngredientDB.product
+                )
+            )
+            .order_by(RecipeDB.id)
+            .yield_per(self.batch_size)
+        )
+
+    def iter_week_menus(self) -> Iterator[WeekMenuDB]:
+        return (
+            self.db.query(WeekMenuDB)
+            .options(selectinload(WeekMenuDB.days))
+            .order_by(WeekMenuDB.start_date, WeekMenuDB.id)
+            .yield_per(self.batch_size)
+        )
+
+    def iter_daily_logs(
+        self, date_from: Optional[date] = None, date_to: Optional[date] = None
+    ) -> Iterator[DailyFoodLogDB]:
+        query = self.db.query(DailyFoodLogDB).options(
+            selectinload(DailyFoodLogDB.entries)
+        )
+        if date_from:
+            query = query.filter(DailyFoodLogDB.date >= date_from)
+        if date_to:
+            query = query.filter(DailyFoodLogDB.date <= date_to)
+        return query.order_by(DailyFoodLogDB.date, DailyFoodLogDB.id).yield_per(
+            self.batch_size
+        )
@@ -1,11 +1,42 @@
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.orm import Session
-from typing import List, Optional
-from models.product import ProductDB, ProductCreate
+from sqlalchemy.orm.attributes import set_committed_value
+from typing import List, Optional, Tuple
+from models.product import ProductDB, ProductCreate, ProductBatchUpdate, ProductFilter
+from utils.pagination import keyset_page
+from utils.search_index import SearchIndex
+from utils.nutrition_matrix import NutritionMatrix, NUTRIENTS
+from repositories.daily_nutrition_totals_repository import (
+    DailyNutritionTotalsRepository,
+)
+from repositories.recipe_nutrition_repository import RecipeNutritionRepository
+from repositories.version_repository import VersionRepository
+
+RANGE_FILTER_COLUMNS = ["energy_kcal", "proteins", "carbohydrates", "fats", "fibers"]
+SORT_COLUMNS = {"id": ProductDB.id, "name": ProductDB.name}
+
+# Process-wide name index and nutrient matrix, loaded on first use and kept
+# current by the write methods below
+product_search_index = SearchIndex()
+product_nutrition_matrix = NutritionMatrix()
 
 
 class ProductRepository:
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        search_index: Optional[SearchIndex] = None,
+        nutrition_matrix: Optional[NutritionMatrix] = None,
+    ):
         self.db = db
+        self.search_index = (
+            search_index if search_index is not None else product_search_index
+        )
+        self.nutrition_matrix = (
+            nutrition_matrix
+            if nutrition_matrix is not None
+            else product_nutrition_matrix
+        )
 
     def create_product(self, product: ProductCreate) -> ProductDB:
         product_data = product.dict()
@@ -18,31 +49,97 @@ class ProductRepository:
 
         db_product = ProductDB(**product_data)
         self.db.add(db_product)
+        self._bump_version()
         self.db.commit()
         self.db.refresh(db_product)
+        self._track(db_product.id, product_data)
         return db_product
 
+    def create_products(self, products: List[ProductCreate]) -> List[int]:
+        """Insert many products with multi-row INSERTs in one transaction"""
+        if not products:
+            return []
+        rows = [product.dict() for product in products]
+        try:
+            result = self.db.execute(
+                insert(ProductDB).returning(ProductDB.id, sort_by_parameter_order=True),
+                rows,
+            )
+            ids = list(result.scalars())
+            self._bump_version()
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+        for product_id, row in zip(ids, rows):
+            self._track(product_id, row)
+        return ids
+
+    def update_products(self, products: List[ProductBatchUpdate]) -> List[bool]:
+        """Update many products by id in one transaction.
+
+        Returns per item whether the product existed and was updated.
+        """
+        if not products:
+            return []
+        ids = [product.id for product in products]
+        existing = set(
+            self.db.execute(select(ProductDB.id).where(ProductDB.id.in_(ids))).scalars()
+        )
+        rows = [product.dict() for product in products if product.id in existing]
+        try:
+            if rows:
+                self.db.execute(update(ProductDB), rows)
+                RecipeNutritionRepository(self.db).refresh_for_products(
+                    [row["id"] for row in rows]
+                )
+                DailyNutritionTotalsRepository(self.db).rebuild_for_products(
+                    [row["id"] for row in rows]
+                )
+                self._bump_version()
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            raise e
+
+        for row in rows:
+            self._track(row["id"], row)
+        return [product_id in existing for product_id in ids]
+
     def get_all_products(self) -> List[ProductDB]:
         products = self.db.query(ProductDB).all()
 
         # Ensure backward compatibility for existing products
         for product in products:
-            if not product.serving_unit:
-                product.serving_unit = "gram"
-            if not product.serving_amount:
-                product.serving_amount = product.serving_size
+            self._apply_serving_defaults(product)
 
         return products
 
+    def get_products_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort: str = "id",
+        filters: Optional[ProductFilter] = None,
+    ) -> Tuple[List[ProductDB], Optional[str]]:
+        """Get one keyset page of products plus the cursor for the next page"""
+        query = self._apply_filters(self.db.query(ProductDB), filters)
+        products, next_cursor = keyset_page(
+            query, ProductDB.id, SORT_COLUMNS, sort, limit, cursor
+        )
+
+        for product in products:
+            self._apply_serving_defaults(product)
+
+        return products, next_cursor
+
     def get_product_by_id(self, product_id: int) -> Optional[ProductDB]:
         product = self.db.query(ProductDB).filter(ProductDB.id == product_id).first()
 
         # Ensure backward compatibility
         if product:
-            if not product.serving_unit:
-                product.serving_unit = "gram"
-            if not product.serving_amount:
-                product.serving_amount = product.serving_size
+            self._apply_serving_defaults(product)
 
         return product
 
@@ -61,14 +158,80 @@ class ProductRepository:
 
             for key, value in update_data.items():
                 setattr(db_product, key, value)
+            self.db.flush()
+            RecipeNutritionRepository(self.db).refresh_for_products([product_id])
+            DailyNutritionTotalsRepository(self.db).rebuild_for_products([product_id])
+            self._bump_version()
             self.db.commit()
             self.db.refresh(db_product)
+            self._track(db_product.id, update_data)
         return db_product
 
     def delete_product(self, product_id: int) -> bool:
         db_product = self.get_product_by_id(product_id)
         if db_product:
             self.db.delete(db_product)
+            self._bump_version()
             self.db.commit()
+            self.search_index.remove(product_id)
+            self.nutrition_matrix.remove(product_id)
             return True
         return False
+
+    def search_products(
+        self, query: str, limit: int = 10
+    ) -> List[Tuple[int, str, float]]:
+        """Rank products by name similarity without hitting the database"""
+        if not self.search_index.loaded:
+            self.search_index.load(self.db.query(ProductDB.id, ProductDB.name).all())
+        return self.search_index.search(query, limit)
+
+    def get_nutrition_matrix(self) -> NutritionMatrix:
+        """Nutrient matrix of all products, loaded from the database once"""
+        if not self.nutrition_matrix.loaded:
+            columns = [getattr(ProductDB, nutrient) for nutrient in NUTRIENTS]
+            self.nutrition_matrix.load(
+                self.db.query(ProductDB.id, ProductDB.serving_size, *columns).all()
+            )
+        return self.nutrition_matrix
+
+    def _track(self, product_id: int, data: dict) -> None:
+        """Keep the in-process index and matrix in step with a written product"""
+        self.search_index.add(product_id, data["name"])
+        self.nutrition_matrix.upsert(
+            product_id,
+            data["serving_size"],
+            [data[nutrient] for nutrient in NUTRIENTS],
+        )
+
+    def _apply_filters(self, query, filters: Optional[ProductFilter]):
+        if not filters:
+            return query
+
+        if filters.name_prefix:
+            query = query.filter(
+                func.lower(ProductDB.name).startswith(
+                    filters.name_prefix.lower(), autoescape=True
+                )
+            )
+
+        for column_name in RANGE_FILTER_COLUMNS:
+            column = getattr(ProductDB, column_name)
+            minimum = getattr(filters, f"min_{column_name}")
+            maximum = getattr(filters, f"max_{column_name}")
+            if minimum is not None:
+                query = query.filter(column >= minimum)
+            if maximum is not None:
+                query = query.filter(column <= maximum)
+
+        return query
+
+    def _bump_version(self) -> None:
+        VersionRepository(self.db).bump(ProductDB.__tablename__)
+
+    def _apply_serving_defaults(self, product: ProductDB) -> None:
+        """Fill in legacy serving fields without marking the row as dirty"""
+        if not product.serving_unit:
+            set_committed_value(product, "serving_unit", "gram")
+        if not product.serving_amount:
+            set_committed_value(product, "serving_amount", product.serving_size)
@@ -0,0 +1,66 @@
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.orm import Session
+from typing import Iterable, List
+from models.product import ProductDB
+from models.recipe import RecipeDB, RecipeIngredientDB, RecipeNutritionDB
+from utils.nutrition_matrix import NUTRIENTS
+
+
+class RecipeNutritionRepository:
+    """Maintains the recipe_nutrition cache table.
+
+    Methods only flush SQL; the calling repository commits, so the cache is
+    updated in the same transaction as the change that invalidated it.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def refresh(self, recipe_ids: Iterable[int]) -> None:
+        """Recompute the cached per-serving nutrition of the given recipes"""
+        recipe_ids = list(set(recipe_ids))
+        if not recipe_ids:
+            return
+
+        per_serving = [
+            (
+                func.coalesce(
+                    func.sum(
+                        getattr(ProductDB, nutrient)
+                        * RecipeIngredientDB.amount
+                        / ProductDB.serving_size
+                    ),
+                    0.0,
+                )
+                / RecipeDB.servings
+            ).label(nutrient)
+            for nutrient in NUTRIENTS
+        ]
+        totals = (
+            select(RecipeDB.id, *per_serving)
+            .select_from(RecipeDB)
+            .outerjoin(RecipeIngredientDB, RecipeIngredientDB.recipe_id == RecipeDB.id)
+            .outerjoin(ProductDB, ProductDB.id == RecipeIngredientDB.product_id)
+            .where(RecipeDB.id.in_(recipe_ids))
+            .group_by(RecipeDB.id, RecipeDB.servings)
+        )
+
+        self.db.execute(
+            delete(RecipeNutritionDB).where(RecipeNutritionDB.recipe_id.in_(recipe_ids))
+        )
+        self.db.execute(
+            insert(RecipeNutritionDB).from_select(["recipe_id", *NUTRIENTS], totals)
+        )
+
+    def recipe_ids_using_products(self, product_ids: Iterable[int]) -> List[int]:
+        """Reverse lookup of the recipes that contain any of the products"""
+        return list(
+            self.db.execute(
+                select(RecipeIngredientDB.recipe_id)
+                .where(RecipeIngredientDB.product_id.in_(list(product_ids)))
+                .distinct()
+            ).scalars()
+        )
+
+    def refresh_for_products(self, product_ids: Iterable[int]) -> None:
+        self.refresh(self.recipe_ids_using_products(product_ids))
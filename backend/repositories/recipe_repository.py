@@ -1,6 +1,33 @@
-from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
-from models.recipe import RecipeDB, RecipeIngredientDB, RecipeCreate
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session, joinedload, selectinload
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from models.product import ProductDB
+from models.recipe import (
+    RecipeDB,
+    RecipeIngredientDB,
+    RecipeCreate,
+    RecipeIngredientCreate,
+    RecipeIngredientOperation,
+    RecipePatch,
+)
+from utils.pagination import keyset_page
+from repositories.daily_nutrition_totals_repository import (
+    DailyNutritionTotalsRepository,
+)
+from repositories.recipe_nutrition_repository import RecipeNutritionRepository
+from repositories.version_repository import VersionRepository
+
+SORT_COLUMNS = {"id": RecipeDB.id, "name": RecipeDB.name}
+
+# Recipe lists load ingredients with one extra IN query instead of a join, so
+# every recipe comes back as one row instead of one row per ingredient
+LIST_LOAD_OPTIONS = [
+    selectinload(RecipeDB.ingredients)
+    .joinedload(RecipeIngredientDB.product)
+    .load_only(ProductDB.id, ProductDB.name),
+    joinedload(RecipeDB.nutrition),
+]
 
 
 class RecipeRepository:
@@ -21,24 +48,51 @@ class RecipeRepository:
             )
             self.db.add(db_ingredient)
 
+        self.db.flush()
+        RecipeNutritionRepository(self.db).refresh([db_recipe.id])
+        self._bump_version()
         self.db.commit()
         self.db.refresh(db_recipe)
         return db_recipe
 
     def get_all_recipes(self) -> List[RecipeDB]:
-        return (
-            self.db.query(RecipeDB)
-            .options(
-                joinedload(RecipeDB.ingredients).joinedload(RecipeIngredientDB.product)
-            )
-            .all()
+        return self.db.query(RecipeDB).options(*LIST_LOAD_OPTIONS).all()
+
+    def get_recipes_page(
+        self, limit: int, cursor: Optional[str] = None, sort: str = "id"
+    ) -> Tuple[List[RecipeDB], Optional[str]]:
+        """Get one keyset page of recipes plus the cursor for the next page"""
+        query = self.db.query(RecipeDB).options(*LIST_LOAD_OPTIONS)
+        return keyset_page(query, RecipeDB.id, SORT_COLUMNS, sort, limit, cursor)
+
+    def get_recipe_summaries_page(
+        self, limit: int, cursor: Optional[str] = None, sort: str = "id"
+    ) -> Tuple[List[Any], Optional[str]]:
+        """Like get_recipes_page, but only the overview columns and the
+        ingredient count, without loading ingredients or instructions"""
+        ingredient_count = (
+            select(func.count(RecipeIngredientDB.id))
+            .where(RecipeIngredientDB.recipe_id == RecipeDB.id)
+            .correlate(RecipeDB)
+            .scalar_subquery()
+            .label("ingredient_count")
+        )
+        query = self.db.query(
+            RecipeDB.id,
+            RecipeDB.name,
+            RecipeDB.servings,
+            RecipeDB.preparation_time,
+            RecipeDB.image_url,
+            ingredient_count,
         )
+        return keyset_page(query, RecipeDB.id, SORT_COLUMNS, sort, limit, cursor)
 
     def get_recipe_by_id(self, recipe_id: int) -> Optional[RecipeDB]:
         return (
             self.db.query(RecipeDB)
             .options(
-                joinedload(RecipeDB.ingredients).joinedload(RecipeIngredientDB.product)
+                joinedload(RecipeDB.ingredients).joinedload(RecipeIngredientDB.product),
+                joinedload(RecipeDB.nutrition),
             )
             .filter(RecipeDB.id == recipe_id)
             .first()
@@ -53,29 +107,170 @@ class RecipeRepository:
 
         # Update basic recipe info
         recipe_dict = recipe_data.dict(exclude={"ingredients"})
+        servings = db_recipe.servings
         for key, value in recipe_dict.items():
             setattr(db_recipe, key, value)
 
-        # Delete existing ingredients
-        self.db.query(RecipeIngredientDB).filter(
-            RecipeIngredientDB.recipe_id == recipe_id
-        ).delete()
+        ingredients_changed = self._sync_ingredients(db_recipe, recipe_data.ingredients)
+        return self._save(
+            db_recipe, ingredients_changed or servings != db_recipe.servings
+        )
 
-        # Add new ingredients
-        for ingredient_data in recipe_data.ingredients:
-            db_ingredient = RecipeIngredientDB(
-                recipe_id=recipe_id, **ingredient_data.dict()
+    def patch_recipe(self, recipe_id: int, patch: RecipePatch) -> Optional[RecipeDB]:
+        """Apply the fields that were sent and the single-ingredient operations"""
+        db_recipe = self.get_recipe_by_id(recipe_id)
+        if not db_recipe:
+            return None
+
+        servings = db_recipe.servings
+        fields = patch.dict(
+            exclude_unset=True, exclude={"ingredients", "ingredient_operations"}
+        )
+        for key, value in fields.items():
+            if value is None and key != "image_url":
+                raise ValueError(f"{key} cannot be empty")
+            setattr(db_recipe, key, value)
+
+        ingredients_changed = False
+        if patch.ingredients is not None:
+            ingredients_changed = self._sync_ingredients(db_recipe, patch.ingredients)
+        for operation in patch.ingredient_operations:
+            self._apply_ingredient_operation(db_recipe, operation)
+            ingredients_changed = True
+
+        return self._save(
+            db_recipe, ingredients_changed or servings != db_recipe.servings
+        )
+
+    def _sync_ingredients(
+        self, db_recipe: RecipeDB, ingredients: List[RecipeIngredientCreate]
+    ) -> bool:
+        """Reconcile the ingredient rows with the requested list.
+
+        Requested lines are matched to existing rows on product_id, in order,
+        so unchanged lines keep their row and id. Only changed amounts or
+        units are updated, new lines inserted and unmatched rows deleted.
+        Returns whether anything changed.
+        """
+        existing: Dict[int, List[RecipeIngredientDB]] = defaultdict(list)
+        for db_ingredient in db_recipe.ingredients:
+            existing[db_ingredient.product_id].append(db_ingredient)
+
+        changed = False
+        kept = []
+        for ingredient in ingredients:
+            candidates = existing.get(ingredient.product_id)
+            if candidates:
+                db_ingredient = candidates.pop(0)
+                if (db_ingredient.amount, db_ingredient.unit) != (
+                    ingredient.amount,
+                    ingredient.unit,
+                ):
+                    db_ingredient.amount = ingredient.amount
+                    db_ingredient.unit = ingredient.unit
+                    changed = True
+            else:
+                db_ingredient = RecipeIngredientDB(**ingredient.dict())
+                changed = True
+            kept.append(db_ingredient)
+
+        if changed or len(kept) != len(db_recipe.ingredients):
+            # Rows left out of the collection are deleted as orphans
+            db_recipe.ingredients = kept
+            return True
+        return False
+
+    def _apply_ingredient_operation(
+        self, db_recipe: RecipeDB, operation: RecipeIngredientOperation
+    ) -> None:
+        if operation.op == "add":
+            if operation.product_id is None or operation.amount is None:
+                raise ValueError("Adding an ingredient requires product_id and amount")
+            db_recipe.ingredients.append(
+                RecipeIngredientDB(
+                    product_id=operation.product_id,
+                    amount=operation.amount,
+                    unit=operation.unit or "gram",
+                )
             )
-            self.db.add(db_ingredient)
+            return
 
+        db_ingredient = next(
+            (i for i in db_recipe.ingredients if i.id == operation.id), None
+        )
+        if db_ingredient is None:
+            raise ValueError(f"Ingredient {operation.id} not found in this recipe")
+        if operation.op == "remove":
+            db_recipe.ingredients.remove(db_ingredient)
+            return
+        for key in ("product_id", "amount", "unit"):
+            value = getattr(operation, key)
+            if value is not None:
+                setattr(db_ingredient, key, value)
+
+    def _save(self, db_recipe: RecipeDB, refresh_nutrition: bool) -> RecipeDB:
+        self.db.flush()
+        if refresh_nutrition:
+            RecipeNutritionRepository(self.db).refresh([db_recipe.id])
+            DailyNutritionTotalsRepository(self.db).rebuild_for_recipes([db_recipe.id])
+        self._bump_version()
         self.db.commit()
-        self.db.refresh(db_recipe)
-        return db_recipe
+        return self.get_recipe_by_id(db_recipe.id)
 
     def delete_recipe(self, recipe_id: int) -> bool:
         db_recipe = self.get_recipe_by_id(recipe_id)
         if db_recipe:
             self.db.delete(db_recipe)
+            self._bump_version()
             self.db.commit()
             return True
         return False
+
+    def update_recipe_image(self, recipe_id: int, image_url: str) -> Optional[RecipeDB]:
+        db_recipe = self.get_recipe_by_id(recipe_id)
+        if db_recipe:
+            db_recipe.image_url = image_url
+            self._bump_version()
+            self.db.commit()
+            self.db.refresh(db_recipe)
+        return db_recipe
+
+    def get_image_url(self, recipe_id: int) -> Optional[str]:
+        return (
+            self.db.query(RecipeDB.image_url).filter(RecipeDB.id == recipe_id).scalar()
+        )
+
+    def image_in_use(self, filename: str) -> bool:
+        """Whether any recipe still refers to a stored image file"""
+        return (
+            self.db.query(RecipeDB.id)
+            .filter(RecipeDB.image_url.endswith(f"/{filename}"))
+            .first()
+            is not None
+        )
+
+    def _bump_version(self) -> None:
+        VersionRepository(self.db).bump(RecipeDB.__tablename__)
+
+    def get_ingredient_amounts(
+        self, recipe_ids: List[int]
+    ) -> Dict[int, Tuple[int, List[Tuple[int, float]]]]:
+        """Map recipe id to (servings, [(product_id, amount)]) in one narrow query"""
+        rows = (
+            self.db.query(
+                RecipeDB.id,
+                RecipeDB.servings,
+                RecipeIngredientDB.product_id,
+                RecipeIngredientDB.amount,
+            )
+            .outerjoin(RecipeIngredientDB, RecipeIngredientDB.recipe_id == RecipeDB.id)
+            .filter(RecipeDB.id.in_(recipe_ids))
+            .all()
+        )
+
+        recipes: Dict[int, Tuple[int, List[Tuple[int, float]]]] = {}
+        for recipe_id, servings, product_id, amount in rows:
+            _, ingredients = recipes.setdefault(recipe_id, (servings, []))
+            if product_id is not None:
+                ingredients.append((product_id, amount))
+        return recipes
@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from typing import Iterable, Optional, Tuple
+from models.table_version import TableVersionDB
+from utils.upsert import dialect_insert
+
+
+class VersionRepository:
+    """Reads and bumps the per-table change counters.
+
+    bump() only executes SQL; the calling repository commits, so the counter
+    changes in the same transaction as the data it describes.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def bump(self, *table_names: str) -> None:
+        """Add one to each counter, creating the ones that do not exist yet.
+
+        One INSERT ... ON CONFLICT, so concurrent first writes to a table
+        cannot both try to insert its counter. Tables are locked in name
+        order to keep concurrent bumps of several tables from deadlocking.
+        """
+        if not table_names:
+            return
+        now = datetime.now(timezone.utc)
+        upsert = dialect_insert(self.db, TableVersionDB).values(
+            [
+                {"table_name": table_name, "version": 1, "updated_at": now}
+                for table_name in sorted(set(table_names))
+            ]
+        )
+        self.db.execute(
+            upsert.on_conflict_do_update(
+                index_elements=[TableVersionDB.table_name],
+                set_={
+                    "version": TableVersionDB.version + 1,
+                    "updated_at": upsert.excluded.updated_at,
+                },
+            )
+        )
+
+    def get_versions(
+        self, table_names: Iterable[str]
+    ) -> Tuple[Tuple[int, ...], Optional[datetime]]:
+        """Versions in the given order plus the latest change time.
+
+        Tables that were never written have version 0.
+        """
+        table_names = list(table_names)
+        rows = self.db.execute(
+            select(
+                TableVersionDB.table_name,
+                TableVersionDB.version,
+                TableVersionDB.updated_at,
+            ).where(TableVersionDB.table_name.in_(table_names))
+        ).all()
+        versions = {row.table_name: row.version for row in rows}
+        changed = [row.updated_at for row in rows if row.updated_at]
+        return (
+            tuple(versions.get(table_name, 0) for table_name in table_names),
+            max(changed) if changed else None,
+        )
@@ -1,7 +1,25 @@
+from sqlalchemy import Float, case, cast, func, insert, select
 from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
 from datetime import date
-from models.weekmenu import WeekMenuDB, MenuDayDB, WeekMenuCreate
+from models.weekmenu import (
+    WeekMenuDB,
+    MenuDayDB,
+    MenuDayCreate,
+    MenuDayPatch,
+    WeekMenuCreate,
+)
+from models.product import ProductDB
+from models.recipe import RecipeDB, RecipeIngredientDB
+from repositories.change_repository import (
+    ChangeRepository,
+    menu_day_event,
+    menu_day_removed_event,
+    week_menu_event,
+    week_menu_removed_event,
+)
+from repositories.version_repository import VersionRepository
 
 
 class WeekMenuRepository:
@@ -15,27 +33,43 @@ class WeekMenuRepository:
         self.db.add(db_week_menu)
         self.db.flush()
 
-        # Add days
-        for day_data in week_menu.days:
-            db_day = MenuDayDB(week_menu_id=db_week_menu.id, **day_data.dict())
-            self.db.add(db_day)
-
+        days = self._insert_days(db_week_menu.id, week_menu)
+        self._bump_version()
+        self._publish(
+            [week_menu_event(db_week_menu)]
+            + [menu_day_event(db_week_menu.id, day) for day in days]
+        )
         self.db.commit()
-        self.db.refresh(db_week_menu)
-        return db_week_menu
+        return self.get_week_menu_by_id(db_week_menu.id)
 
-    def get_all_week_menus(self) -> List[WeekMenuDB]:
-        return (
-            self.db.query(WeekMenuDB)
-            .options(joinedload(WeekMenuDB.days).joinedload(MenuDayDB.recipe))
-            .order_by(WeekMenuDB.start_date.desc())
-            .all()
+    def get_all_week_menus(
+        self, date_from: Optional[date] = None, date_to: Optional[date] = None
+    ) -> List[WeekMenuDB]:
+        """Menus overlapping [date_from, date_to], newest first; a missing
+        bound leaves that side open.
+
+        The end_date bound is the selective one for recent windows and is
+        served by ix_week_menus_end_date, start_date by its own index.
+        """
+        query = self.db.query(WeekMenuDB).options(
+            joinedload(WeekMenuDB.days)
+            .joinedload(MenuDayDB.recipe)
+            .joinedload(RecipeDB.nutrition)
         )
+        if date_from is not None:
+            query = query.filter(WeekMenuDB.end_date >= date_from)
+        if date_to is not None:
+            query = query.filter(WeekMenuDB.start_date <= date_to)
+        return query.order_by(WeekMenuDB.start_date.desc()).all()
 
     def get_week_menu_by_id(self, menu_id: int) -> Optional[WeekMenuDB]:
         return (
             self.db.query(WeekMenuDB)
-            .options(joinedload(WeekMenuDB.days).joinedload(MenuDayDB.recipe))
+            .options(
+                joinedload(WeekMenuDB.days)
+                .joinedload(MenuDayDB.recipe)
+                .joinedload(RecipeDB.nutrition)
+            )
             .filter(WeekMenuDB.id == menu_id)
             .first()
         )
@@ -45,17 +79,31 @@ class WeekMenuRepository:
     ) -> Optional[WeekMenuDB]:
         return (
             self.db.query(WeekMenuDB)
-            .options(joinedload(WeekMenuDB.days).joinedload(MenuDayDB.recipe))
+            .options(
+                joinedload(WeekMenuDB.days)
+                .joinedload(MenuDayDB.recipe)
+                .joinedload(RecipeDB.nutrition)
+            )
             .filter(
                 WeekMenuDB.start_date == start_date, WeekMenuDB.end_date == end_date
             )
             .first()
         )
 
+    def get_days_on(self, day_date: date) -> List[MenuDayDB]:
+        """Menu days planned on one date, through ix_menu_days_date"""
+        return (
+            self.db.query(MenuDayDB)
+            .options(joinedload(MenuDayDB.recipe).joinedload(RecipeDB.nutrition))
+            .filter(MenuDayDB.date == day_date)
+            .order_by(MenuDayDB.week_menu_id)
+            .all()
+        )
+
     def update_week_menu(
         self, menu_id: int, menu_data: WeekMenuCreate
     ) -> Optional[WeekMenuDB]:
-        db_menu = self.get_week_menu_by_id(menu_id)
+        db_menu = self._get_menu_with_days(menu_id)
         if not db_menu:
             return None
 
@@ -64,22 +112,211 @@ class WeekMenuRepository:
         for key, value in menu_dict.items():
             setattr(db_menu, key, value)
 
-        # Delete existing days
-        self.db.query(MenuDayDB).filter(MenuDayDB.week_menu_id == menu_id).delete()
+        changed_ids, removed = self._sync_days(db_menu, menu_data.days)
+        self._bump_version()
+        self._publish(
+            [week_menu_event(db_menu)] + self._day_events(db_menu, changed_ids, removed)
+        )
+        self.db.commit()
+        return self.get_week_menu_by_id(menu_id)
+
+    def update_week_menu_days(
+        self, menu_id: int, days: List[MenuDayCreate]
+    ) -> Optional[Tuple[List[MenuDayDB], List[date]]]:
+        """Reconcile the days of a menu; returns the written days and the
+        dates of removed days"""
+        db_menu = self._get_menu_with_days(menu_id)
+        if not db_menu:
+            return None
+
+        changed_ids, removed = self._sync_days(db_menu, days)
+        if changed_ids or removed:
+            self._bump_version()
+            self._publish(self._day_events(db_menu, changed_ids, removed))
+            self.db.commit()
+        return self._get_days(changed_ids), removed
 
-        # Add new days
-        for day_data in menu_data.days:
-            db_day = MenuDayDB(week_menu_id=menu_id, **day_data.dict())
+    def patch_day(
+        self, menu_id: int, day_date: date, patch: MenuDayPatch
+    ) -> Optional[MenuDayDB]:
+        """Change one day of a menu, adding it when the menu has no day there"""
+        db_menu = self.db.get(WeekMenuDB, menu_id)
+        if not db_menu:
+            return None
+        if not db_menu.start_date <= day_date <= db_menu.end_date:
+            raise ValueError(f"{day_date} is outside the week menu")
+
+        changes = patch.dict(exclude_unset=True)
+        for key in ("servings", "add_to_shopping_list"):
+            if key in changes and changes[key] is None:
+                raise ValueError(f"{key} cannot be empty")
+
+        db_day = (
+            self.db.query(MenuDayDB)
+            .filter(MenuDayDB.week_menu_id == menu_id, MenuDayDB.date == day_date)
+            .first()
+        )
+        if db_day is None:
+            if "servings" not in changes:
+                raise ValueError("servings is required for a new day")
+            db_day = MenuDayDB(week_menu_id=menu_id, date=day_date)
             self.db.add(db_day)
+        for key, value in changes.items():
+            setattr(db_day, key, value)
 
+        self.db.flush()
+        self._bump_version()
+        self._publish([menu_day_event(menu_id, db_day)])
         self.db.commit()
-        self.db.refresh(db_menu)
-        return db_menu
+        return self._get_days([db_day.id])[0]
 
     def delete_week_menu(self, menu_id: int) -> bool:
         db_menu = self.get_week_menu_by_id(menu_id)
         if db_menu:
             self.db.delete(db_menu)
+            self._bump_version()
+            self._publish([week_menu_removed_event(menu_id)])
             self.db.commit()
             return True
         return False
+
+    def _get_menu_with_days(self, menu_id: int) -> Optional[WeekMenuDB]:
+        # Only the day rows; recipes are not needed to compare days
+        return (
+            self.db.query(WeekMenuDB)
+            .options(joinedload(WeekMenuDB.days))
+            .filter(WeekMenuDB.id == menu_id)
+            .first()
+        )
+
+    def _get_days(self, day_ids: List[int]) -> List[MenuDayDB]:
+        if not day_ids:
+            return []
+        return (
+            self.db.query(MenuDayDB)
+            .options(joinedload(MenuDayDB.recipe).joinedload(RecipeDB.nutrition))
+            .filter(MenuDayDB.id.in_(day_ids))
+            .order_by(MenuDayDB.date)
+            .all()
+        )
+
+    def _sync_days(
+        self, db_menu: WeekMenuDB, days: List[MenuDayCreate]
+    ) -> Tuple[List[int], List[date]]:
+        """Reconcile the day rows of a menu with the requested days.
+
+        Days are matched on date, so unchanged days keep their row and are
+        not written; changed days are updated in place, new dates inserted
+        and dates that are no longer sent deleted. Returns the ids of the
+        written days and the removed dates. Dates outside the menu are
+        rejected with a ValueError, as in patch_day.
+        """
+        for day in days:
+            if not db_menu.start_date <= day.date <= db_menu.end_date:
+                raise ValueError(f"{day.date} is outside the week menu")
+
+        existing: Dict[date, List[MenuDayDB]] = defaultdict(list)
+        for db_day in db_menu.days:
+            existing[db_day.date].append(db_day)
+
+        changed, kept = [], []
+        for day in days:
+            values = day.dict()
+            candidates = existing.get(day.date)
+            if candidates:
+                db_day = candidates.pop(0)
+                if any(getattr(db_day, key) != value for key, value in values.items()):
+                    for key, value in values.items():
+                        setattr(db_day, key, value)
+                    changed.append(db_day)
+            else:
+                db_day = MenuDayDB(**values)
+                changed.append(db_day)
+            kept.append(db_day)
+
+        removed = sorted(db_day.date for rows in existing.values() for db_day in rows)
+        if changed or removed:
+            # Days left out of the collection are deleted as orphans
+            db_menu.days = kept
+            self.db.flush()
+        return [db_day.id for db_day in changed], removed
+
+    def _insert_days(self, menu_id: int, menu_data: WeekMenuCreate) -> List:
+        # One multi-row INSERT; the menu is reloaded with its days afterwards
+        if not menu_data.days:
+            return []
+        return self.db.execute(
+            insert(MenuDayDB).returning(
+                MenuDayDB.id,
+                MenuDayDB.date,
+                MenuDayDB.recipe_id,
+                MenuDayDB.servings,
+                MenuDayDB.add_to_shopping_list,
+            ),
+            [
+                {"week_menu_id": menu_id, **day_data.dict()}
+                for day_data in menu_data.days
+            ],
+        ).all()
+
+    def _day_events(
+        self, db_menu: WeekMenuDB, changed_ids: List[int], removed: List[date]
+    ) -> List[dict]:
+        return [
+            menu_day_event(db_menu.id, db_day)
+            for db_day in db_menu.days
+            if db_day.id in changed_ids
+        ] + [menu_day_removed_event(db_menu.id, day_date) for day_date in removed]
+
+    def _bump_version(self) -> None:
+        VersionRepository(self.db).bump(WeekMenuDB.__tablename__)
+
+    def _publish(self, events: List[dict]) -> None:
+        ChangeRepository(self.db).publish(events)
+
+    def get_shopping_list_items(self, menu_id: int) -> List:
+        """Summed ingredient amounts of one week menu"""
+        return self._aggregate_ingredients(MenuDayDB.week_menu_id == menu_id)
+
+    def get_shopping_list_items_for_range(self, date_from: date, date_to: date) -> List:
+        """Summed ingredient amounts of all menu days in a date range.
+
+        Days are selected by their own date, so every menu overlapping the
+        range contributes the days that fall inside it.
+        """
+        return self._aggregate_ingredients(MenuDayDB.date.between(date_from, date_to))
+
+    def _aggregate_ingredients(self, condition) -> List:
+        """One GROUP BY over menu days, recipes and ingredients.
+
+        Amounts are scaled by day servings / recipe servings (1 when the day
+        has no servings) and days not marked add_to_shopping_list are skipped.
+        Rows hold product_id, product_name, unit and amount.
+        """
+        multiplier = case(
+            (
+                MenuDayDB.servings > 0,
+                cast(MenuDayDB.servings, Float) / RecipeDB.servings,
+            ),
+            else_=1.0,
+        )
+        query = (
+            select(
+                RecipeIngredientDB.product_id,
+                ProductDB.name.label("product_name"),
+                RecipeIngredientDB.unit,
+                func.sum(RecipeIngredientDB.amount * multiplier).label("amount"),
+            )
+            .select_from(MenuDayDB)
+            .join(RecipeDB, RecipeDB.id == MenuDayDB.recipe_id)
+            .join(RecipeIngredientDB, RecipeIngredientDB.recipe_id == RecipeDB.id)
+            .join(ProductDB, ProductDB.id == RecipeIngredientDB.product_id)
+            .where(MenuDayDB.add_to_shopping_list.is_(True), condition)
+            .group_by(
+                RecipeIngredientDB.product_id,
+                ProductDB.name,
+                RecipeIngredientDB.unit,
+            )
+            .order_by(ProductDB.name, RecipeIngredientDB.unit)
+        )
+        return self.db.execute(query).all()
@@ -1,23 +1,77 @@
 # backend/routes/daily_food_routes.py
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
+from typing import List, Optional
 
 from models.daily_food_log import (
+    DailyFoodEntryBatch,
     DailyFoodEntryCreate,
     DailyFoodLogResponse,
     DailyFoodEntryResponse,
+    DailyFoodRangeEntry,
+    DailyFoodSummaryResponse,
+    DailyFoodTotalsResponse,
 )
 from services.daily_food_service import DailyFoodService
-from repositories.daily_food_repository import DailyFoodRepository
-from config.database import get_db
+from repositories.async_repositories import AsyncDailyFoodRepository, AsyncSessionProxy
+from config.database import get_async_db
 
 router = APIRouter(prefix="/api/daily-food", tags=["daily-food"])
 
+VALID_MEAL_TYPES = ["ontbijt", "lunch", "diner", "tussendoortje"]
 
-def get_daily_food_service(db: Session = Depends(get_db)) -> DailyFoodService:
-    daily_food_repo = DailyFoodRepository(db)
-    return DailyFoodService(daily_food_repo)
+
+def get_daily_food_service(
+    db: AsyncSession = Depends(get_async_db),
+) -> AsyncSessionProxy:
+    return AsyncDailyFoodRepository(db).service(DailyFoodService)
+
+
+def validate_new_entry(entry: DailyFoodEntryCreate) -> None:
+    # Validate that either product_id or recipe_id is provided, not both
+    if not entry.product_id and not entry.recipe_id:
+        raise HTTPException(
+            status_code=400,
+            detail="Either product_id or recipe_id must be provided",
+        )
+    if entry.product_id and entry.recipe_id:
+        raise HTTPException(
+            status_code=400, detail="Cannot provide both product_id and recipe_id"
+        )
+
+    if entry.meal_type not in VALID_MEAL_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid meal_type. Must be one of: {VALID_MEAL_TYPES}",
+        )
+
+
+@router.get("/", response_model=List[DailyFoodRangeEntry])
+async def get_entries(
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    daily_food_service: DailyFoodService = Depends(get_daily_food_service),
+):
+    """Get all entries of a date range with their nutrient totals"""
+    try:
+        return await daily_food_service.get_entries(date_from, date_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/totals", response_model=DailyFoodTotalsResponse)
+async def get_totals(
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    group: str = Query("day", pattern="^(day|week|month|meal_type)$"),
+    daily_food_service: DailyFoodService = Depends(get_daily_food_service),
+):
+    """Get nutrient totals of a date range per day, week or meal type"""
+    try:
+        return await daily_food_service.get_totals(date_from, date_to, group)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/{log_date}", response_model=DailyFoodLogResponse)
@@ -26,7 +80,16 @@ async def get_daily_log(
     daily_food_service: DailyFoodService = Depends(get_daily_food_service),
 ):
     """Get daily food log for specific date"""
-    return daily_food_service.get_daily_log(log_date)
+    return await daily_food_service.get_daily_log(log_date)
+
+
+@router.get("/{log_date}/summary", response_model=DailyFoodSummaryResponse)
+async def get_daily_summary(
+    log_date: date,
+    daily_food_service: DailyFoodService = Depends(get_daily_food_service),
+):
+    """Get nutrient totals per entry and per meal type, without ingredients"""
+    return await daily_food_service.get_daily_summary(log_date)
 
 
 @router.post("/{log_date}/entries", response_model=DailyFoodEntryResponse)
@@ -37,25 +100,42 @@ async def add_entry(
 ):
     """Add entry to daily log"""
     try:
-        # Validate that either product_id or recipe_id is provided, not both
-        if not entry.product_id and not entry.recipe_id:
-            raise HTTPException(
-                status_code=400,
-                detail="Either product_id or recipe_id must be provided",
-            )
-        if entry.product_id and entry.recipe_id:
-            raise HTTPException(
-                status_code=400, detail="Cannot provide both product_id and recipe_id"
-            )
+        validate_new_entry(entry)
+        return await daily_food_service.add_entry(log_date, entry)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        valid_meal_types = ["ontbijt", "lunch", "diner", "tussendoortje"]
-        if entry.meal_type not in valid_meal_types:
+
+@router.post("/{log_date}/entries/batch", response_model=List[DailyFoodEntryResponse])
+async def add_entries(
+    log_date: date,
+    batch: DailyFoodEntryBatch,
+    daily_food_service: DailyFoodService = Depends(get_daily_food_service),
+):
+    """Add several entries to a daily log in one transaction"""
+    try:
+        for entry in batch.entries:
+            validate_new_entry(entry)
+        return await daily_food_service.add_entries(log_date, batch.entries)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/{log_date}/copy", response_model=List[DailyFoodEntryResponse])
+async def copy_entries(
+    log_date: date,
+    source_date: date = Query(..., alias="from"),
+    meal_type: Optional[str] = Query(None),
+    daily_food_service: DailyFoodService = Depends(get_daily_food_service),
+):
+    """Copy the entries of another day, or of one of its meals, to this day"""
+    try:
+        if meal_type is not None and meal_type not in VALID_MEAL_TYPES:
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid meal_type. Must be one of: {valid_meal_types}",
+                detail=f"Invalid meal_type. Must be one of: {VALID_MEAL_TYPES}",
             )
-
-        return daily_food_service.add_entry(log_date, entry)
+        return await daily_food_service.copy_entries(log_date, source_date, meal_type)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -79,7 +159,7 @@ async def update_entry(
                 status_code=400, detail="Cannot provide both product_id and recipe_id"
             )
 
-        updated_entry = daily_food_service.update_entry(entry_id, entry)
+        updated_entry = await daily_food_service.update_entry(entry_id, entry)
         if not updated_entry:
             raise HTTPException(status_code=404, detail="Entry not found")
         return updated_entry
@@ -94,7 +174,7 @@ async def delete_entry(
 ):
     """Delete entry"""
     try:
-        success = daily_food_service.delete_entry(entry_id)
+        success = await daily_food_service.delete_entry(entry_id)
         if not success:
             raise HTTPException(status_code=404, detail="Entry not found")
         return {"message": "Entry successfully deleted"}
@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from utils.change_feed import change_broker, event_stream
+
+router = APIRouter(prefix="/api/events", tags=["events"])
+
+
+@router.get("/")
+async def stream_events():
+    """Server-sent events for daily log entries and week menus.
+
+    Events are entry.added, entry.updated, entry.removed, menu_day.changed,
+    menu_day.removed, week_menu.changed and week_menu.removed, each carrying
+    only the changed row's own columns. resync means events were missed and
+    the client should refetch what it shows.
+    """
+    return StreamingResponse(
+        event_stream(change_broker),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
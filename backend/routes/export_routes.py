@@ -0,0 +1,39 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from typing import Optional
+from datetime import date
+
+from services.export_service import ExportService, EXPORT_FORMATS
+from config.database import SessionLocal
+
+router = APIRouter(prefix="/api/export", tags=["export"])
+
+
+def get_export_service() -> ExportService:
+    return ExportService(SessionLocal)
+
+
+@router.get("/{resource}")
+async def export_resource(
+    resource: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
+    export_service: ExportService = Depends(get_export_service),
+):
+    """Stream products, recipes, weekmenus or daily-food as NDJSON or CSV"""
+    try:
+        chunks = export_service.stream(resource, format, date_from, date_to)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Unknown export resource")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    extension = "csv" if format == "csv" else "ndjson"
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_FORMATS[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{resource}.{extension}"'
+        },
+    )
@@ -1,18 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 
-from models.product import ProductCreate, ProductResponse
+from models.product import (
+    ProductCreate,
+    ProductBatchUpdate,
+    ProductBatchResponse,
+    ProductResponse,
+    ProductPage,
+    ProductFilter,
+    ProductSearchResult,
+)
 from services.product_service import ProductService
-from repositories.product_repository import ProductRepository
-from config.database import get_db
+from repositories.async_repositories import AsyncProductRepository, AsyncSessionProxy
+from config.database import get_async_db
+from utils.http_cache import conditional_get
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/api/products", tags=["products"])
 
 
-def get_product_service(db: Session = Depends(get_db)) -> ProductService:
-    product_repo = ProductRepository(db)
-    return ProductService(product_repo)
+def get_product_service(
+    db: AsyncSession = Depends(get_async_db),
+) -> AsyncSessionProxy:
+    return AsyncProductRepository(db).service(ProductService)
 
 
 @router.post("/", response_model=ProductResponse)
@@ -21,23 +32,77 @@ async def create_product(
     product_service: ProductService = Depends(get_product_service),
 ):
     try:
-        return product_service.create_product(product)
+        return await product_service.create_product(product)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/", response_model=List[ProductResponse])
+@router.post("/batch", response_model=ProductBatchResponse)
+async def create_products(
+    products: List[ProductCreate],
+    product_service: ProductService = Depends(get_product_service),
+):
+    """Create many products in a single transaction"""
+    try:
+        return await product_service.create_products(products)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.put("/batch", response_model=ProductBatchResponse)
+async def update_products(
+    products: List[ProductBatchUpdate],
+    product_service: ProductService = Depends(get_product_service),
+):
+    """Update many products by id in a single transaction"""
+    try:
+        return await product_service.update_products(products)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get(
+    "/", response_model=ProductPage, dependencies=[Depends(conditional_get("products"))]
+)
 async def get_all_products(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    sort: str = Query("id", pattern="^(id|name)$"),
+    filters: ProductFilter = Depends(),
+    product_service: ProductService = Depends(get_product_service),
+):
+    """Get one page of products; pass next_cursor back as cursor for the next page"""
+    try:
+        return await product_service.get_products_page(
+            limit, cursor=cursor, sort=sort, filters=filters
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get(
+    "/search",
+    response_model=List[ProductSearchResult],
+    dependencies=[Depends(conditional_get("products"))],
+)
+async def search_products(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(10, ge=1, le=50),
     product_service: ProductService = Depends(get_product_service),
 ):
-    return product_service.get_all_products()
+    """Typo-tolerant product name autocomplete"""
+    return await product_service.search_products(q, limit)
 
 
-@router.get("/{product_id}", response_model=ProductResponse)
+@router.get(
+    "/{product_id}",
+    response_model=ProductResponse,
+    dependencies=[Depends(conditional_get("products"))],
+)
 async def get_product(
     product_id: int, product_service: ProductService = Depends(get_product_service)
 ):
-    product = product_service.get_product_by_id(product_id)
+    product = await product_service.get_product_by_id(product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
@@ -50,7 +115,7 @@ async def update_product(
     product_service: ProductService = Depends(get_product_service),
 ):
     try:
-        updated_product = product_service.update_product(product_id, product)
+        updated_product = await product_service.update_product(product_id, product)
         if not updated_product:
             raise HTTPException(status_code=404, detail="Product not found")
         return updated_product
@@ -63,7 +128,7 @@ async def delete_product(
     product_id: int, product_service: ProductService = Depends(get_product_service)
 ):
     try:
-        success = product_service.delete_product(product_id)
+        success = await product_service.delete_product(product_id)
         if not success:
             raise HTTPException(status_code=404, detail="Product not found")
         return {"message": "Product successfully deleted"}
@@ -1,21 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import (
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    File,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    UploadFile,
+)
 from fastapi.responses import FileResponse
-import uuid
 from pathlib import Path
-from sqlalchemy.orm import Session
-from typing import List
-
-from models.recipe import RecipeCreate, RecipeResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional, Tuple, Union
+
+from models.recipe import (
+    RecipeCreate,
+    RecipePage,
+    RecipePatch,
+    RecipeResponse,
+    RecipeSummaryPage,
+)
+from models.nutrition import RecipeNutritionRequest, RecipeNutritionResponse
 from services.recipe_service import RecipeService
+from services.nutrition_service import NutritionService
 from repositories.recipe_repository import RecipeRepository
-from config.database import get_db
+from repositories.product_repository import ProductRepository
+from repositories.async_repositories import AsyncRecipeRepository, AsyncSessionProxy
+from config.database import get_async_db
+from utils.http_cache import conditional_get, is_not_modified
+from utils.image_store import recipe_image_store
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/api/recipes", tags=["recipes"])
 
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def get_recipe_service(db: AsyncSession = Depends(get_async_db)) -> AsyncSessionProxy:
+    return AsyncRecipeRepository(db).service(RecipeService)
 
-def get_recipe_service(db: Session = Depends(get_db)) -> RecipeService:
-    recipe_repo = RecipeRepository(db)
-    return RecipeService(recipe_repo)
+
+def get_nutrition_service(
+    db: AsyncSession = Depends(get_async_db),
+) -> AsyncSessionProxy:
+    return AsyncSessionProxy(
+        db,
+        lambda session: NutritionService(
+            RecipeRepository(session), ProductRepository(session)
+        ),
+    )
 
 
 @router.post("/", response_model=RecipeResponse)
@@ -23,21 +58,74 @@ async def create_recipe(
     recipe: RecipeCreate, recipe_service: RecipeService = Depends(get_recipe_service)
 ):
     try:
-        return recipe_service.create_recipe(recipe)
+        return await recipe_service.create_recipe(recipe)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/", response_model=List[RecipeResponse])
-async def get_all_recipes(recipe_service: RecipeService = Depends(get_recipe_service)):
-    return recipe_service.get_all_recipes()
+@router.get(
+    "/",
+    response_model=Union[RecipePage, RecipeSummaryPage],
+    dependencies=[Depends(conditional_get("recipes"))],
+)
+async def get_all_recipes(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+    sort: str = Query("id", pattern="^(id|name)$"),
+    view: str = Query("full", pattern="^(full|summary)$"),
+    recipe_service: RecipeService = Depends(get_recipe_service),
+):
+    """Get one page of recipes; view=summary returns only the overview columns
+    and the ingredient count. Pass next_cursor back as cursor for the next page"""
+    try:
+        return await recipe_service.get_recipes_page(
+            limit, cursor=cursor, sort=sort, view=view
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/{recipe_id}", response_model=RecipeResponse)
+@router.post("/nutrition", response_model=List[RecipeNutritionResponse])
+async def calculate_recipes_nutrition(
+    request: RecipeNutritionRequest,
+    nutrition_service: NutritionService = Depends(get_nutrition_service),
+):
+    """Calculate nutrition for many saved recipes and unsaved drafts at once"""
+    try:
+        return await nutrition_service.get_recipes_nutrition(
+            request.recipe_ids, request.drafts
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get(
+    "/{recipe_id}/nutrition",
+    response_model=RecipeNutritionResponse,
+    dependencies=[Depends(conditional_get("recipes"))],
+)
+async def get_recipe_nutrition(
+    recipe_id: int,
+    nutrition_service: NutritionService = Depends(get_nutrition_service),
+):
+    try:
+        nutrition = await nutrition_service.get_recipe_nutrition(recipe_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not nutrition:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    return nutrition
+
+
+@router.get(
+    "/{recipe_id}",
+    response_model=RecipeResponse,
+    dependencies=[Depends(conditional_get("recipes"))],
+)
 async def get_recipe(
     recipe_id: int, recipe_service: RecipeService = Depends(get_recipe_service)
 ):
-    recipe = recipe_service.get_recipe_by_id(recipe_id)
+    recipe = await recipe_service.get_recipe_by_id(recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
     return recipe
@@ -50,7 +138,7 @@ async def update_recipe(
     recipe_service: RecipeService = Depends(get_recipe_service),
 ):
     try:
-        updated_recipe = recipe_service.update_recipe(recipe_id, recipe)
+        updated_recipe = await recipe_service.update_recipe(recipe_id, recipe)
         if not updated_recipe:
             raise HTTPException(status_code=404, detail="Recipe not found")
         return updated_recipe
@@ -58,12 +146,29 @@ async def update_recipe(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.patch("/{recipe_id}", response_model=RecipeResponse)
+async def patch_recipe(
+    recipe_id: int,
+    patch: RecipePatch,
+    recipe_service: RecipeService = Depends(get_recipe_service),
+):
+    """Change only the fields that are sent; ingredient_operations add, update
+    or remove single ingredient lines"""
+    try:
+        updated_recipe = await recipe_service.patch_recipe(recipe_id, patch)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not updated_recipe:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    return updated_recipe
+
+
 @router.delete("/{recipe_id}")
 async def delete_recipe(
     recipe_id: int, recipe_service: RecipeService = Depends(get_recipe_service)
 ):
     try:
-        success = recipe_service.delete_recipe(recipe_id)
+        success = await recipe_service.delete_recipe(recipe_id)
         if not success:
             raise HTTPException(status_code=404, detail="Recipe not found")
         return {"message": "Recipe successfully deleted"}
@@ -71,19 +176,15 @@ async def delete_recipe(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-# Voeg toe na de bestaande imports
-UPLOAD_DIR = Path("uploads/recipes")
-UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
-
-
 @router.post("/{recipe_id}/image")
 async def upload_recipe_image(
     recipe_id: int,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     recipe_service: RecipeService = Depends(get_recipe_service),
 ):
     # Check if recipe exists
-    recipe = recipe_service.get_recipe_by_id(recipe_id)
+    recipe = await recipe_service.get_recipe_by_id(recipe_id)
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
@@ -91,26 +192,56 @@ async def upload_recipe_image(
     if not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
 
-    # Generate unique filename
-    file_extension = file.filename.split(".")[-1] if "." in file.filename else "jpg"
-    unique_filename = f"{uuid.uuid4()}.{file_extension}"
-    file_path = UPLOAD_DIR / unique_filename
+    # Stream to a content-addressed file, so re-uploads are stored once; the
+    # extension comes from the detected format, not the client's file name
+    try:
+        async with recipe_image_store.save(file.file) as filename:
+            # Update recipe with image URL while the upload is held
+            image_url = f"/api/recipes/{recipe_id}/image/{filename}"
+            await recipe_service.update_recipe_image(recipe_id, image_url)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    # Save file
-    with open(file_path, "wb") as buffer:
-        content = await file.read()
-        buffer.write(content)
+    # Thumbnails are rendered after the response has been sent
+    background_tasks.add_task(recipe_image_store.generate_renditions, filename)
+    return {"image_url": image_url}
 
-    # Update recipe with image URL
-    image_url = f"/api/recipes/{recipe_id}/image/{unique_filename}"
-    updated_recipe = recipe_service.update_recipe_image(recipe_id, image_url)
 
-    return {"image_url": image_url}
+def _find_image(filename: str, w: Optional[int], webp: bool) -> Tuple[Path, bool]:
+    file_path, final = recipe_image_store.variant(filename, w, webp=webp)
+    if not file_path.exists():
+        raise FileNotFoundError(file_path)
+    return file_path, final
 
 
 @router.get("/{recipe_id}/image/{filename}")
-async def get_recipe_image(recipe_id: int, filename: str):
-    file_path = UPLOAD_DIR / filename
-    if not file_path.exists():
+async def get_recipe_image(
+    recipe_id: int,
+    filename: str,
+    request: Request,
+    w: Optional[int] = Query(None, ge=1, le=4096),
+):
+    # Looking for renditions and reading the original's width touch the disk
+    try:
+        file_path, final = await run_in_threadpool(
+            _find_image,
+            filename,
+            w,
+            "image/webp" in request.headers.get("accept", ""),
+        )
+    except (ValueError, FileNotFoundError):
         raise HTTPException(status_code=404, detail="Image not found")
-    return FileResponse(file_path)
+
+    # Stored files are never rewritten, so their name is a strong validator.
+    # A fallback to the original may be replaced by a rendition later on.
+    headers = {"ETag": f'"{file_path.name}"', "Vary": "Accept"}
+    if not final:
+        headers["Cache-Control"] = "public, max-age=300"
+    elif recipe_image_store.is_content_addressed(file_path.name):
+        headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    else:
+        headers["Cache-Control"] = "public, max-age=86400"
+
+    if is_not_modified(request, headers["ETag"], None):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(file_path, headers=headers)
@@ -1,19 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Dict
+from datetime import date
 
 from services.shopping_list_service import ShoppingListService
 from repositories.weekmenu_repository import WeekMenuRepository
 from repositories.product_repository import ProductRepository
-from config.database import get_db
+from repositories.async_repositories import AsyncSessionProxy
+from config.database import get_async_db
 
 router = APIRouter(prefix="/api/shopping-list", tags=["shopping-list"])
 
 
-def get_shopping_list_service(db: Session = Depends(get_db)) -> ShoppingListService:
-    weekmenu_repo = WeekMenuRepository(db)
-    product_repo = ProductRepository(db)
-    return ShoppingListService(weekmenu_repo, product_repo)
+def get_shopping_list_service(
+    db: AsyncSession = Depends(get_async_db),
+) -> AsyncSessionProxy:
+    return AsyncSessionProxy(
+        db,
+        lambda session: ShoppingListService(
+            WeekMenuRepository(session), ProductRepository(session)
+        ),
+    )
+
+
+@router.get("/", response_model=List[Dict])
+async def get_shopping_list_for_range(
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    shopping_service: ShoppingListService = Depends(get_shopping_list_service),
+):
+    """Get one shopping list for all menu days in a date range"""
+    try:
+        return await shopping_service.generate_shopping_list_for_range(
+            date_from, date_to
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/{menu_id}", response_model=List[Dict])
@@ -22,7 +44,7 @@ async def get_shopping_list(
     shopping_service: ShoppingListService = Depends(get_shopping_list_service),
 ):
     try:
-        shopping_list = shopping_service.generate_shopping_list(menu_id)
+        shopping_list = await shopping_service.generate_shopping_list(menu_id)
         return shopping_list
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -1,19 +1,29 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from datetime import date
 
-from models.weekmenu import WeekMenuCreate, WeekMenuResponse
+from models.weekmenu import (
+    MenuDayCreate,
+    MenuDayPatch,
+    MenuDayResponse,
+    PlannedDayResponse,
+    WeekMenuCreate,
+    WeekMenuDayChanges,
+    WeekMenuResponse,
+)
 from services.weekmenu_service import WeekMenuService
-from repositories.weekmenu_repository import WeekMenuRepository
-from config.database import get_db
+from repositories.async_repositories import AsyncSessionProxy, AsyncWeekMenuRepository
+from config.database import get_async_db
+from utils.http_cache import conditional_get
 
 router = APIRouter(prefix="/api/weekmenus", tags=["weekmenus"])
 
 
-def get_weekmenu_service(db: Session = Depends(get_db)) -> WeekMenuService:
-    weekmenu_repo = WeekMenuRepository(db)
-    return WeekMenuService(weekmenu_repo)
+def get_weekmenu_service(
+    db: AsyncSession = Depends(get_async_db),
+) -> AsyncSessionProxy:
+    return AsyncWeekMenuRepository(db).service(WeekMenuService)
 
 
 @router.post("/", response_model=WeekMenuResponse)
@@ -22,25 +32,52 @@ async def create_week_menu(
     weekmenu_service: WeekMenuService = Depends(get_weekmenu_service),
 ):
     try:
-        return weekmenu_service.create_week_menu(menu)
+        return await weekmenu_service.create_week_menu(menu)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/", response_model=List[WeekMenuResponse])
+@router.get(
+    "/",
+    response_model=List[WeekMenuResponse],
+    dependencies=[Depends(conditional_get("weekmenus"))],
+)
 async def get_all_week_menus(
+    date_from: Optional[date] = Query(None, alias="from"),
+    date_to: Optional[date] = Query(None, alias="to"),
     weekmenu_service: WeekMenuService = Depends(get_weekmenu_service),
 ):
-    return weekmenu_service.get_all_week_menus()
+    """Get the week menus overlapping a date window, or all menus without one"""
+    try:
+        return await weekmenu_service.get_all_week_menus(date_from, date_to)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get(
+    "/days/{day_date}",
+    response_model=List[PlannedDayResponse],
+    dependencies=[Depends(conditional_get("weekmenus"))],
+)
+async def get_planned_days(
+    day_date: date,
+    weekmenu_service: WeekMenuService = Depends(get_weekmenu_service),
+):
+    """Get what is planned on a date"""
+    return await weekmenu_service.get_planned_days(day_date)
 
 
-@router.get("/by-date", response_model=WeekMenuResponse)
+@router.get(
+    "/by-date",
+    response_model=WeekMenuResponse,
+    dependencies=[Depends(conditional_get("weekmenus"))],
+)
 async def get_week_menu_by_date_range(
     start_date: date = Query(...),
     end_date: date = Query(...),
     weekmenu_service: WeekMenuService = Depends(get_weekmenu_service),
 ):
-    menu = weekmenu_service.get_week_menu_by_date_range(start_date, end_date)
+    menu = await weekmenu_service.get_week_menu_by_date_range(start_date, end_date)
     if not menu:
         return Response(
             status_code=status.HTTP_204_NO_CONTENT
@@ -48,11 +85,15 @@ async def get_week_menu_by_date_range(
     return menu
 
 
-@router.get("/{menu_id}", response_model=WeekMenuResponse)
+@router.get(
+    "/{menu_id}",
+    response_model=WeekMenuResponse,
+    dependencies=[Depends(conditional_get("weekmenus"))],
+)
 async def get_week_menu(
     menu_id: int, weekmenu_service: WeekMenuService = Depends(get_weekmenu_service)
 ):
-    menu = weekmenu_service.get_week_menu_by_id(menu_id)
+    menu = await weekmenu_service.get_week_menu_by_id(menu_id)
     if not menu:
         raise HTTPException(status_code=404, detail="Week menu not found")
     return menu
@@ -65,7 +106,7 @@ async def update_week_menu(
     weekmenu_service: WeekMenuService = Depends(get_weekmenu_service),
 ):
     try:
-        updated_menu = weekmenu_service.update_week_menu(menu_id, menu)
+        updated_menu = await weekmenu_service.update_week_menu(menu_id, menu)
         if not updated_menu:
             raise HTTPException(status_code=404, detail="Week menu not found")
         return updated_menu
@@ -73,12 +114,46 @@ async def update_week_menu(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.put("/{menu_id}/days", response_model=WeekMenuDayChanges)
+async def update_week_menu_days(
+    menu_id: int,
+    days: List[MenuDayCreate],
+    weekmenu_service: WeekMenuService = Depends(get_weekmenu_service),
+):
+    """Replace the days of a menu, writing only the days that changed; returns
+    the changed days and the dates of removed days"""
+    try:
+        changes = await weekmenu_service.update_week_menu_days(menu_id, days)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if changes is None:
+        raise HTTPException(status_code=404, detail="Week menu not found")
+    return changes
+
+
+@router.patch("/{menu_id}/days/{day_date}", response_model=MenuDayResponse)
+async def patch_week_menu_day(
+    menu_id: int,
+    day_date: date,
+    patch: MenuDayPatch,
+    weekmenu_service: WeekMenuService = Depends(get_weekmenu_service),
+):
+    """Change one day of a menu and return only that day"""
+    try:
+        day = await weekmenu_service.patch_day(menu_id, day_date, patch)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not day:
+        raise HTTPException(status_code=404, detail="Week menu not found")
+    return day
+
+
 @router.delete("/{menu_id}")
 async def delete_week_menu(
     menu_id: int, weekmenu_service: WeekMenuService = Depends(get_weekmenu_service)
 ):
     try:
-        success = weekmenu_service.delete_week_menu(menu_id)
+        success = await weekmenu_service.delete_week_menu(menu_id)
         if not success:
             raise HTTPException(status_code=404, detail="Week menu not found")
         return {"message": "Week menu successfully deleted"}
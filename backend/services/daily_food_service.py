@@ -4,10 +4,33 @@ from models.daily_food_log import (
     DailyFoodLogResponse,
     DailyFoodEntryCreate,
     DailyFoodEntryResponse,
+    DailyFoodEntrySummary,
+    DailyFoodRangeEntry,
+    DailyFoodSummaryResponse,
+    DailyFoodTotalsGroup,
+    DailyFoodTotalsResponse,
+    MealType,
 )
-from typing import Optional
+from models.nutrition import NutritionValues
+from utils.nutrition_matrix import NUTRIENTS
+from typing import List, Optional
 from datetime import date
 
+MAX_RANGE_DAYS = 366
+
+
+def _nutrition(row) -> NutritionValues:
+    return NutritionValues(
+        **{nutrient: getattr(row, nutrient) or 0.0 for nutrient in NUTRIENTS}
+    )
+
+
+def _check_range(date_from: date, date_to: date) -> None:
+    if date_from > date_to:
+        raise ValueError("from must not be after to")
+    if (date_to - date_from).days >= MAX_RANGE_DAYS:
+        raise ValueError(f"A range can span at most {MAX_RANGE_DAYS} days")
+
 
 class DailyFoodService:
     def __init__(self, daily_food_repo: DailyFoodRepository):
@@ -22,6 +45,56 @@ class DailyFoodService:
 
         return self._format_daily_log_response(db_log)
 
+    def get_daily_summary(self, log_date: date) -> DailyFoodSummaryResponse:
+        """Nutrient totals per entry, per meal type and for the whole day"""
+        rows = self.daily_food_repo.get_entry_nutrition(log_date, log_date)
+        entries = [self._format_entry_summary(row) for row in rows]
+
+        meal_totals = {meal_type.value: [] for meal_type in MealType}
+        for entry in entries:
+            meal_totals.setdefault(entry.meal_type, []).append(entry.nutrition)
+
+        return DailyFoodSummaryResponse(
+            date=log_date,
+            entries=entries,
+            meal_types={
+                meal_type: self._sum(values)
+                for meal_type, values in meal_totals.items()
+            },
+            total=self._sum([entry.nutrition for entry in entries]),
+        )
+
+    def get_entries(self, date_from: date, date_to: date) -> List[DailyFoodRangeEntry]:
+        """All entries of a date range with their nutrient totals"""
+        _check_range(date_from, date_to)
+        rows = self.daily_food_repo.get_entry_nutrition(date_from, date_to)
+        return [
+            DailyFoodRangeEntry(
+                date=row.date, **self._format_entry_summary(row).model_dump()
+            )
+            for row in rows
+        ]
+
+    def get_totals(
+        self, date_from: date, date_to: date, group: str = "day"
+    ) -> DailyFoodTotalsResponse:
+        """Nutrient totals of a date range grouped by day, week or meal type"""
+        _check_range(date_from, date_to)
+        rows = self.daily_food_repo.get_nutrition_totals(date_from, date_to, group)
+        groups = [
+            DailyFoodTotalsGroup(
+                key=str(row.key), entries=row.entries, nutrition=_nutrition(row)
+            )
+            for row in rows
+        ]
+        return DailyFoodTotalsResponse(
+            date_from=date_from,
+            date_to=date_to,
+            group=group,
+            groups=groups,
+            total=self._sum([item.nutrition for item in groups]),
+        )
+
     def add_entry(
         self, log_date: date, entry_data: DailyFoodEntryCreate
     ) -> DailyFoodEntryResponse:
@@ -29,6 +102,20 @@ class DailyFoodService:
         db_entry = self.daily_food_repo.add_entry(log_date, entry_data)
         return self._format_entry_response(db_entry)
 
+    def add_entries(
+        self, log_date: date, entries: List[DailyFoodEntryCreate]
+    ) -> List[DailyFoodEntryResponse]:
+        """Add several entries to a daily log at once"""
+        db_entries = self.daily_food_repo.add_entries(log_date, entries)
+        return [self._format_entry_response(entry) for entry in db_entries]
+
+    def copy_entries(
+        self, log_date: date, source_date: date, meal_type: Optional[str] = None
+    ) -> List[DailyFoodEntryResponse]:
+        """Copy the entries of another day, optionally of one meal type only"""
+        db_entries = self.daily_food_repo.copy_entries(log_date, source_date, meal_type)
+        return [self._format_entry_response(entry) for entry in db_entries]
+
     def update_entry(
         self, entry_id: int, entry_data: DailyFoodEntryCreate
     ) -> Optional[DailyFoodEntryResponse]:
@@ -40,6 +127,26 @@ class DailyFoodService:
         """Delete entry"""
         return self.daily_food_repo.delete_entry(entry_id)
 
+    def _format_entry_summary(self, row) -> DailyFoodEntrySummary:
+        return DailyFoodEntrySummary(
+            id=row.id,
+            product_id=row.product_id,
+            recipe_id=row.recipe_id,
+            name=row.name,
+            amount=row.amount,
+            unit=row.unit,
+            meal_type=row.meal_type,
+            nutrition=_nutrition(row),
+        )
+
+    def _sum(self, values: List[NutritionValues]) -> NutritionValues:
+        return NutritionValues(
+            **{
+                nutrient: sum(getattr(value, nutrient) for value in values)
+                for nutrient in NUTRIENTS
+            }
+        )
+
     def _format_daily_log_response(self, db_log) -> DailyFoodLogResponse:
         """Format daily log with entries"""
         formatted_entries = []
@@ -0,0 +1,162 @@
+import csv
+import io
+import json
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+from datetime import date
+from sqlalchemy.orm import Session
+from repositories.export_repository import ExportRepository
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+PRODUCT_FIELDS = [
+    "id",
+    "name",
+    "serving_size",
+    "serving_unit",
+    "serving_amount",
+    "energy_kcal",
+    "fats",
+    "carbohydrates",
+    "sugars",
+    "fibers",
+    "proteins",
+]
+RECIPE_FIELDS = [
+    "id",
+    "name",
+    "servings",
+    "preparation_time",
+    "instructions",
+    "image_url",
+]
+INGREDIENT_FIELDS = ["id", "product_id", "product_name", "amount", "unit"]
+WEEK_MENU_FIELDS = ["id", "start_date", "end_date"]
+MENU_DAY_FIELDS = ["id", "date", "recipe_id", "servings", "add_to_shopping_list"]
+DAILY_LOG_FIELDS = ["id", "date"]
+ENTRY_FIELDS = ["id", "product_id", "recipe_id", "amount", "unit", "meal_type"]
+
+
+def _fields(obj, fields: List[str]) -> Dict:
+    return {field: getattr(obj, field) for field in fields}
+
+
+def _ingredient(ingredient) -> Dict:
+    data = _fields(ingredient, ["id", "product_id", "amount", "unit"])
+    data["product_name"] = ingredient.product.name if ingredient.product else None
+    return data
+
+
+class ExportSpec(NamedTuple):
+    method: str  # ExportRepository method yielding parent objects
+    fields: List[str]
+    child_key: Optional[str] = None
+    child_prefix: str = ""  # CSV column prefix for child fields
+    child_fields: List[str] = []
+    child_row: Optional[Callable] = None
+
+
+RESOURCES = {
+    "products": ExportSpec("iter_products", PRODUCT_FIELDS),
+    "recipes": ExportSpec(
+        "iter_recipes",
+        RECIPE_FIELDS,
+        "ingredients",
+        "ingredient",
+        INGREDIENT_FIELDS,
+        _ingredient,
+    ),
+    "weekmenus": ExportSpec(
+        "iter_week_menus",
+        WEEK_MENU_FIELDS,
+        "days",
+        "day",
+        MENU_DAY_FIELDS,
+        lambda day: _fields(day, MENU_DAY_FIELDS),
+    ),
+    "daily-food": ExportSpec(
+        "iter_daily_logs",
+        DAILY_LOG_FIELDS,
+        "entries",
+        "entry",
+        ENTRY_FIELDS,
+        lambda entry: _fields(entry, ENTRY_FIELDS),
+    ),
+}
+
+
+class ExportService:
+    """Streams whole tables as NDJSON or CSV.
+
+    The export outlives the request handler, so it opens its own session
+    from session_factory and closes it when the stream ends.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session]):
+        self.session_factory = session_factory
+
+    def stream(
+        self,
+        resource: str,
+        export_format: str = "ndjson",
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> Iterator[str]:
+        """Validate the request and return a generator of output chunks"""
+        if resource not in RESOURCES:
+            raise KeyError(resource)
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Invalid format. Must be one of: {list(EXPORT_FORMATS)}")
+        if date_from and date_to and date_from > date_to:
+            raise ValueError("from must not be after to")
+
+        kwargs = {}
+        if resource == "daily-food":
+            kwargs = {"date_from": date_from, "date_to": date_to}
+        return self._generate(resource, export_format, kwargs)
+
+    def _generate(
+        self, resource: str, export_format: str, kwargs: Dict
+    ) -> Iterator[str]:
+        spec = RESOURCES[resource]
+        db = self.session_factory()
+        try:
+            rows = getattr(ExportRepository(db), spec.method)(**kwargs)
+            if export_format == "ndjson":
+                yield from self._ndjson(spec, rows)
+            else:
+                yield from self._csv(spec, rows)
+        finally:
+            db.close()
+
+    def _children(self, spec: ExportSpec, obj) -> List[Dict]:
+        if not spec.child_key:
+            return []
+        return [spec.child_row(child) for child in getattr(obj, spec.child_key)]
+
+    def _ndjson(self, spec: ExportSpec, rows) -> Iterator[str]:
+        for obj in rows:
+            data = _fields(obj, spec.fields)
+            if spec.child_key:
+                data[spec.child_key] = self._children(spec, obj)
+            yield json.dumps(data, default=str) + "\n"
+
+    def _csv(self, spec: ExportSpec, rows) -> Iterator[str]:
+        """One CSV line per child row, repeating the parent columns"""
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(
+            spec.fields
+            + [f"{spec.child_prefix}_{field}" for field in spec.child_fields]
+        )
+        for obj in rows:
+            parent = [getattr(obj, field) for field in spec.fields]
+            children = self._children(spec, obj)
+            if not children:
+                writer.writerow(parent + [None] * len(spec.child_fields))
+            for child in children:
+                writer.writerow(parent + [child[field] for field in spec.child_fields])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
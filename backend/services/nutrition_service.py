@@ -0,0 +1,81 @@
+from repositories.recipe_repository import RecipeRepository
+from repositories.product_repository import ProductRepository
+from models.nutrition import (
+    NutritionValues,
+    RecipeNutritionDraft,
+    RecipeNutritionResponse,
+)
+from utils.nutrition_matrix import NUTRIENTS
+from typing import List, Optional, Sequence, Tuple
+
+MAX_NUTRITION_BATCH = 1000
+
+
+class NutritionService:
+    def __init__(self, recipe_repo: RecipeRepository, product_repo: ProductRepository):
+        self.recipe_repo = recipe_repo
+        self.product_repo = product_repo
+
+    def get_recipe_nutrition(self, recipe_id: int) -> Optional[RecipeNutritionResponse]:
+        recipes = self.recipe_repo.get_ingredient_amounts([recipe_id])
+        if recipe_id not in recipes:
+            return None
+        servings, ingredients = recipes[recipe_id]
+        return self._calculate([(recipe_id, servings, ingredients)])[0]
+
+    def get_recipes_nutrition(
+        self,
+        recipe_ids: List[int],
+        drafts: Optional[List[RecipeNutritionDraft]] = None,
+    ) -> List[RecipeNutritionResponse]:
+        """Nutrition for saved recipes (in request order) followed by drafts"""
+        drafts = drafts or []
+        if len(recipe_ids) + len(drafts) > MAX_NUTRITION_BATCH:
+            raise ValueError(
+                f"At most {MAX_NUTRITION_BATCH} recipes can be calculated at once"
+            )
+
+        recipes = (
+            self.recipe_repo.get_ingredient_amounts(recipe_ids) if recipe_ids else {}
+        )
+        missing = [recipe_id for recipe_id in recipe_ids if recipe_id not in recipes]
+        if missing:
+            raise ValueError(f"Recipes not found: {missing}")
+
+        batch = [(recipe_id, *recipes[recipe_id]) for recipe_id in recipe_ids]
+        batch += [
+            (
+                None,
+                draft.servings,
+                [
+                    (ingredient.product_id, ingredient.amount)
+                    for ingredient in draft.ingredients
+                ],
+            )
+            for draft in drafts
+        ]
+        return self._calculate(batch)
+
+    def _calculate(
+        self, batch: Sequence[Tuple[Optional[int], int, List[Tuple[int, float]]]]
+    ) -> List[RecipeNutritionResponse]:
+        matrix = self.product_repo.get_nutrition_matrix()
+        try:
+            totals = matrix.compute([ingredients for _, _, ingredients in batch])
+        except KeyError as e:
+            raise ValueError(f"Products not found: {e.args[0]}")
+
+        results = []
+        for (recipe_id, servings, _), total in zip(batch, totals):
+            per_serving = total / (servings or 1)
+            results.append(
+                RecipeNutritionResponse(
+                    recipe_id=recipe_id,
+                    servings=servings,
+                    total=NutritionValues(**dict(zip(NUTRIENTS, total.tolist()))),
+                    per_serving=NutritionValues(
+                        **dict(zip(NUTRIENTS, per_serving.tolist()))
+                    ),
+                )
+            )
+        return results
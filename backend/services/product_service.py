@@ -1,6 +1,18 @@
 from repositories.product_repository import ProductRepository
-from models.product import ProductCreate, ProductResponse
+from models.product import (
+    ProductCreate,
+    ProductBatchUpdate,
+    ProductBatchItemResult,
+    ProductBatchResponse,
+    ProductResponse,
+    ProductPage,
+    ProductFilter,
+    ProductSearchResult,
+)
 from typing import List, Optional
+import time
+
+MAX_BATCH_SIZE = 5000
 
 
 class ProductService:
@@ -11,10 +23,62 @@ class ProductService:
         db_product = self.product_repo.create_product(product_data)
         return ProductResponse.from_orm(db_product)
 
+    def create_products(self, products: List[ProductCreate]) -> ProductBatchResponse:
+        self._check_batch_size(products)
+        started = time.perf_counter()
+        ids = self.product_repo.create_products(products)
+        results = [
+            ProductBatchItemResult(index=index, id=product_id, status="created")
+            for index, product_id in enumerate(ids)
+        ]
+        return self._batch_response(results, started)
+
+    def update_products(
+        self, products: List[ProductBatchUpdate]
+    ) -> ProductBatchResponse:
+        self._check_batch_size(products)
+        ids = [product.id for product in products]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Duplicate product ids in batch")
+
+        started = time.perf_counter()
+        updated = self.product_repo.update_products(products)
+        results = [
+            ProductBatchItemResult(
+                index=index,
+                id=product.id,
+                status="updated" if found else "not_found",
+            )
+            for index, (product, found) in enumerate(zip(products, updated))
+        ]
+        return self._batch_response(results, started)
+
     def get_all_products(self) -> List[ProductResponse]:
         db_products = self.product_repo.get_all_products()
         return [ProductResponse.from_orm(product) for product in db_products]
 
+    def get_products_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort: str = "id",
+        filters: Optional[ProductFilter] = None,
+    ) -> ProductPage:
+        db_products, next_cursor = self.product_repo.get_products_page(
+            limit, cursor=cursor, sort=sort, filters=filters
+        )
+        return ProductPage(
+            items=[ProductResponse.from_orm(product) for product in db_products],
+            next_cursor=next_cursor,
+        )
+
+    def search_products(self, query: str, limit: int = 10) -> List[ProductSearchResult]:
+        results = self.product_repo.search_products(query, limit)
+        return [
+            ProductSearchResult(id=product_id, name=name, score=score)
+            for product_id, name, score in results
+        ]
+
     def get_product_by_id(self, product_id: int) -> Optional[ProductResponse]:
         db_product = self.product_repo.get_product_by_id(product_id)
         return ProductResponse.from_orm(db_product) if db_product else None
@@ -27,3 +91,19 @@ class ProductService:
 
     def delete_product(self, product_id: int) -> bool:
         return self.product_repo.delete_product(product_id)
+
+    def _check_batch_size(self, products: list) -> None:
+        if len(products) > MAX_BATCH_SIZE:
+            raise ValueError(f"Batch may contain at most {MAX_BATCH_SIZE} products")
+
+    def _batch_response(
+        self, results: List[ProductBatchItemResult], started: float
+    ) -> ProductBatchResponse:
+        elapsed = time.perf_counter() - started
+        rows = sum(1 for result in results if result.status != "not_found")
+        return ProductBatchResponse(
+            results=results,
+            rows=rows,
+            elapsed_ms=round(elapsed * 1000, 3),
+            rows_per_second=round(rows / elapsed, 1) if elapsed > 0 else 0.0,
+        )
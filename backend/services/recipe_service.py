@@ -1,11 +1,37 @@
 from repositories.recipe_repository import RecipeRepository
-from models.recipe import RecipeCreate, RecipeResponse
-from typing import List, Optional
+from models.recipe import (
+    NutritionValues,
+    RecipeCreate,
+    RecipePage,
+    RecipePatch,
+    RecipeResponse,
+    RecipeSummary,
+    RecipeSummaryPage,
+)
+from typing import List, Optional, Union
+from utils.image_store import ImageStore, recipe_image_store
+from utils.nutrition_matrix import NUTRIENTS
+
+RECIPE_VIEWS = ["full", "summary"]
+
+
+def format_nutrition(db_nutrition) -> Optional[NutritionValues]:
+    """Per-serving values of a cached RecipeNutritionDB row"""
+    if db_nutrition is None:
+        return None
+    return NutritionValues(
+        **{nutrient: getattr(db_nutrition, nutrient) for nutrient in NUTRIENTS}
+    )
 
 
 class RecipeService:
-    def __init__(self, recipe_repo: RecipeRepository):
+    def __init__(
+        self,
+        recipe_repo: RecipeRepository,
+        image_store: ImageStore = recipe_image_store,
+    ):
         self.recipe_repo = recipe_repo
+        self.image_store = image_store
 
     def create_recipe(self, recipe_data: RecipeCreate) -> RecipeResponse:
         db_recipe = self.recipe_repo.create_recipe(recipe_data)
@@ -15,6 +41,33 @@ class RecipeService:
         db_recipes = self.recipe_repo.get_all_recipes()
         return [self._format_recipe_response(recipe) for recipe in db_recipes]
 
+    def get_recipes_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        sort: str = "id",
+        view: str = "full",
+    ) -> Union[RecipePage, RecipeSummaryPage]:
+        if view not in RECIPE_VIEWS:
+            raise ValueError(f"Invalid view. Must be one of: {RECIPE_VIEWS}")
+
+        if view == "summary":
+            rows, next_cursor = self.recipe_repo.get_recipe_summaries_page(
+                limit, cursor=cursor, sort=sort
+            )
+            return RecipeSummaryPage(
+                items=[RecipeSummary.from_orm(row) for row in rows],
+                next_cursor=next_cursor,
+            )
+
+        db_recipes, next_cursor = self.recipe_repo.get_recipes_page(
+            limit, cursor=cursor, sort=sort
+        )
+        return RecipePage(
+            items=[self._format_recipe_response(recipe) for recipe in db_recipes],
+            next_cursor=next_cursor,
+        )
+
     def get_recipe_by_id(self, recipe_id: int) -> Optional[RecipeResponse]:
         db_recipe = self.recipe_repo.get_recipe_by_id(recipe_id)
         return self._format_recipe_response(db_recipe) if db_recipe else None
@@ -22,11 +75,41 @@ class RecipeService:
     def update_recipe(
         self, recipe_id: int, recipe_data: RecipeCreate
     ) -> Optional[RecipeResponse]:
+        old_image_url = self.recipe_repo.get_image_url(recipe_id)
         db_recipe = self.recipe_repo.update_recipe(recipe_id, recipe_data)
-        return self._format_recipe_response(db_recipe) if db_recipe else None
+        if not db_recipe:
+            return None
+        self._release_image(old_image_url, db_recipe.image_url)
+        return self._format_recipe_response(db_recipe)
+
+    def patch_recipe(
+        self, recipe_id: int, patch: RecipePatch
+    ) -> Optional[RecipeResponse]:
+        old_image_url = self.recipe_repo.get_image_url(recipe_id)
+        db_recipe = self.recipe_repo.patch_recipe(recipe_id, patch)
+        if not db_recipe:
+            return None
+        self._release_image(old_image_url, db_recipe.image_url)
+        return self._format_recipe_response(db_recipe)
 
     def delete_recipe(self, recipe_id: int) -> bool:
-        return self.recipe_repo.delete_recipe(recipe_id)
+        old_image_url = self.recipe_repo.get_image_url(recipe_id)
+        deleted = self.recipe_repo.delete_recipe(recipe_id)
+        if deleted:
+            self._release_image(old_image_url)
+        return deleted
+
+    def _release_image(
+        self, old_image_url: Optional[str], new_image_url: Optional[str] = None
+    ) -> None:
+        """Delete a replaced image once no recipe refers to it any more"""
+        if not old_image_url or old_image_url == new_image_url:
+            return
+        filename = self.image_store.filename_from_url(old_image_url)
+        if filename:
+            self.image_store.release(
+                filename, lambda: self.recipe_repo.image_in_use(filename)
+            )
 
     def _format_recipe_response(self, db_recipe) -> RecipeResponse:
         # Format ingredients with product info
@@ -53,17 +136,16 @@ class RecipeService:
             instructions=db_recipe.instructions,
             image_url=db_recipe.image_url,
             ingredients=formatted_ingredients,
+            nutrition=format_nutrition(db_recipe.nutrition),
         )
 
     def update_recipe_image(
         self, recipe_id: int, image_url: str
     ) -> Optional[RecipeResponse]:
-        db_recipe = self.recipe_repo.get_recipe_by_id(recipe_id)
+        old_image_url = self.recipe_repo.get_image_url(recipe_id)
+        db_recipe = self.recipe_repo.update_recipe_image(recipe_id, image_url)
         if not db_recipe:
             return None
 
-        db_recipe.image_url = image_url
-        self.recipe_repo.db.commit()
-        self.recipe_repo.db.refresh(db_recipe)
-
+        self._release_image(old_image_url, image_url)
         return self._format_recipe_response(db_recipe)
@@ -1,5 +1,14 @@
 from repositories.weekmenu_repository import WeekMenuRepository
-from models.weekmenu import WeekMenuCreate, WeekMenuResponse
+from services.recipe_service import format_nutrition
+from models.weekmenu import (
+    MenuDayCreate,
+    MenuDayPatch,
+    MenuDayResponse,
+    PlannedDayResponse,
+    WeekMenuCreate,
+    WeekMenuDayChanges,
+    WeekMenuResponse,
+)
 from typing import List, Optional
 from datetime import date
 
@@ -12,10 +21,21 @@ class WeekMenuService:
         db_menu = self.weekmenu_repo.create_week_menu(menu_data)
         return self._format_menu_response(db_menu)
 
-    def get_all_week_menus(self) -> List[WeekMenuResponse]:
-        db_menus = self.weekmenu_repo.get_all_week_menus()
+    def get_all_week_menus(
+        self, date_from: Optional[date] = None, date_to: Optional[date] = None
+    ) -> List[WeekMenuResponse]:
+        if date_from and date_to and date_from > date_to:
+            raise ValueError("from must not be after to")
+        db_menus = self.weekmenu_repo.get_all_week_menus(date_from, date_to)
         return [self._format_menu_response(menu) for menu in db_menus]
 
+    def get_planned_days(self, day_date: date) -> List[PlannedDayResponse]:
+        """What is planned on a date, across all menus covering it"""
+        return [
+            PlannedDayResponse(week_menu_id=day.week_menu_id, **self._format_day(day))
+            for day in self.weekmenu_repo.get_days_on(day_date)
+        ]
+
     def get_week_menu_by_id(self, menu_id: int) -> Optional[WeekMenuResponse]:
         db_menu = self.weekmenu_repo.get_week_menu_by_id(menu_id)
         return self._format_menu_response(db_menu) if db_menu else None
@@ -32,31 +52,28 @@ class WeekMenuService:
         db_menu = self.weekmenu_repo.update_week_menu(menu_id, menu_data)
         return self._format_menu_response(db_menu) if db_menu else None
 
+    def update_week_menu_days(
+        self, menu_id: int, days: List[MenuDayCreate]
+    ) -> Optional[WeekMenuDayChanges]:
+        result = self.weekmenu_repo.update_week_menu_days(menu_id, days)
+        if result is None:
+            return None
+        changed, removed = result
+        return WeekMenuDayChanges(
+            changed=[self._format_day(day) for day in changed], removed=removed
+        )
+
+    def patch_day(
+        self, menu_id: int, day_date: date, patch: MenuDayPatch
+    ) -> Optional[MenuDayResponse]:
+        db_day = self.weekmenu_repo.patch_day(menu_id, day_date, patch)
+        return MenuDayResponse(**self._format_day(db_day)) if db_day else None
+
     def delete_week_menu(self, menu_id: int) -> bool:
         return self.weekmenu_repo.delete_week_menu(menu_id)
 
     def _format_menu_response(self, db_menu) -> WeekMenuResponse:
-        # Format days with recipe info
-        formatted_days = []
-        for day in db_menu.days:
-            day_data = {
-                "id": day.id,
-                "date": day.date,
-                "recipe_id": day.recipe_id,
-                "servings": day.servings,
-                "add_to_shopping_list": day.add_to_shopping_list,
-                "recipe": None,
-            }
-
-            if day.recipe:
-                day_data["recipe"] = {
-                    "id": day.recipe.id,
-                    "name": day.recipe.name,
-                    "servings": day.recipe.servings,
-                    "preparation_time": day.recipe.preparation_time,
-                }
-
-            formatted_days.append(day_data)
+        formatted_days = [self._format_day(day) for day in db_menu.days]
 
         # Sort days by date
         formatted_days.sort(key=lambda x: x["date"])
@@ -67,3 +84,24 @@ class WeekMenuService:
             end_date=db_menu.end_date,
             days=formatted_days,
         )
+
+    def _format_day(self, day) -> dict:
+        # Day with basic recipe info
+        day_data = {
+            "id": day.id,
+            "date": day.date,
+            "recipe_id": day.recipe_id,
+            "servings": day.servings,
+            "add_to_shopping_list": day.add_to_shopping_list,
+            "recipe": None,
+        }
+
+        if day.recipe:
+            day_data["recipe"] = {
+                "id": day.recipe.id,
+                "name": day.recipe.name,
+                "servings": day.recipe.servings,
+                "preparation_time": day.recipe.preparation_time,
+                "nutrition": format_nutrition(day.recipe.nutrition),
+            }
+        return day_data
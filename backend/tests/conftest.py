@@ -1,4 +1,5 @@
 import pytest
+from unittest.mock import AsyncMock, Mock
 import sys
 import os
 backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -10,10 +11,17 @@ from sqlalchemy.orm import sessionmaker
 from models.product import Base, ProductDB, ProductCreate
 from models.recipe import RecipeDB, RecipeIngredientDB, RecipeCreate, RecipeIngredientCreate
 from repositories.product_repository import ProductRepository
+from utils.search_index import SearchIndex
+from utils.nutrition_matrix import NutritionMatrix
+from utils.image_store import ImageStore
 from repositories.recipe_repository import RecipeRepository
+from repositories.daily_food_repository import DailyFoodRepository
 from services.product_service import ProductService
 from services.recipe_service import RecipeService
+from services.daily_food_service import DailyFoodService
+from contextlib import contextmanager
 from datetime import date, timedelta
+from utils.query_stats import instrument, track_queries
 
 @pytest.fixture
 def test_db():
@@ -31,7 +39,9 @@ def test_db():
 @pytest.fixture
 def product_repo(test_db):
     """Product repository fixture"""
-    return ProductRepository(test_db)
+    return ProductRepository(
+        test_db, search_index=SearchIndex(), nutrition_matrix=NutritionMatrix()
+    )
 
 
 @pytest.fixture
@@ -45,10 +55,49 @@ def recipe_repo(test_db):
     return RecipeRepository(test_db)
 
 @pytest.fixture
-def recipe_service(test_db):
+def recipe_service(test_db, tmp_path):
     """Recipe service fixture"""
     recipe_repo = RecipeRepository(test_db)
-    return RecipeService(recipe_repo)
+    return RecipeService(recipe_repo, ImageStore(tmp_path / "images"))
+
+@pytest.fixture
+def query_budget(test_db):
+    """Context manager failing the test when the block exceeds a query budget.
+
+    Usage: `with query_budget(2): service.get_all_recipes()`. Repeated
+    statement shapes (N+1) fail the test too unless allow_repeated is set.
+    """
+    instrument(test_db.get_bind())
+
+    @contextmanager
+    def budget(max_statements, allow_repeated=False):
+        with track_queries() as stats:
+            yield stats
+        if stats.statements > max_statements:
+            pytest.fail(
+                f"Query budget of {max_statements} exceeded:\n{stats.report()}"
+            )
+        if not allow_repeated and stats.repeated():
+            pytest.fail(f"Repeated statements (N+1):\n{stats.report()}")
+
+    return budget
+
+@pytest.fixture
+def mock_version_repo():
+    """Version repository mock for routes with conditional GET"""
+    repo = Mock()
+    repo.get_versions = AsyncMock(return_value=((1, 1), None))
+    return repo
+
+@pytest.fixture
+def daily_food_repo(test_db):
+    """Daily food repository fixture"""
+    return DailyFoodRepository(test_db)
+
+@pytest.fixture
+def daily_food_service(daily_food_repo):
+    """Daily food service fixture"""
+    return DailyFoodService(daily_food_repo)
 
 @pytest.fixture
 def sample_product_data():
@@ -231,4 +280,11 @@ def week_menu_data():
                 "add_to_shopping_list": False
             }
         ]
-    }
\ No newline at end of file
+    }
+@pytest.fixture
+def published_events(monkeypatch):
+    """Change events handed to the in-process broker, in order"""
+    from utils.change_feed import change_broker
+    events = []
+    monkeypatch.setattr(change_broker, 'publish', events.append)
+    return events
@@ -0,0 +1,98 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from datetime import date
+from models.daily_food_log import DailyFoodEntryCreate
+from models.product import Base, ProductCreate
+from models.recipe import RecipeCreate
+from repositories.async_repositories import (
+    AsyncDailyFoodRepository,
+    AsyncProductRepository,
+    AsyncRecipeRepository,
+    AsyncSessionProxy,
+)
+from repositories.product_repository import ProductRepository
+from services.recipe_service import RecipeService
+from utils.change_feed import change_broker
+from utils.nutrition_matrix import NutritionMatrix
+from utils.search_index import SearchIndex
+
+pytest.importorskip("aiosqlite")
+
+
+@pytest_asyncio.fixture
+async def async_db():
+    """In-memory SQLite database behind an AsyncSession"""
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, autoflush=False)() as session:
+        yield session
+    await engine.dispose()
+
+
+@pytest.fixture
+def product_data():
+    return ProductCreate(
+        name='Bloem', serving_size=100.0, energy_kcal=364.0, fats=1.0,
+        carbohydrates=76.0, sugars=0.3, fibers=2.7, proteins=10.3
+    )
+
+
+def isolated_product_repo(session):
+    return ProductRepository(
+        session, search_index=SearchIndex(), nutrition_matrix=NutritionMatrix()
+    )
+
+
+class TestAsyncRepositories:
+    @pytest.mark.asyncio
+    async def test_repository_methods_are_awaitable(self, async_db, product_data):
+        """Test sync repository methods run as coroutines on the AsyncSession"""
+        repo = AsyncSessionProxy(async_db, isolated_product_repo)
+
+        created = await repo.create_product(product_data)
+        found = await repo.get_product_by_id(created.id)
+
+        assert found.name == 'Bloem'
+        assert found.serving_unit == 'gram'
+
+    @pytest.mark.asyncio
+    async def test_service_formats_inside_session(self, async_db, product_data):
+        """Test lazy loads during response formatting work through the proxy"""
+        product = await AsyncSessionProxy(async_db, isolated_product_repo).create_product(
+            product_data
+        )
+        service = AsyncRecipeRepository(async_db).service(RecipeService)
+
+        result = await service.create_recipe(RecipeCreate(
+            name='Brood', servings=2, preparation_time=60, instructions='Bakken',
+            ingredients=[{'product_id': product.id, 'amount': 500.0, 'unit': 'gram'}]
+        ))
+
+        assert result.ingredients[0].product['name'] == 'Bloem'
+        assert result.nutrition.energy_kcal == pytest.approx(910.0)
+
+    @pytest.mark.asyncio
+    async def test_commit_reaches_open_event_stream(self, async_db, product_data):
+        """Test an entry committed through the AsyncSession reaches a subscriber"""
+        product = await AsyncSessionProxy(async_db, isolated_product_repo).create_product(
+            product_data
+        )
+
+        async with change_broker.subscribe() as subscription:
+            entry = await AsyncDailyFoodRepository(async_db).add_entry(
+                date(2024, 1, 15),
+                DailyFoodEntryCreate(product_id=product.id, amount=50.0, unit='gram'),
+            )
+            event = await asyncio.wait_for(subscription.queue.get(), 1)
+
+        assert event['type'] == 'entry.added'
+        assert event['entry']['id'] == entry.id
+
+    def test_private_attributes_are_not_proxied(self, async_db):
+        """Test only public methods are exposed"""
+        with pytest.raises(AttributeError):
+            AsyncProductRepository(async_db)._apply_filters
@@ -0,0 +1,130 @@
+import argparse
+import json
+import pytest
+from sqlalchemy import create_engine, func, select
+from benchmarks.datagen import SIZES, load, product_rows, entry_rows, reset
+from benchmarks.load import FLOWS, MIXES, Recorder, parse_mix, main as load_main
+from benchmarks.run import compare, percentile
+from models.daily_nutrition_total import DailyNutritionTotalDB
+from models.recipe import RecipeNutritionDB
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite:///:memory:")
+    yield engine
+    engine.dispose()
+
+
+class TestDatagen:
+    def test_rows_are_deterministic(self):
+        """Test the same seed produces the same rows and another seed does not"""
+        size = SIZES["tiny"]
+        assert list(product_rows(size, 1)) == list(product_rows(size, 1))
+        assert list(entry_rows(size, 1)) == list(entry_rows(size, 1))
+        assert list(product_rows(size, 1)) != list(product_rows(size, 2))
+
+    def test_load_counts_and_nutrition_cache(self, engine):
+        """Test loading fills every table and the recipe nutrition cache"""
+        size = SIZES["tiny"]
+        counts = load(engine, size, seed=7)
+
+        assert counts["products"] == size.products
+        assert counts["recipes"] == size.recipes
+        assert counts["week_menus"] == size.weeks
+        assert counts["menu_days"] == size.weeks * 7
+        assert counts["daily_food_logs"] == size.days
+        assert counts["daily_food_entries"] >= size.days * 4
+        with engine.connect() as connection:
+            cached = connection.execute(
+                select(func.count(RecipeNutritionDB.recipe_id))
+            ).scalar()
+        assert cached == size.recipes
+        with engine.connect() as connection:
+            totals = connection.execute(
+                select(func.sum(DailyNutritionTotalDB.entries))
+            ).scalar()
+        assert totals == counts["daily_food_entries"]
+
+    def test_load_refuses_existing_data(self, engine):
+        """Test loading twice requires a reset in between"""
+        load(engine, SIZES["tiny"])
+        with pytest.raises(ValueError):
+            load(engine, SIZES["tiny"])
+
+        reset(engine)
+        assert load(engine, SIZES["tiny"])["products"] == SIZES["tiny"].products
+
+
+class TestCompare:
+    def _results(self, p50, statements):
+        return {"sizes": {"small": {"case": {"p50_ms": p50, "statements": statements}}}}
+
+    def test_within_tolerance(self):
+        """Test small slowdowns within the tolerance pass"""
+        assert compare(self._results(11.0, 3), self._results(10.0, 3), 0.25) == []
+
+    def test_slower_and_more_statements(self):
+        """Test slower cases and extra statements are both reported"""
+        regressions = compare(self._results(20.0, 5), self._results(10.0, 3), 0.25)
+        assert len(regressions) == 2
+
+    def test_missing_cases_are_ignored(self):
+        """Test cases absent from the baseline are not regressions"""
+        assert compare(self._results(20.0, 5), {"sizes": {}}, 0.25) == []
+
+    def test_percentile(self):
+        """Test percentiles pick from the sorted samples"""
+        samples = [5.0, 1.0, 3.0, 2.0, 4.0]
+        assert percentile(samples, 0.5) == 3.0
+        assert percentile(samples, 0.99) == 5.0
+
+
+class TestLoad:
+    def test_parse_mix(self):
+        """Test named mixes and flow=weight pairs, and unknown flows"""
+        assert parse_mix("read_only") == MIXES["read_only"]
+        assert parse_mix("day_overview=3,add_entry") == {
+            "day_overview": 3,
+            "add_entry": 1,
+        }
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_mix("unknown=1")
+
+    def test_recorder_report(self):
+        """Test throughput, error rate and histogram buckets per route"""
+        recorder = Recorder()
+        recorder.record("GET /a", 200, 0.004)
+        recorder.record("GET /a", 500, 0.030)
+        recorder.record("GET /a", 0, 9.0)
+
+        report = recorder.report(wall_time=1.5)["GET /a"]
+        assert report["requests"] == 3
+        assert report["throughput_rps"] == 2.0
+        assert report["error_rate"] == round(2 / 3, 4)
+        assert report["histogram_ms"]["<=5"] == 1
+        assert report["histogram_ms"]["<=50"] == 1
+        assert report["histogram_ms"][">5000"] == 1
+
+    def test_flows_run_without_errors(self, tmp_path):
+        """Test every flow runs against the app on a tiny dataset"""
+        url = f"sqlite:///{tmp_path / 'load.db'}"
+        engine = create_engine(url)
+        load(engine, SIZES["tiny"])
+        engine.dispose()
+        output = tmp_path / "report.json"
+
+        status = load_main(
+            [
+                "--database-url", url,
+                "--mix", ",".join(f"{flow}=1" for flow in FLOWS),
+                "--concurrency", "2",
+                "--duration", "0.3",
+                "--output", str(output),
+            ]
+        )
+
+        assert status == 0
+        level = json.loads(output.read_text())["levels"]["2"]
+        assert level["requests"] > 0
+        assert level["error_rate"] == 0.0
@@ -0,0 +1,170 @@
+import asyncio
+import pytest
+import signal
+import threading
+from routes.event_routes import stream_events
+from repositories.change_repository import ChangeRepository
+from utils.change_feed import ChangeBroker, close_on_exit_signals, event_stream
+
+EVENT = {'type': 'entry.removed', 'date': '2024-01-15', 'entry_id': 3}
+
+
+async def read(stream, count):
+    return [await anext(stream) for _ in range(count)]
+
+
+async def read_all(stream):
+    return [chunk async for chunk in stream]
+
+
+class TestChangeBroker:
+    def test_fans_out_to_every_subscriber(self):
+        """Test each open subscription receives a published event"""
+        broker = ChangeBroker()
+
+        async def run():
+            async with broker.subscribe() as first, broker.subscribe() as second:
+                broker.publish(EVENT)
+                return await first.queue.get(), await second.queue.get()
+
+        assert asyncio.run(run()) == (EVENT, EVENT)
+
+    def test_publish_from_another_thread(self):
+        """Test sync code outside the event loop can publish"""
+        broker = ChangeBroker()
+
+        async def run():
+            async with broker.subscribe() as subscription:
+                thread = threading.Thread(target=broker.publish, args=(EVENT,))
+                thread.start()
+                thread.join()
+                return await asyncio.wait_for(subscription.queue.get(), 1)
+
+        assert asyncio.run(run()) == EVENT
+
+    def test_closed_subscription_stops_receiving(self):
+        """Test a stream that closed is no longer published to"""
+        broker = ChangeBroker()
+
+        async def run():
+            async with broker.subscribe():
+                pass
+            broker.publish(EVENT)
+
+        asyncio.run(run())
+        assert broker._subscriptions == set()
+
+
+class TestEventStream:
+    def test_formats_server_sent_events(self):
+        """Test events go out with their type as event name and compact JSON data"""
+        broker = ChangeBroker()
+
+        async def run():
+            stream = event_stream(broker)
+            first = await anext(stream)
+            broker.publish(EVENT)
+            return [first, await anext(stream)]
+
+        assert asyncio.run(run()) == [
+            'retry: 5000\n\n',
+            'event: entry.removed\ndata: {"type":"entry.removed","date":"2024-01-15","entry_id":3}\n\n',
+        ]
+
+    def test_heartbeat(self):
+        """Test an idle stream sends a comment line"""
+        async def run():
+            return await read(event_stream(ChangeBroker(), heartbeat=0.01), 2)
+
+        assert asyncio.run(run())[1] == ': keepalive\n\n'
+
+    def test_slow_client_gets_resync_and_stream_ends(self):
+        """Test a subscriber whose queue overflows is told to refetch"""
+        broker = ChangeBroker(queue_size=2)
+
+        async def run():
+            stream = event_stream(broker)
+            await anext(stream)
+            for _ in range(3):
+                broker.publish(EVENT)
+            await asyncio.sleep(0)
+            chunks = [chunk async for chunk in stream]
+            return chunks
+
+        chunks = asyncio.run(run())
+        assert chunks == ['event: resync\ndata: {"type":"resync"}\n\n']
+
+    def test_stream_ends_when_broker_is_closed(self):
+        """Test closing the broker ends open streams, so the server can stop"""
+        broker = ChangeBroker()
+
+        async def run():
+            stream = event_stream(broker)
+            await anext(stream)
+            waiting = asyncio.ensure_future(anext(stream))
+            await asyncio.sleep(0)
+            broker.close()
+            with pytest.raises(StopAsyncIteration):
+                await asyncio.wait_for(waiting, 1)
+            # Streams opened afterwards end at once
+            return [chunk async for chunk in event_stream(broker)]
+
+        assert asyncio.run(run()) == []
+        assert broker._subscriptions == set()
+
+    def test_stream_ends_after_its_lifetime(self):
+        """Test a stream ends by itself so the browser reconnects"""
+        async def run():
+            stream = event_stream(ChangeBroker(), heartbeat=10, lifetime=0.05)
+            return await asyncio.wait_for(read_all(stream), 1)
+
+        assert asyncio.run(run()) == ['retry: 5000\n\n']
+
+    def test_exit_signal_closes_broker(self):
+        """Test SIGTERM ends the streams and still reaches the server's own handler"""
+        received = []
+        original = signal.signal(signal.SIGTERM, lambda signum, frame: received.append(signum))
+        broker = ChangeBroker()
+
+        async def run():
+            with close_on_exit_signals(broker):
+                stream = event_stream(broker)
+                await anext(stream)
+                signal.raise_signal(signal.SIGTERM)
+                return await asyncio.wait_for(read_all(stream), 1)
+
+        try:
+            assert asyncio.run(run()) == []
+            assert received == [signal.SIGTERM]
+            assert broker.closed
+            assert signal.getsignal(signal.SIGTERM) is not original
+        finally:
+            signal.signal(signal.SIGTERM, original)
+
+    def test_route_streams_event_source(self):
+        """Test the endpoint answers with an uncached text/event-stream"""
+        response = asyncio.run(stream_events())
+
+        assert response.media_type == 'text/event-stream'
+        assert response.headers['cache-control'] == 'no-cache'
+
+
+class TestChangeRepository:
+    def test_published_on_commit(self, test_db, published_events):
+        """Test events wait for the commit of the transaction"""
+        ChangeRepository(test_db).publish([EVENT])
+        assert published_events == []
+
+        test_db.commit()
+        assert published_events == [EVENT]
+
+        test_db.commit()
+        assert published_events == [EVENT]
+
+    def test_dropped_on_rollback(self, test_db, published_events):
+        """Test a rolled back change is never announced"""
+        ChangeRepository(test_db).publish([EVENT])
+        test_db.rollback()
+        test_db.commit()
+
+        assert published_events == []
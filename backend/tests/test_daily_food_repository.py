@@ -0,0 +1,134 @@
+import pytest
+import threading
+from datetime import date
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from models.daily_food_log import DailyFoodEntryCreate, DailyFoodLogDB
+from models.product import Base
+from repositories.daily_food_repository import DailyFoodRepository
+
+LOG_DATE = date(2024, 1, 15)
+
+
+class TestGetOrCreateDailyLog:
+    def test_creates_log(self, daily_food_repo, query_budget):
+        """Test the first entry of a day needs a lookup and an insert"""
+        with query_budget(2):
+            daily_log = daily_food_repo.get_or_create_daily_log(LOG_DATE)
+
+        assert daily_log.id is not None
+        assert daily_log.date == LOG_DATE
+
+    def test_returns_existing_log(self, daily_food_repo, query_budget, test_db):
+        """Test an existing day is found by a single SELECT, without writing"""
+        first = daily_food_repo.get_or_create_daily_log(LOG_DATE)
+
+        with query_budget(1):
+            second = daily_food_repo.get_or_create_daily_log(LOG_DATE)
+
+        assert second.id == first.id
+        assert test_db.query(DailyFoodLogDB).count() == 1
+
+    def test_log_created_after_lookup_is_reused(self, daily_food_repo, test_db):
+        """Test a log inserted between the lookup and the insert is selected again"""
+        engine = test_db.get_bind()
+        raced = []
+
+        def insert_first(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("INSERT INTO daily_food_logs") and not raced:
+                raced.append(statement)
+                cursor.execute("INSERT INTO daily_food_logs (date) VALUES ('2024-01-15')")
+
+        event.listen(engine, "before_cursor_execute", insert_first)
+        try:
+            daily_log = daily_food_repo.get_or_create_daily_log(LOG_DATE)
+        finally:
+            event.remove(engine, "before_cursor_execute", insert_first)
+
+        assert raced
+
+        assert daily_log.date == LOG_DATE
+        assert test_db.query(DailyFoodLogDB).count() == 1
+
+    def test_concurrent_first_entries_share_one_log(self, tmp_path, sample_products):
+        """Test two sessions adding the first entry of a day at once end up in one log"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'race.db'}", connect_args={'timeout': 30})
+        Base.metadata.create_all(engine)
+        make_session = sessionmaker(bind=engine, autoflush=False)
+        with make_session() as db:
+            for product in sample_products:
+                db.merge(product)
+            db.commit()
+
+        barrier = threading.Barrier(4)
+        errors = []
+
+        def add_entry(product_id):
+            try:
+                with make_session() as db:
+                    barrier.wait()
+                    DailyFoodRepository(db).add_entry(LOG_DATE, DailyFoodEntryCreate(
+                        product_id=product_id, amount=100.0, unit='gram'
+                    ))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=add_entry, args=(sample_products[i % 3].id,)) for i in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        with make_session() as db:
+            logs = db.query(DailyFoodLogDB).all()
+            assert len(logs) == 1
+            assert len(logs[0].entries) == 4
+        engine.dispose()
+
+
+class TestChangeEvents:
+    def test_add_entry_publishes_after_commit(self, daily_food_repo, sample_products, published_events):
+        """Test a new entry is announced with its own columns"""
+        entry = daily_food_repo.add_entry(LOG_DATE, DailyFoodEntryCreate(
+            product_id=sample_products[0].id, amount=150.0, unit='gram', meal_type='lunch'
+        ))
+
+        assert published_events == [{
+            'type': 'entry.added',
+            'date': '2024-01-15',
+            'entry': {
+                'id': entry.id, 'product_id': sample_products[0].id, 'recipe_id': None,
+                'amount': 150.0, 'unit': 'gram', 'meal_type': 'lunch',
+            },
+        }]
+
+    def test_batch_and_copy_publish_every_entry(self, daily_food_repo, sample_products, published_events):
+        """Test batch inserts and copies announce each inserted row"""
+        entries = daily_food_repo.add_entries(LOG_DATE, [
+            DailyFoodEntryCreate(product_id=product.id, amount=100.0, unit='gram')
+            for product in sample_products
+        ])
+        copies = daily_food_repo.copy_entries(date(2024, 1, 16), LOG_DATE)
+
+        assert [event['entry']['id'] for event in published_events] == [
+            entry.id for entry in entries + copies
+        ]
+        assert {event['date'] for event in published_events[len(entries):]} == {'2024-01-16'}
+        assert {event['type'] for event in published_events} == {'entry.added'}
+
+    def test_update_and_delete(self, daily_food_repo, sample_products, published_events):
+        """Test updates carry the new values and deletes only the id"""
+        entry = daily_food_repo.add_entry(LOG_DATE, DailyFoodEntryCreate(
+            product_id=sample_products[0].id, amount=100.0, unit='gram'
+        ))
+        daily_food_repo.update_entry(entry.id, DailyFoodEntryCreate(
+            product_id=sample_products[0].id, amount=80.0, unit='gram', meal_type='diner'
+        ))
+        daily_food_repo.delete_entry(entry.id)
+
+        assert published_events[1]['type'] == 'entry.updated'
+        assert published_events[1]['entry']['amount'] == 80.0
+        assert published_events[1]['entry']['meal_type'] == 'diner'
+        assert published_events[2] == {'type': 'entry.removed', 'date': '2024-01-15', 'entry_id': entry.id}
+
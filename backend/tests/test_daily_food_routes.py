@@ -0,0 +1,178 @@
+import pytest
+from datetime import date
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, Mock
+
+from routes.daily_food_routes import router, get_daily_food_service
+from models.daily_food_log import (
+    DailyFoodEntryResponse, DailyFoodEntrySummary, DailyFoodSummaryResponse, DailyFoodTotalsGroup, DailyFoodTotalsResponse
+)
+from models.nutrition import NutritionValues
+
+@pytest.fixture
+def mock_daily_food_service():
+    """Mock daily food service fixture"""
+    service = Mock()
+    service.get_daily_log = AsyncMock()
+    service.get_daily_summary = AsyncMock()
+    service.get_entries = AsyncMock()
+    service.get_totals = AsyncMock()
+    service.add_entry = AsyncMock()
+    service.add_entries = AsyncMock()
+    service.copy_entries = AsyncMock()
+    service.update_entry = AsyncMock()
+    service.delete_entry = AsyncMock()
+    return service
+
+@pytest.fixture
+def client(mock_daily_food_service):
+    """Test client fixture with mocked service"""
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_daily_food_service] = lambda: mock_daily_food_service
+    return TestClient(app)
+
+
+class TestDailySummaryRoute:
+    def test_get_daily_summary(self, client, mock_daily_food_service):
+        """Test the summary route returns totals without recipe ingredients"""
+        nutrition = NutritionValues(energy_kcal=105.0, proteins=8.5)
+        mock_daily_food_service.get_daily_summary.return_value = DailyFoodSummaryResponse(
+            date=date(2024, 1, 15),
+            entries=[DailyFoodEntrySummary(
+                id=1, product_id=3, name='Melk', amount=250.0, unit='ml',
+                meal_type='ontbijt', nutrition=nutrition
+            )],
+            meal_types={'ontbijt': nutrition},
+            total=nutrition,
+        )
+
+        response = client.get("/api/daily-food/2024-01-15/summary")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['entries'][0]['nutrition']['energy_kcal'] == 105.0
+        assert 'recipe' not in data['entries'][0]
+        assert data['meal_types']['ontbijt']['proteins'] == 8.5
+        mock_daily_food_service.get_daily_summary.assert_called_once_with(date(2024, 1, 15))
+
+    def test_get_daily_summary_invalid_date(self, client):
+        """Test an invalid date is rejected"""
+        response = client.get("/api/daily-food/not-a-date/summary")
+
+        assert response.status_code == 422
+
+
+class TestDailyFoodRangeRoutes:
+    def test_get_entries(self, client, mock_daily_food_service):
+        """Test entries of a range are requested with the parsed dates"""
+        mock_daily_food_service.get_entries.return_value = []
+
+        response = client.get("/api/daily-food/?from=2024-01-01&to=2024-01-31")
+
+        assert response.status_code == 200
+        assert response.json() == []
+        mock_daily_food_service.get_entries.assert_called_once_with(
+            date(2024, 1, 1), date(2024, 1, 31)
+        )
+
+    def test_get_entries_requires_range(self, client):
+        """Test from and to are required"""
+        response = client.get("/api/daily-food/?from=2024-01-01")
+
+        assert response.status_code == 422
+
+    def test_get_totals(self, client, mock_daily_food_service):
+        """Test totals are not mistaken for a log date"""
+        mock_daily_food_service.get_totals.return_value = DailyFoodTotalsResponse(
+            date_from=date(2024, 1, 1), date_to=date(2024, 1, 31), group='week',
+            groups=[DailyFoodTotalsGroup(
+                key='2024-01-15', entries=2, nutrition=NutritionValues(energy_kcal=728.0)
+            )],
+            total=NutritionValues(energy_kcal=728.0),
+        )
+
+        response = client.get("/api/daily-food/totals?from=2024-01-01&to=2024-01-31&group=week")
+
+        assert response.status_code == 200
+        assert response.json()['groups'][0]['key'] == '2024-01-15'
+        mock_daily_food_service.get_totals.assert_called_once_with(
+            date(2024, 1, 1), date(2024, 1, 31), 'week'
+        )
+
+    def test_get_totals_invalid_group(self, client):
+        """Test unknown groupings are rejected by validation"""
+        response = client.get("/api/daily-food/totals?from=2024-01-01&to=2024-01-31&group=year")
+
+        assert response.status_code == 422
+
+    def test_get_totals_invalid_range(self, client, mock_daily_food_service):
+        """Test service errors become 400 responses"""
+        mock_daily_food_service.get_totals.side_effect = ValueError("from must not be after to")
+
+        response = client.get("/api/daily-food/totals?from=2024-02-01&to=2024-01-01")
+
+        assert response.status_code == 400
+
+
+class TestDailyFoodBatchRoutes:
+    def _entry(self, entry_id, **kwargs):
+        return DailyFoodEntryResponse(id=entry_id, product_id=1, amount=100.0, unit='gram', meal_type='lunch', **kwargs)
+
+    def test_add_entries(self, client, mock_daily_food_service):
+        """Test a batch of entries is passed to the service at once"""
+        mock_daily_food_service.add_entries.return_value = [self._entry(1), self._entry(2)]
+
+        response = client.post('/api/daily-food/2024-01-15/entries/batch', json={'entries': [
+            {'product_id': 1, 'amount': 100.0, 'unit': 'gram', 'meal_type': 'lunch'},
+            {'product_id': 2, 'amount': 50.0, 'unit': 'gram', 'meal_type': 'lunch'},
+        ]})
+
+        assert response.status_code == 200
+        assert [entry['id'] for entry in response.json()] == [1, 2]
+        log_date, entries = mock_daily_food_service.add_entries.call_args.args
+        assert log_date == date(2024, 1, 15)
+        assert len(entries) == 2
+
+    def test_add_entries_validates_every_entry(self, client, mock_daily_food_service):
+        """Test one invalid entry rejects the whole batch"""
+        response = client.post('/api/daily-food/2024-01-15/entries/batch', json={'entries': [
+            {'product_id': 1, 'amount': 100.0, 'unit': 'gram', 'meal_type': 'lunch'},
+            {'amount': 50.0, 'unit': 'gram', 'meal_type': 'lunch'},
+        ]})
+
+        assert response.status_code == 400
+        mock_daily_food_service.add_entries.assert_not_called()
+
+    def test_add_entries_empty_batch(self, client):
+        """Test an empty batch is a validation error"""
+        response = client.post('/api/daily-food/2024-01-15/entries/batch', json={'entries': []})
+
+        assert response.status_code == 422
+
+    def test_copy_entries(self, client, mock_daily_food_service):
+        """Test copying one meal of another day"""
+        mock_daily_food_service.copy_entries.return_value = [self._entry(3)]
+
+        response = client.post('/api/daily-food/2024-01-16/copy?from=2024-01-15&meal_type=lunch')
+
+        assert response.status_code == 200
+        assert response.json()[0]['id'] == 3
+        mock_daily_food_service.copy_entries.assert_called_once_with(date(2024, 1, 16), date(2024, 1, 15), 'lunch')
+
+    def test_copy_entries_invalid_meal_type(self, client, mock_daily_food_service):
+        """Test an unknown meal type is rejected"""
+        response = client.post('/api/daily-food/2024-01-16/copy?from=2024-01-15&meal_type=brunch')
+
+        assert response.status_code == 400
+        mock_daily_food_service.copy_entries.assert_not_called()
+
+    def test_copy_entries_same_day(self, client, mock_daily_food_service):
+        """Test service errors become 400"""
+        mock_daily_food_service.copy_entries.side_effect = ValueError('Cannot copy a day onto itself')
+
+        response = client.post('/api/daily-food/2024-01-15/copy?from=2024-01-15')
+
+        assert response.status_code == 400
+        assert 'itself' in response.json()['detail']
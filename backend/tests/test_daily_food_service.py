@@ -0,0 +1,195 @@
+import pytest
+from datetime import date
+from models.daily_food_log import DailyFoodEntryCreate, DailyFoodSummaryResponse
+from models.recipe import RecipeCreate
+
+LOG_DATE = date(2024, 1, 15)
+
+
+@pytest.fixture
+def logged_day(daily_food_service, recipe_repo, minimal_recipe_data, sample_products):
+    """A day with a product entry and a recipe entry"""
+    recipe = recipe_repo.create_recipe(RecipeCreate(**minimal_recipe_data))
+    daily_food_service.add_entry(LOG_DATE, DailyFoodEntryCreate(
+        product_id=sample_products[2].id, amount=250.0, unit='ml', meal_type='ontbijt'
+    ))
+    daily_food_service.add_entry(LOG_DATE, DailyFoodEntryCreate(
+        recipe_id=recipe.id, amount=2.0, unit='portie', meal_type='diner'
+    ))
+    return recipe
+
+
+class TestDailyFoodSummary:
+    def test_summary_empty_day(self, daily_food_service):
+        """Test a day without entries has zero totals for every meal type"""
+        result = daily_food_service.get_daily_summary(LOG_DATE)
+
+        assert isinstance(result, DailyFoodSummaryResponse)
+        assert result.entries == []
+        assert set(result.meal_types) == {'ontbijt', 'lunch', 'diner', 'tussendoortje'}
+        assert result.total.energy_kcal == 0.0
+
+    def test_summary_entry_totals(self, daily_food_service, logged_day):
+        """Test product and recipe entries are scaled by the amount eaten"""
+        result = daily_food_service.get_daily_summary(LOG_DATE)
+
+        milk, recipe = result.entries
+        assert milk.name == 'Melk'
+        # 42 kcal per 100 ml
+        assert milk.nutrition.energy_kcal == pytest.approx(105.0)
+        assert recipe.name == 'Simple Recipe'
+        # 100 g flour for 2 servings, 2 servings eaten
+        assert recipe.nutrition.energy_kcal == pytest.approx(364.0)
+        assert recipe.nutrition.proteins == pytest.approx(10.3)
+
+    def test_summary_meal_type_and_day_totals(self, daily_food_service, logged_day):
+        """Test entries are summed per meal type and for the whole day"""
+        result = daily_food_service.get_daily_summary(LOG_DATE)
+
+        assert result.meal_types['ontbijt'].energy_kcal == pytest.approx(105.0)
+        assert result.meal_types['diner'].energy_kcal == pytest.approx(364.0)
+        assert result.meal_types['lunch'].energy_kcal == 0.0
+        assert result.total.energy_kcal == pytest.approx(469.0)
+
+    def test_summary_ignores_other_days(self, daily_food_service, logged_day, sample_products):
+        """Test only entries of the requested date are included"""
+        daily_food_service.add_entry(date(2024, 1, 16), DailyFoodEntryCreate(
+            product_id=sample_products[0].id, amount=100.0, unit='gram'
+        ))
+
+        result = daily_food_service.get_daily_summary(LOG_DATE)
+
+        assert len(result.entries) == 2
+        assert result.meal_types['tussendoortje'].energy_kcal == 0.0
+
+
+class TestDailyFoodRange:
+    @pytest.fixture
+    def logged_days(self, daily_food_service, sample_products):
+        """Flour on Monday 15 and Sunday 21 January, eggs on Monday 22"""
+        for log_date, product, meal_type in [
+            (date(2024, 1, 15), sample_products[0], 'ontbijt'),
+            (date(2024, 1, 21), sample_products[0], 'lunch'),
+            (date(2024, 1, 22), sample_products[1], 'ontbijt'),
+        ]:
+            daily_food_service.add_entry(log_date, DailyFoodEntryCreate(
+                product_id=product.id, amount=100.0, unit='gram', meal_type=meal_type
+            ))
+
+    def test_get_entries_in_range(self, daily_food_service, logged_days):
+        """Test entries of every day in the range are returned in date order"""
+        result = daily_food_service.get_entries(date(2024, 1, 15), date(2024, 1, 21))
+
+        assert [entry.date for entry in result] == [date(2024, 1, 15), date(2024, 1, 21)]
+        assert result[0].nutrition.energy_kcal == pytest.approx(364.0)
+
+    def test_get_totals_per_day(self, daily_food_service, logged_days):
+        """Test totals are grouped per day"""
+        result = daily_food_service.get_totals(date(2024, 1, 1), date(2024, 1, 31), 'day')
+
+        assert [group.key for group in result.groups] == [
+            '2024-01-15', '2024-01-21', '2024-01-22'
+        ]
+        assert result.total.energy_kcal == pytest.approx(364.0 * 2 + 155.0)
+
+    def test_get_totals_per_week(self, daily_food_service, logged_days):
+        """Test weeks run from Monday to Sunday and are keyed by their Monday"""
+        result = daily_food_service.get_totals(date(2024, 1, 1), date(2024, 1, 31), 'week')
+
+        assert [(group.key, group.entries) for group in result.groups] == [
+            ('2024-01-15', 2), ('2024-01-22', 1)
+        ]
+        assert result.groups[0].nutrition.energy_kcal == pytest.approx(728.0)
+
+    def test_get_totals_per_month(self, daily_food_service, logged_days, sample_products, query_budget):
+        """Test months are keyed by their first day and read from the rollup in one query"""
+        daily_food_service.add_entry(date(2024, 2, 3), DailyFoodEntryCreate(
+            product_id=sample_products[0].id, amount=50.0, unit='gram'
+        ))
+
+        with query_budget(1):
+            result = daily_food_service.get_totals(date(2024, 1, 1), date(2024, 2, 29), 'month')
+
+        assert [(group.key, group.entries) for group in result.groups] == [
+            ('2024-01-01', 3), ('2024-02-01', 1)
+        ]
+        assert result.groups[1].nutrition.energy_kcal == pytest.approx(182.0)
+
+    def test_get_totals_per_meal_type(self, daily_food_service, logged_days):
+        """Test totals are grouped per meal type"""
+        result = daily_food_service.get_totals(
+            date(2024, 1, 1), date(2024, 1, 31), 'meal_type'
+        )
+
+        totals = {group.key: group.nutrition.energy_kcal for group in result.groups}
+        assert totals == pytest.approx({'lunch': 364.0, 'ontbijt': 519.0})
+
+    def test_invalid_range(self, daily_food_service):
+        """Test reversed and too long ranges are rejected"""
+        with pytest.raises(ValueError):
+            daily_food_service.get_entries(date(2024, 2, 1), date(2024, 1, 1))
+        with pytest.raises(ValueError):
+            daily_food_service.get_totals(date(2023, 1, 1), date(2024, 12, 31))
+
+    def test_invalid_group(self, daily_food_service):
+        """Test an unknown grouping is rejected"""
+        with pytest.raises(ValueError):
+            daily_food_service.get_totals(date(2024, 1, 1), date(2024, 1, 31), 'year')
+
+
+class TestDailyFoodBatchAndCopy:
+    def test_add_entries(self, daily_food_service, logged_day, sample_products, query_budget):
+        """Test a batch is inserted with one multi-row INSERT and returned in order"""
+        entries = [
+            DailyFoodEntryCreate(product_id=product.id, amount=50.0, unit='gram', meal_type='lunch')
+            for product in sample_products
+        ]
+
+        with query_budget(8) as stats:
+            result = daily_food_service.add_entries(LOG_DATE, entries)
+
+        inserts = [shape for shape in stats.shapes.elements() if shape.startswith('INSERT INTO daily_food_entries')]
+        assert len(inserts) == 1
+        assert [entry.product_id for entry in result] == [product.id for product in sample_products]
+        assert result[0].product['name'] == sample_products[0].name
+        assert len(daily_food_service.get_daily_log(LOG_DATE).entries) == 5
+
+    def test_add_entries_new_day(self, daily_food_service, sample_products):
+        """Test a batch creates the daily log when needed"""
+        result = daily_food_service.add_entries(date(2024, 2, 1), [
+            DailyFoodEntryCreate(product_id=sample_products[0].id, amount=10.0, unit='gram')
+        ])
+
+        assert len(result) == 1
+        assert daily_food_service.get_daily_log(date(2024, 2, 1)).entries[0].id == result[0].id
+
+    def test_copy_day(self, daily_food_service, logged_day, query_budget):
+        """Test a whole day is copied with a single INSERT ... SELECT"""
+        target = date(2024, 1, 16)
+
+        with query_budget(8) as stats:
+            result = daily_food_service.copy_entries(target, LOG_DATE)
+
+        inserts = [shape for shape in stats.shapes.elements() if shape.startswith('INSERT INTO daily_food_entries')]
+        assert len(inserts) == 1
+        assert [entry.meal_type for entry in result] == ['ontbijt', 'diner']
+        assert result[1].recipe['id'] == logged_day.id
+        summary = daily_food_service.get_daily_summary(target)
+        assert summary.total.energy_kcal == pytest.approx(469.0)
+
+    def test_copy_meal_type(self, daily_food_service, logged_day):
+        """Test only the entries of one meal are copied"""
+        result = daily_food_service.copy_entries(date(2024, 1, 16), LOG_DATE, 'diner')
+
+        assert len(result) == 1
+        assert result[0].recipe_id == logged_day.id
+        assert len(daily_food_service.get_daily_log(LOG_DATE).entries) == 2
+
+    def test_copy_empty_day(self, daily_food_service):
+        """Test copying a day without entries copies nothing"""
+        assert daily_food_service.copy_entries(date(2024, 1, 16), LOG_DATE) == []
+
+    def test_copy_onto_itself(self, daily_food_service, logged_day):
+        """Test a day cannot be copied onto itself"""
+        with pytest.raises(ValueError):
+            daily_food_service.copy_entries(LOG_DATE, LOG_DATE)
@@ -0,0 +1,138 @@
+import pytest
+from datetime import date
+from sqlalchemy import create_engine, select
+from models.daily_food_log import DailyFoodEntryCreate
+from models.daily_nutrition_total import DailyNutritionTotalDB
+from models.product import Base, ProductCreate
+from models.recipe import RecipeCreate, RecipePatch
+from repositories.daily_nutrition_totals_repository import DailyNutritionTotalsRepository
+from commands.rebuild_nutrition_totals import main as rebuild_main
+
+MONDAY = date(2024, 1, 15)
+TUESDAY = date(2024, 1, 16)
+
+
+def rollup(db):
+    """The rollup rows as (date, meal_type, entries, kcal), kcal rounded"""
+    rows = db.execute(select(DailyNutritionTotalDB).order_by(
+        DailyNutritionTotalDB.date, DailyNutritionTotalDB.meal_type
+    )).scalars().all()
+    return [(row.date, row.meal_type, row.entries, round(row.energy_kcal, 6)) for row in rows]
+
+
+def recomputed(db):
+    """The rollup rows as a full rebuild would produce them"""
+    totals = DailyNutritionTotalsRepository(db)._totals()
+    rows = db.execute(totals.order_by(*totals.selected_columns[:2])).all()
+    return [(row[0], row[1], row[2], round(row[3], 6)) for row in rows]
+
+
+@pytest.fixture
+def recipe(recipe_repo, minimal_recipe_data):
+    return recipe_repo.create_recipe(RecipeCreate(**minimal_recipe_data))
+
+
+@pytest.fixture
+def entries(daily_food_repo, sample_products, recipe):
+    """Flour and a recipe on Monday, milk on Tuesday"""
+    return [
+        daily_food_repo.add_entry(MONDAY, DailyFoodEntryCreate(
+            product_id=sample_products[0].id, amount=100.0, unit='gram', meal_type='ontbijt'
+        )),
+        daily_food_repo.add_entry(MONDAY, DailyFoodEntryCreate(
+            recipe_id=recipe.id, amount=2.0, unit='portie', meal_type='diner'
+        )),
+        daily_food_repo.add_entry(TUESDAY, DailyFoodEntryCreate(
+            product_id=sample_products[2].id, amount=250.0, unit='ml', meal_type='ontbijt'
+        )),
+    ]
+
+
+class TestRollupDeltas:
+    def test_add_entry(self, test_db, entries):
+        """Test added entries show up per date and meal type"""
+        assert rollup(test_db) == [
+            (MONDAY, 'diner', 1, 364.0),
+            (MONDAY, 'ontbijt', 1, 364.0),
+            (TUESDAY, 'ontbijt', 1, 105.0),
+        ]
+        assert rollup(test_db) == recomputed(test_db)
+
+    def test_add_entry_adds_delta(self, test_db, daily_food_repo, entries, sample_products, query_budget):
+        """Test a second entry in the same meal is added to the existing row in one statement"""
+        with query_budget(6) as stats:
+            daily_food_repo.add_entry(MONDAY, DailyFoodEntryCreate(
+                product_id=sample_products[1].id, amount=50.0, unit='gram', meal_type='ontbijt'
+            ))
+
+        writes = [shape for shape in stats.shapes if 'daily_nutrition_totals' in shape]
+        assert len(writes) == 1
+        assert rollup(test_db)[1][:3] == (MONDAY, 'ontbijt', 2)
+        assert rollup(test_db) == recomputed(test_db)
+
+    def test_update_entry_moves_delta(self, test_db, daily_food_repo, entries, sample_products):
+        """Test an update takes the old values out and adds the new ones"""
+        daily_food_repo.update_entry(entries[0].id, DailyFoodEntryCreate(
+            product_id=sample_products[1].id, amount=200.0, unit='gram', meal_type='lunch'
+        ))
+
+        assert [row[:3] for row in rollup(test_db)] == [
+            (MONDAY, 'diner', 1), (MONDAY, 'lunch', 1), (TUESDAY, 'ontbijt', 1)
+        ]
+        assert rollup(test_db) == recomputed(test_db)
+
+    def test_delete_entry(self, test_db, daily_food_repo, entries):
+        """Test deleting the last entry of a meal removes its row"""
+        daily_food_repo.delete_entry(entries[2].id)
+
+        assert [row[:2] for row in rollup(test_db)] == [(MONDAY, 'diner'), (MONDAY, 'ontbijt')]
+        assert rollup(test_db) == recomputed(test_db)
+
+    def test_batch_and_copy(self, test_db, daily_food_repo, entries, sample_products):
+        """Test batch inserts and day copies apply their deltas too"""
+        daily_food_repo.add_entries(TUESDAY, [
+            DailyFoodEntryCreate(product_id=product.id, amount=10.0, unit='gram', meal_type='lunch')
+            for product in sample_products
+        ])
+        daily_food_repo.copy_entries(date(2024, 1, 17), MONDAY)
+
+        assert rollup(test_db) == recomputed(test_db)
+        assert len(rollup(test_db)) == 6
+
+
+class TestRollupRebuild:
+    def test_product_update_rebuilds_affected_dates(self, test_db, product_repo, entries, sample_products):
+        """Test changing a product updates product and recipe entries using it"""
+        flour = sample_products[0]
+        product_repo.update_product(flour.id, ProductCreate(
+            name=flour.name, serving_size=100.0, energy_kcal=400.0, fats=1.0,
+            carbohydrates=70.0, sugars=1.0, fibers=3.0, proteins=10.0
+        ))
+
+        assert rollup(test_db)[:2] == [(MONDAY, 'diner', 1, 400.0), (MONDAY, 'ontbijt', 1, 400.0)]
+        assert rollup(test_db) == recomputed(test_db)
+
+    def test_recipe_update_rebuilds_affected_dates(self, test_db, recipe_repo, entries, recipe, sample_products):
+        """Test changing a recipe's ingredients updates the entries of that recipe"""
+        recipe_repo.patch_recipe(recipe.id, RecipePatch(servings=4))
+
+        assert rollup(test_db)[0] == (MONDAY, 'diner', 1, 182.0)
+        assert rollup(test_db) == recomputed(test_db)
+
+    def test_rebuild_range(self, test_db, entries):
+        """Test a range rebuild only touches its own dates"""
+        test_db.query(DailyNutritionTotalDB).delete()
+        DailyNutritionTotalsRepository(test_db).rebuild(TUESDAY, TUESDAY)
+        test_db.commit()
+
+        assert rollup(test_db) == [(TUESDAY, 'ontbijt', 1, 105.0)]
+
+    def test_rebuild_command(self, tmp_path, capsys):
+        """Test the command rebuilds the rollup of a database"""
+        url = f"sqlite:///{tmp_path / 'rollup.db'}"
+        engine = create_engine(url)
+        Base.metadata.create_all(engine)
+        engine.dispose()
+
+        assert rebuild_main(['--database-url', url, '--from', '2024-01-01']) == 0
+        assert 'daily_nutrition_totals: 0 rows' in capsys.readouterr().out
@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+import pytest
+from datetime import date
+from sqlalchemy.orm import sessionmaker
+from models.recipe import RecipeCreate
+from models.weekmenu import WeekMenuDB, MenuDayDB
+from models.daily_food_log import DailyFoodLogDB, DailyFoodEntryDB
+from services.export_service import ExportService
+
+
+@pytest.fixture
+def export_service(test_db):
+    """Export service using its own sessions on the test database"""
+    return ExportService(sessionmaker(bind=test_db.get_bind()))
+
+
+@pytest.fixture
+def daily_logs(test_db, sample_products):
+    for day in (1, 2, 3):
+        log = DailyFoodLogDB(date=date(2024, 1, day))
+        log.entries.append(DailyFoodEntryDB(
+            product_id=sample_products[0].id, amount=50.0, unit="gram", meal_type="lunch"
+        ))
+        test_db.add(log)
+    test_db.commit()
+
+
+def read_ndjson(chunks):
+    return [json.loads(line) for line in "".join(chunks).splitlines()]
+
+
+class TestExportService:
+    def test_export_products_ndjson(self, export_service, sample_products):
+        """Test products are exported one JSON object per line"""
+        rows = read_ndjson(export_service.stream("products"))
+        assert [row["name"] for row in rows] == ["Bloem", "Eieren", "Melk"]
+        assert rows[0]["energy_kcal"] == 364.0
+
+    def test_export_products_csv(self, export_service, sample_products):
+        """Test products CSV has a header and one line per product"""
+        rows = list(csv.DictReader(io.StringIO("".join(export_service.stream("products", "csv")))))
+        assert len(rows) == 3
+        assert rows[1]["name"] == "Eieren"
+
+    def test_export_recipes_with_ingredients(self, export_service, recipe_repo, sample_recipe_data):
+        """Test recipes include their ingredients in both formats"""
+        recipe_repo.create_recipe(RecipeCreate(**sample_recipe_data))
+
+        rows = read_ndjson(export_service.stream("recipes"))
+        assert len(rows) == 1
+        assert [i["product_name"] for i in rows[0]["ingredients"]] == ["Bloem", "Eieren", "Melk"]
+
+        lines = list(csv.DictReader(io.StringIO("".join(export_service.stream("recipes", "csv")))))
+        assert len(lines) == 3
+        assert lines[0]["name"] == "Pannenkoeken"
+        assert lines[2]["ingredient_unit"] == "ml"
+
+    def test_export_week_menus(self, export_service, test_db):
+        """Test week menus include their days"""
+        menu = WeekMenuDB(start_date=date(2024, 1, 1), end_date=date(2024, 1, 7))
+        menu.days.append(MenuDayDB(date=date(2024, 1, 1), servings=2))
+        test_db.add(menu)
+        test_db.commit()
+
+        rows = read_ndjson(export_service.stream("weekmenus"))
+        assert rows[0]["start_date"] == "2024-01-01"
+        assert rows[0]["days"][0]["servings"] == 2
+
+    def test_export_daily_logs_date_range(self, export_service, daily_logs):
+        """Test daily logs can be limited to a date range"""
+        rows = read_ndjson(export_service.stream(
+            "daily-food", date_from=date(2024, 1, 2), date_to=date(2024, 1, 3)
+        ))
+        assert [row["date"] for row in rows] == ["2024-01-02", "2024-01-03"]
+        assert rows[0]["entries"][0]["meal_type"] == "lunch"
+
+    def test_export_empty_csv_has_header(self, export_service):
+        """Test an empty table still produces a CSV header"""
+        output = "".join(export_service.stream("daily-food", "csv"))
+        assert output.splitlines() == ["id,date,entry_id,entry_product_id,entry_recipe_id,entry_amount,entry_unit,entry_meal_type"]
+
+    def test_export_unknown_resource(self, export_service):
+        """Test unknown resources are rejected before streaming"""
+        with pytest.raises(KeyError):
+            export_service.stream("users")
+
+    def test_export_invalid_date_range(self, export_service):
+        """Test from after to is rejected"""
+        with pytest.raises(ValueError):
+            export_service.stream("daily-food", date_from=date(2024, 2, 1), date_to=date(2024, 1, 1))
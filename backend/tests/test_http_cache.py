@@ -0,0 +1,145 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from unittest.mock import AsyncMock, Mock
+
+from models.product import Base, ProductCreate, ProductPage
+from models.table_version import TableVersionDB
+from repositories.product_repository import ProductRepository
+from repositories.version_repository import VersionRepository
+from routes.product_routes import router, get_product_service
+from utils.http_cache import get_version_repository, make_etag
+from utils.nutrition_matrix import NutritionMatrix
+from utils.search_index import SearchIndex
+
+class SyncVersions:
+    """Async facade over VersionRepository on the shared sync session"""
+
+    def __init__(self, db):
+        self.db = db
+
+    async def get_versions(self, tables):
+        return VersionRepository(self.db).get_versions(tables)
+
+@pytest.fixture
+def shared_db():
+    """In-memory database shared with the TestClient worker threads"""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def product_service():
+    service = Mock()
+    service.get_products_page = AsyncMock(return_value=ProductPage(items=[], next_cursor=None))
+    return service
+
+@pytest.fixture
+def client(shared_db, product_service):
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_product_service] = lambda: product_service
+    app.dependency_overrides[get_version_repository] = lambda: SyncVersions(shared_db)
+    return TestClient(app)
+
+def create_product(db, name='Appel'):
+    repo = ProductRepository(db, search_index=SearchIndex(), nutrition_matrix=NutritionMatrix())
+    return repo.create_product(ProductCreate(
+        name=name, serving_size=100.0, energy_kcal=52.0, fats=0.2,
+        carbohydrates=14.0, sugars=10.0, fibers=2.4, proteins=0.3
+    ))
+
+
+class TestVersionRepository:
+    def test_versions_start_at_zero(self, shared_db):
+        """Test tables that were never written have version 0"""
+        versions, last_modified = VersionRepository(shared_db).get_versions(['products'])
+
+        assert versions == (0,)
+        assert last_modified is None
+
+    def test_repository_writes_bump_version(self, shared_db):
+        """Test product writes bump the products counter in the same commit"""
+        product = create_product(shared_db)
+        ProductRepository(
+            shared_db, search_index=SearchIndex(), nutrition_matrix=NutritionMatrix()
+        ).delete_product(product.id)
+
+        versions, last_modified = VersionRepository(shared_db).get_versions(
+            ['products', 'recipes']
+        )
+        assert versions == (2, 0)
+        assert last_modified is not None
+
+    def test_bump_creates_and_increments_counters(self, shared_db):
+        """Test one bump adds missing counters and increments existing ones"""
+        repo = VersionRepository(shared_db)
+        repo.bump('products')
+        shared_db.commit()
+
+        repo.bump('recipes', 'products', 'recipes')
+        shared_db.commit()
+
+        versions, _ = repo.get_versions(['products', 'recipes', 'week_menus'])
+        assert versions == (2, 1, 0)
+
+    def test_bump_is_rolled_back_with_the_transaction(self, shared_db):
+        """Test a counter change is not visible when the write fails"""
+        VersionRepository(shared_db).bump('products')
+        shared_db.rollback()
+
+        assert shared_db.query(TableVersionDB).count() == 0
+
+
+class TestConditionalGet:
+    def test_response_has_validators(self, client, shared_db):
+        """Test GET responses carry ETag and Last-Modified"""
+        create_product(shared_db)
+
+        response = client.get("/api/products/")
+
+        assert response.status_code == 200
+        assert response.headers['etag'] == make_etag([1])
+        assert response.headers['last-modified'].endswith('GMT')
+
+    def test_if_none_match_returns_304_without_query(self, client, shared_db, product_service):
+        """Test a current ETag is answered with 304 before the service runs"""
+        create_product(shared_db)
+        etag = client.get("/api/products/").headers['etag']
+        product_service.get_products_page.reset_mock()
+
+        response = client.get("/api/products/", headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.content == b''
+        assert response.headers['etag'] == etag
+        product_service.get_products_page.assert_not_called()
+
+    def test_write_invalidates_etag(self, client, shared_db):
+        """Test a product change makes the old ETag stale"""
+        create_product(shared_db)
+        etag = client.get("/api/products/").headers['etag']
+
+        create_product(shared_db, 'Peer')
+        response = client.get("/api/products/", headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.headers['etag'] != etag
+
+    def test_if_modified_since(self, client, shared_db):
+        """Test Last-Modified can be used when no ETag is sent"""
+        create_product(shared_db)
+        last_modified = client.get("/api/products/").headers['last-modified']
+
+        response = client.get("/api/products/", headers={'If-Modified-Since': last_modified})
+
+        assert response.status_code == 304
@@ -0,0 +1,229 @@
+import asyncio
+import hashlib
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from unittest.mock import patch
+
+from utils.image_store import WIDTH_CACHE_SIZE, ImageStore, read_display_width, render_renditions
+
+Image = pytest.importorskip("PIL.Image")
+
+
+@pytest.fixture
+def store(tmp_path):
+    # A thread pool keeps the rendering in this process for the tests
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        yield ImageStore(tmp_path, executor=executor)
+
+
+def image_bytes(width, height, image_format="JPEG", color=(200, 120, 40)):
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def jpeg_bytes(width, height):
+    return image_bytes(width, height)
+
+
+def store_image(store, upload):
+    async def save():
+        async with store.save(upload) as filename:
+            return filename
+    return asyncio.run(save())
+
+
+class TestImageStore:
+    def test_save_names_files_by_content(self, store):
+        """Test the stored name is the sha256 of the streamed bytes"""
+        content = jpeg_bytes(300, 200)
+        with patch("utils.image_store.CHUNK_SIZE", 256):
+            filename = store_image(store, BytesIO(content))
+
+        assert filename == f"{hashlib.sha256(content).hexdigest()}.jpg"
+        assert store.path(filename).read_bytes() == content
+
+    def test_save_deduplicates(self, store):
+        """Test saving the same bytes twice keeps one file"""
+        content = image_bytes(10, 10, "PNG")
+        first = store_image(store, BytesIO(content))
+        second = store_image(store, BytesIO(content))
+
+        assert first == second
+        assert [p.name for p in store.directory.iterdir()] == [first]
+
+    def test_save_rejects_large_files(self, store):
+        """Test the size limit applies while streaming and cleans up"""
+        with patch("utils.image_store.MAX_IMAGE_BYTES", 10):
+            with pytest.raises(ValueError):
+                store_image(store, BytesIO(b"\xff\xd8\xff" + b"x" * 8))
+
+        assert list(store.directory.iterdir()) == []
+
+    @pytest.mark.parametrize("image_format, extension", [
+        ("JPEG", "jpg"), ("PNG", "png"), ("GIF", "gif"), ("WEBP", "webp"),
+    ])
+    def test_save_names_extension_after_format(self, store, image_format, extension):
+        """Test the extension follows the detected format"""
+        filename = store_image(store, BytesIO(image_bytes(10, 10, image_format)))
+
+        assert filename.endswith(f".{extension}")
+
+    def test_save_rejects_unknown_formats(self, store):
+        """Test bytes that are no supported image are refused and cleaned up"""
+        with pytest.raises(ValueError):
+            store_image(store, BytesIO(b"not an image"))
+        with pytest.raises(ValueError):
+            store_image(store, BytesIO(b""))
+
+        assert list(store.directory.iterdir()) == []
+
+    def test_path_rejects_non_plain_names(self, store):
+        """Test only plain file names map to paths"""
+        with pytest.raises(ValueError):
+            store.path("../secret.jpg")
+        assert store.path("abc.jpg") == store.directory / "abc.jpg"
+
+    def test_variant(self, store):
+        """Test renditions are picked by width and format, with the original as fallback"""
+        stem = 'd' * 64
+        for name in [f'{stem}.jpg', f'{stem}_w640.jpg', f'{stem}_w640.webp']:
+            (store.directory / name).write_bytes(b'x')
+
+        assert store.variant(f'{stem}.jpg') == (store.path(f'{stem}.jpg'), True)
+        assert store.variant(f'{stem}.jpg', 100, webp=True) == (store.path(f'{stem}_w640.webp'), True)
+        assert store.variant(f'{stem}.jpg', 100) == (store.path(f'{stem}_w640.jpg'), True)
+        assert store.variant(f'{stem}.jpg', 1000) == (store.path(f'{stem}.jpg'), False)
+
+    def test_variant_of_narrow_original_is_final(self, store):
+        """Test an original narrower than the fitting rendition is served for good"""
+        filename = store_image(store, BytesIO(jpeg_bytes(300, 200)))
+        render_renditions(str(store.path(filename)), (320, 640, 1280))
+
+        assert store.variant(filename, 320) == (store.path(filename), True)
+        assert store.variant(filename, 100, webp=True) == (store.path(filename), True)
+
+    def test_variant_wider_than_largest_rendition(self, store):
+        """Test widths above the largest rendition get the original, not a smaller rendition"""
+        filename = store_image(store, BytesIO(jpeg_bytes(3000, 100)))
+        render_renditions(str(store.path(filename)), (1280,))
+
+        assert store.variant(filename, 2000) == (store.path(filename), True)
+        assert store.variant(filename, 1000) == (
+            store.path(filename.replace('.jpg', '_w1280.jpg')), True
+        )
+
+    def test_variant_waits_for_renditions_of_wide_original(self, store):
+        """Test a wide original is a temporary answer until its rendition exists"""
+        filename = store_image(store, BytesIO(jpeg_bytes(700, 100)))
+
+        assert store.variant(filename, 320) == (store.path(filename), False)
+        assert store.original_width(filename) == 700
+
+    def test_original_width_cache(self, store):
+        """Test widths are cached up to a limit, but failed reads are retried"""
+        filename = 'e' * 64 + '.jpg'
+        store.directory.mkdir(parents=True, exist_ok=True)
+        assert store.original_width(filename) is None
+
+        store.path(filename).write_bytes(jpeg_bytes(500, 100))
+        assert store.original_width(filename) == 500
+        assert read_display_width.cache_info().maxsize == WIDTH_CACHE_SIZE
+
+    def test_is_content_addressed(self):
+        """Test sha256 names and their renditions count as content-addressed"""
+        assert ImageStore.is_content_addressed('e' * 64 + '.jpg')
+        assert ImageStore.is_content_addressed('e' * 64 + '_w320.webp')
+        assert not ImageStore.is_content_addressed('0b5e4c3a-uuid.jpg')
+
+    def test_filename_from_url(self):
+        """Test the file name is taken from the last URL segment"""
+        assert ImageStore.filename_from_url("/api/recipes/1/image/abc.jpg") == "abc.jpg"
+        assert ImageStore.filename_from_url(None) is None
+        assert ImageStore.filename_from_url("/api/recipes/1/image/") is None
+
+    def test_render_renditions(self, store):
+        """Test thumbnails are written for widths below the original only"""
+        filename = store_image(store, BytesIO(jpeg_bytes(800, 400)))
+        stem = filename.split(".")[0]
+
+        written = render_renditions(str(store.path(filename)), (320, 640, 1280))
+
+        assert sorted(written) == sorted(
+            f"{stem}_w{width}.{ext}" for width in (320, 640) for ext in ("webp", "jpg")
+        )
+        with Image.open(store.path(f"{stem}_w320.webp")) as thumbnail:
+            assert thumbnail.size == (320, 160)
+        # Existing renditions are not rendered again
+        assert render_renditions(str(store.path(filename)), (320,)) == []
+
+    def test_generate_renditions_logs_unreadable_images(self, store):
+        """Test a broken upload does not raise in the background task"""
+        filename = store_image(store, BytesIO(b"\xff\xd8\xff truncated"))
+
+        assert asyncio.run(store.generate_renditions(filename)) == []
+
+    def test_generate_renditions_in_executor(self, store):
+        """Test the background task renders through the executor"""
+        filename = store_image(store, BytesIO(jpeg_bytes(700, 700)))
+
+        written = asyncio.run(store.generate_renditions(filename))
+
+        assert len(written) == 4
+
+    def test_release_removes_renditions(self, store):
+        """Test releasing an image removes its thumbnails but not other files"""
+        filename = store_image(store, BytesIO(jpeg_bytes(700, 700)))
+        other = store_image(store, BytesIO(image_bytes(10, 10, "PNG")))
+        render_renditions(str(store.path(filename)), (320,))
+
+        assert store.release(filename, lambda: False)
+
+        assert [p.name for p in store.directory.iterdir()] == [other]
+
+    def test_release_keeps_image_in_use(self, store):
+        """Test nothing is removed while a recipe refers to the image"""
+        filename = store_image(store, BytesIO(jpeg_bytes(10, 10)))
+
+        assert not store.release(filename, lambda: True)
+        assert store.path(filename).exists()
+
+    def test_release_restores_image_referred_to_meanwhile(self, store):
+        """Test a reference committed between the two checks keeps the image"""
+        filename = store_image(store, BytesIO(jpeg_bytes(700, 700)))
+        render_renditions(str(store.path(filename)), (320,))
+        checks = iter([False, True])
+
+        assert not store.release(filename, lambda: next(checks))
+
+        assert sorted(p.name for p in store.directory.iterdir()) == sorted(
+            [filename, filename.replace(".jpg", "_w320.jpg"), filename.replace(".jpg", "_w320.webp")]
+        )
+
+    def test_save_restores_image_released_before_commit(self, store):
+        """Test a deduplicated upload puts back a file deleted before its commit"""
+        content = jpeg_bytes(10, 10)
+        existing = store_image(store, BytesIO(content))
+
+        async def upload():
+            async with store.save(BytesIO(content)) as filename:
+                # The last other referrer lets go before this upload commits
+                store.release(filename, lambda: False)
+                assert not store.path(filename).exists()
+            return filename
+
+        assert asyncio.run(upload()) == existing
+        assert store.path(existing).read_bytes() == content
+        assert [p.name for p in store.directory.iterdir()] == [existing]
+
+    def test_failed_save_block_leaves_no_copies(self, store):
+        """Test the held copy goes when the commit inside the block fails"""
+        async def upload():
+            async with store.save(BytesIO(jpeg_bytes(10, 10))) as filename:
+                raise RuntimeError("commit failed")
+
+        with pytest.raises(RuntimeError):
+            asyncio.run(upload())
+
+        assert len(list(store.directory.iterdir())) == 1
@@ -0,0 +1,102 @@
+import os
+import pytest
+from datetime import date
+from sqlalchemy import create_engine, inspect, text
+
+alembic = pytest.importorskip("alembic")
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from models.product import Base
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def db_url(tmp_path):
+    return f"sqlite:///{tmp_path / 'migrations.db'}"
+
+
+@pytest.fixture
+def alembic_config(db_url):
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("sqlalchemy.url", db_url)
+    return config
+
+
+class TestMigrations:
+    def test_upgrade_matches_models(self, alembic_config, db_url):
+        """Test that migrating an empty database yields the model schema"""
+        command.upgrade(alembic_config, "head")
+
+        engine = create_engine(db_url)
+        with engine.connect() as connection:
+            diff = compare_metadata(MigrationContext.configure(connection), Base.metadata)
+        assert diff == []
+
+    def test_upgrade_adds_indexes(self, alembic_config, db_url):
+        """Test the hot join columns are indexed and log dates are unique"""
+        command.upgrade(alembic_config, "head")
+
+        inspector = inspect(create_engine(db_url))
+        entry_indexes = {i["name"] for i in inspector.get_indexes("daily_food_entries")}
+        assert "ix_daily_food_entries_daily_log_id" in entry_indexes
+        day_indexes = {i["name"] for i in inspector.get_indexes("menu_days")}
+        assert {"ix_menu_days_week_menu_id", "ix_menu_days_date"} <= day_indexes
+        log_indexes = {i["name"]: i for i in inspector.get_indexes("daily_food_logs")}
+        assert log_indexes["ix_daily_food_logs_date"]["unique"]
+
+    def test_upgrade_existing_database_merges_duplicate_logs(self, alembic_config, db_url):
+        """Test a create_all database with duplicate daily logs can be upgraded"""
+        command.upgrade(alembic_config, "0001")
+        engine = create_engine(db_url)
+        with engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO daily_food_logs (id, date) VALUES (1, :d), (2, :d)"
+            ), {"d": date(2024, 1, 1)})
+            connection.execute(text(
+                "INSERT INTO daily_food_entries (daily_log_id, amount, unit, meal_type) "
+                "VALUES (1, 10, 'gram', 'lunch'), (2, 20, 'gram', 'diner')"
+            ))
+
+        command.upgrade(alembic_config, "head")
+
+        with engine.connect() as connection:
+            logs = connection.execute(text("SELECT id FROM daily_food_logs")).all()
+            entries = connection.execute(
+                text("SELECT daily_log_id FROM daily_food_entries")
+            ).all()
+        assert logs == [(1,)]
+        assert entries == [(1,), (1,)]
+
+    def test_upgrade_fills_daily_nutrition_totals(self, alembic_config, db_url):
+        """Test the rollup table is filled from the existing entries"""
+        command.upgrade(alembic_config, "0004")
+        engine = create_engine(db_url)
+        with engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO products (id, name, serving_size, serving_unit, serving_amount, "
+                "energy_kcal, fats, carbohydrates, sugars, fibers, proteins) "
+                "VALUES (1, 'Kwark', 100, 'gram', 100, 60, 0, 4, 4, 0, 10)"
+            ))
+            connection.execute(text("INSERT INTO daily_food_logs (id, date) VALUES (1, :d)"), {"d": date(2024, 1, 1)})
+            connection.execute(text(
+                "INSERT INTO daily_food_entries (daily_log_id, product_id, amount, unit, meal_type) "
+                "VALUES (1, 1, 200, 'gram', 'ontbijt'), (1, 1, 50, 'gram', 'ontbijt'), (1, 1, 100, 'gram', 'lunch')"
+            ))
+
+        command.upgrade(alembic_config, "head")
+
+        with engine.connect() as connection:
+            rows = connection.execute(text(
+                "SELECT meal_type, entries, energy_kcal, proteins FROM daily_nutrition_totals ORDER BY meal_type"
+            )).all()
+        assert rows == [("lunch", 1, 60.0, 10.0), ("ontbijt", 2, 150.0, 25.0)]
+
+    def test_downgrade(self, alembic_config, db_url):
+        """Test migrations can be rolled back"""
+        command.upgrade(alembic_config, "head")
+        command.downgrade(alembic_config, "base")
+
+        assert inspect(create_engine(db_url)).get_table_names() == ["alembic_version"]
@@ -0,0 +1,51 @@
+import pytest
+from utils.nutrition_matrix import NutritionMatrix
+
+
+@pytest.fixture
+def matrix():
+    matrix = NutritionMatrix(capacity=2)
+    matrix.load([
+        # id, serving_size, energy_kcal, fats, carbohydrates, sugars, fibers, proteins
+        (1, 100.0, 364.0, 1.0, 76.0, 0.3, 2.7, 10.3),
+        (2, 50.0, 100.0, 10.0, 0.0, 0.0, 0.0, 5.0),
+    ])
+    return matrix
+
+
+class TestNutritionMatrix:
+    def test_compute_totals_per_recipe(self, matrix):
+        """Test amounts are scaled by serving size and summed per recipe"""
+        totals = matrix.compute([[(1, 250.0), (2, 100.0)], [(2, 25.0)], []])
+
+        assert totals.shape == (3, 6)
+        assert totals[0][0] == pytest.approx(910.0 + 200.0)
+        assert totals[0][5] == pytest.approx(25.75 + 10.0)
+        assert totals[1][1] == pytest.approx(5.0)
+        assert totals[2].tolist() == [0.0] * 6
+
+    def test_compute_empty_batch(self, matrix):
+        """Test an empty batch returns an empty result"""
+        assert matrix.compute([]).shape == (0, 6)
+
+    def test_unknown_product(self, matrix):
+        """Test unknown product ids are reported"""
+        with pytest.raises(KeyError) as exc_info:
+            matrix.compute([[(1, 10.0), (42, 10.0)]])
+        assert exc_info.value.args[0] == [42]
+
+    def test_upsert_grows_and_updates(self, matrix):
+        """Test products can be added beyond capacity and updated in place"""
+        for product_id in range(3, 10):
+            matrix.upsert(product_id, 100.0, [100.0, 0, 0, 0, 0, 0])
+        matrix.upsert(1, 100.0, [50.0, 0, 0, 0, 0, 0])
+
+        assert len(matrix) == 9
+        assert matrix.compute([[(9, 100.0)], [(1, 100.0)]])[:, 0].tolist() == [100.0, 50.0]
+
+    def test_remove_reuses_row(self, matrix):
+        """Test a removed product is no longer known and its row is reused"""
+        matrix.remove(2)
+        assert 2 not in matrix
+        matrix.upsert(3, 100.0, [1.0, 0, 0, 0, 0, 0])
+        assert matrix.compute([[(3, 100.0)]])[0][0] == 1.0
@@ -0,0 +1,77 @@
+import pytest
+from models.product import ProductCreate
+from models.recipe import RecipeCreate
+from models.nutrition import RecipeNutritionDraft
+from services.nutrition_service import NutritionService
+
+
+@pytest.fixture
+def nutrition_service(recipe_repo, product_repo):
+    """Nutrition service fixture"""
+    return NutritionService(recipe_repo, product_repo)
+
+
+@pytest.fixture
+def pancakes(recipe_repo, sample_recipe_data):
+    return recipe_repo.create_recipe(RecipeCreate(**sample_recipe_data))
+
+
+class TestNutritionService:
+    def test_get_recipe_nutrition(self, nutrition_service, pancakes):
+        """Test totals and per-serving values of a saved recipe"""
+        result = nutrition_service.get_recipe_nutrition(pancakes.id)
+
+        # 250g flour, 3 eggs (per 100 serving size) and 500ml milk
+        assert result.recipe_id == pancakes.id
+        assert result.total.energy_kcal == pytest.approx(910.0 + 4.65 + 210.0)
+        assert result.per_serving.energy_kcal == pytest.approx((910.0 + 4.65 + 210.0) / 4)
+        assert result.total.proteins == pytest.approx(25.75 + 0.39 + 17.0)
+
+    def test_get_recipe_nutrition_not_found(self, nutrition_service):
+        """Test unknown recipe returns None"""
+        assert nutrition_service.get_recipe_nutrition(999) is None
+
+    def test_recipe_without_ingredients(self, nutrition_service, recipe_repo):
+        """Test a recipe without ingredients has zero nutrition"""
+        recipe = recipe_repo.create_recipe(RecipeCreate(
+            name="Water", servings=1, preparation_time=1, instructions="Pour"
+        ))
+        result = nutrition_service.get_recipe_nutrition(recipe.id)
+        assert result.total.energy_kcal == 0.0
+
+    def test_batch_with_drafts(self, nutrition_service, pancakes, minimal_recipe_data, sample_products):
+        """Test saved recipes and drafts are calculated in one call, in order"""
+        draft = RecipeNutritionDraft(
+            servings=2,
+            ingredients=[{"product_id": sample_products[2].id, "amount": 200, "unit": "ml"}],
+        )
+        results = nutrition_service.get_recipes_nutrition([pancakes.id, pancakes.id], [draft])
+
+        assert [r.recipe_id for r in results] == [pancakes.id, pancakes.id, None]
+        assert results[2].total.energy_kcal == pytest.approx(84.0)
+        assert results[2].per_serving.energy_kcal == pytest.approx(42.0)
+
+    def test_batch_unknown_recipe(self, nutrition_service, pancakes):
+        """Test unknown recipe ids are rejected"""
+        with pytest.raises(ValueError, match="Recipes not found"):
+            nutrition_service.get_recipes_nutrition([pancakes.id, 999])
+
+    def test_draft_unknown_product(self, nutrition_service, sample_products):
+        """Test drafts referencing unknown products are rejected"""
+        draft = RecipeNutritionDraft(
+            servings=1, ingredients=[{"product_id": 999, "amount": 1, "unit": "gram"}]
+        )
+        with pytest.raises(ValueError, match="Products not found"):
+            nutrition_service.get_recipes_nutrition([], [draft])
+
+    def test_product_update_is_reflected(self, nutrition_service, product_repo, pancakes, sample_products):
+        """Test that updating a product updates the matrix without reloading"""
+        before = nutrition_service.get_recipe_nutrition(pancakes.id).total.energy_kcal
+        milk = sample_products[2]
+        product_repo.update_product(milk.id, ProductCreate(
+            name="Melk", serving_size=100.0, energy_kcal=84.0, fats=2.5,
+            carbohydrates=4.8, sugars=4.8, fibers=0.0, proteins=3.4
+        ))
+
+        after = nutrition_service.get_recipe_nutrition(pancakes.id).total.energy_kcal
+        assert after == pytest.approx(before + 210.0)
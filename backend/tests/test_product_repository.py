@@ -1,5 +1,6 @@
 import pytest
-from models.product import ProductCreate, ProductDB
+from models.product import ProductCreate, ProductDB, ProductFilter, ProductBatchUpdate
+from utils.pagination import encode_cursor
 
 
 class TestProductRepository:
@@ -107,3 +108,159 @@ class TestProductRepository:
         result = product_repo.get_product_by_id(db_product.id)
         assert result.serving_unit == "gram"
         assert result.serving_amount == 100.0
+
+    def test_get_all_products_does_not_dirty_session(self, product_repo, test_db):
+        """Test that legacy serving defaults are not written back on read"""
+        db_product = ProductDB(
+            name="Legacy Product", serving_size=150.0, energy_kcal=200.0,
+            fats=8.0, carbohydrates=25.0, sugars=12.0, fibers=4.0, proteins=15.0
+        )
+        test_db.add(db_product)
+        test_db.commit()
+        test_db.query(ProductDB).update(
+            {ProductDB.serving_unit: None, ProductDB.serving_amount: None}
+        )
+        test_db.commit()
+        test_db.expire_all()
+
+        products = product_repo.get_all_products()
+        assert products[0].serving_unit == "gram"
+        assert products[0].serving_amount == 150.0
+        assert not test_db.dirty
+
+
+    def test_search_products_loads_and_updates_index(self, product_repo, sample_product_data):
+        """Test that the search index follows create, update and delete"""
+        created = product_repo.create_product(
+            ProductCreate(**dict(sample_product_data, name="Crème fraîche"))
+        )
+        assert product_repo.search_products("creme")[0][0] == created.id
+
+        product_repo.update_product(
+            created.id, ProductCreate(**dict(sample_product_data, name="Kwark"))
+        )
+        assert product_repo.search_products("creme") == []
+        assert product_repo.search_products("kwrak")[0][0] == created.id
+
+        product_repo.delete_product(created.id)
+        assert product_repo.search_products("kwark") == []
+
+    def test_search_products_initial_load(self, product_repo, test_db):
+        """Test that existing rows are loaded into the index on first search"""
+        test_db.add(ProductDB(
+            name="Volkorenbrood", serving_size=100.0, energy_kcal=250.0, fats=3.0,
+            carbohydrates=40.0, sugars=3.0, fibers=7.0, proteins=10.0
+        ))
+        test_db.commit()
+
+        assert product_repo.search_products("volkoren")[0][1] == "Volkorenbrood"
+        assert product_repo.search_index.loaded
+
+
+    def test_create_products_batch(self, product_repo, sample_product_data):
+        """Test inserting many products at once returns ids in input order"""
+        products = [
+            ProductCreate(**dict(sample_product_data, name=f"Product {i}"))
+            for i in range(5)
+        ]
+        ids = product_repo.create_products(products)
+
+        assert len(ids) == 5
+        for product_id, product in zip(ids, products):
+            assert product_repo.get_product_by_id(product_id).name == product.name
+        assert product_repo.search_products("product 3")[0][0] == ids[3]
+
+    def test_update_products_batch(self, product_repo, sample_product_data):
+        """Test updating many products at once reports missing ids"""
+        ids = product_repo.create_products([
+            ProductCreate(**dict(sample_product_data, name=name)) for name in ["A", "B"]
+        ])
+        updates = [
+            ProductBatchUpdate(id=ids[1], **dict(sample_product_data, name="B2", fats=1.0)),
+            ProductBatchUpdate(id=999, **sample_product_data),
+        ]
+
+        assert product_repo.update_products(updates) == [True, False]
+        product_repo.db.expire_all()
+        updated = product_repo.get_product_by_id(ids[1])
+        assert updated.name == "B2"
+        assert updated.fats == 1.0
+        assert product_repo.get_product_by_id(ids[0]).name == "A"
+
+
+class TestProductRepositoryPagination:
+    @pytest.fixture
+    def many_products(self, product_repo, sample_product_data):
+        names = ["Appel", "banaan", "Aardbei", "Appelsap", "Kaas", "Melk", "appelmoes"]
+        for index, name in enumerate(names):
+            data = dict(sample_product_data, name=name, proteins=float(index))
+            product_repo.create_product(ProductCreate(**data))
+        return names
+
+    def test_page_by_id(self, product_repo, many_products):
+        """Test walking all pages ordered by id"""
+        seen = []
+        cursor = None
+        while True:
+            products, cursor = product_repo.get_products_page(3, cursor=cursor)
+            seen.extend(product.id for product in products)
+            if not cursor:
+                break
+        assert seen == sorted(seen)
+        assert len(seen) == len(many_products)
+
+    def test_page_by_name(self, product_repo, many_products):
+        """Test walking all pages ordered by name"""
+        seen = []
+        cursor = None
+        while True:
+            products, cursor = product_repo.get_products_page(2, cursor=cursor, sort="name")
+            seen.extend(product.name for product in products)
+            if not cursor:
+                break
+        assert seen == sorted(many_products)
+
+    def test_last_page_has_no_cursor(self, product_repo, many_products):
+        """Test that an exactly filled page does not produce a next cursor"""
+        products, cursor = product_repo.get_products_page(len(many_products))
+        assert len(products) == len(many_products)
+        assert cursor is None
+
+    def test_name_prefix_filter(self, product_repo, many_products):
+        """Test case-insensitive name prefix filter"""
+        products, _ = product_repo.get_products_page(
+            50, filters=ProductFilter(name_prefix="APPEL")
+        )
+        assert sorted(p.name for p in products) == ["Appel", "Appelsap", "appelmoes"]
+
+    def test_range_filter(self, product_repo, many_products):
+        """Test min/max macro filters"""
+        products, _ = product_repo.get_products_page(
+            50, filters=ProductFilter(min_proteins=2, max_proteins=4)
+        )
+        assert sorted(p.proteins for p in products) == [2.0, 3.0, 4.0]
+
+    def test_cursor_sort_mismatch(self, product_repo, many_products):
+        """Test that a cursor can only be used with its own sort order"""
+        _, cursor = product_repo.get_products_page(2, sort="name")
+        with pytest.raises(ValueError):
+            product_repo.get_products_page(2, cursor=cursor, sort="id")
+
+    def test_invalid_cursor(self, product_repo):
+        """Test that a malformed cursor raises ValueError"""
+        with pytest.raises(ValueError):
+            product_repo.get_products_page(2, cursor="not-a-cursor!")
+
+    @pytest.mark.parametrize("sort, position", [
+        ("name", {"sort": "name", "id": 1}),
+        ("name", {"sort": "name", "id": 1, "value": ["a"]}),
+        ("name", {"sort": "name", "id": 1, "value": None}),
+        ("name", {"sort": "name", "id": 1, "value": 5}),
+        ("id", {"sort": "id", "id": "1"}),
+        ("id", {"sort": "id", "id": {"a": 1}}),
+        ("id", {"sort": "id", "id": True}),
+    ])
+    def test_cursor_with_invalid_position(self, product_repo, many_products, sort, position):
+        """Test a well-formed cursor with a missing or mistyped key raises ValueError"""
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            product_repo.get_products_page(2, cursor=encode_cursor(position), sort=sort)
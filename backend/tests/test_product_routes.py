@@ -1,9 +1,17 @@
 import pytest
 from fastapi.testclient import TestClient
 from fastapi import FastAPI
-from unittest.mock import Mock, MagicMock
+from unittest.mock import AsyncMock, Mock, MagicMock
 from routes.product_routes import router, get_product_service
-from models.product import ProductCreate, ProductResponse
+from utils.http_cache import get_version_repository
+from models.product import (
+    ProductCreate,
+    ProductResponse,
+    ProductPage,
+    ProductSearchResult,
+    ProductBatchResponse,
+    ProductBatchItemResult,
+)
 
 
 @pytest.fixture
@@ -19,22 +27,27 @@ def mock_product_service():
     """Mock product service fixture"""
     service = Mock()
     # Zorg ervoor dat alle methods Mock objecten zijn
-    service.create_product = Mock()
-    service.get_all_products = Mock()
-    service.get_product_by_id = Mock()
-    service.update_product = Mock()
-    service.delete_product = Mock()
+    service.create_product = AsyncMock()
+    service.get_all_products = AsyncMock()
+    service.get_products_page = AsyncMock()
+    service.get_product_by_id = AsyncMock()
+    service.search_products = AsyncMock()
+    service.create_products = AsyncMock()
+    service.update_products = AsyncMock()
+    service.update_product = AsyncMock()
+    service.delete_product = AsyncMock()
     return service
 
 
 @pytest.fixture  
-def client(app, mock_product_service):
+def client(app, mock_product_service, mock_version_repo):
     """Test client fixture with mocked service"""
     # Override de dependency met onze mock
     def override_get_product_service():
         return mock_product_service
     
     app.dependency_overrides[get_product_service] = override_get_product_service
+    app.dependency_overrides[get_version_repository] = lambda: mock_version_repo
     client = TestClient(app)
     yield client
     # Cleanup
@@ -64,23 +77,111 @@ class TestProductRoutes:
         assert response.status_code == 400
         assert "Database error" in response.json()["detail"]
 
+    def test_create_products_batch(self, client, mock_product_service, sample_product_data):
+        """Test batch create endpoint"""
+        mock_product_service.create_products.return_value = ProductBatchResponse(
+            results=[ProductBatchItemResult(index=0, id=1, status="created")],
+            rows=1, elapsed_ms=1.0, rows_per_second=1000.0
+        )
+        
+        response = client.post("/api/products/batch", json=[sample_product_data])
+        
+        assert response.status_code == 200
+        assert response.json()["results"][0]["status"] == "created"
+        products = mock_product_service.create_products.call_args[0][0]
+        assert products[0].name == sample_product_data["name"]
+
+    def test_create_products_batch_validates_all_items(self, client, mock_product_service, sample_product_data):
+        """Test one invalid item rejects the whole batch before any write"""
+        invalid = dict(sample_product_data, fats=-1)
+        
+        response = client.post("/api/products/batch", json=[sample_product_data, invalid])
+        
+        assert response.status_code == 422
+        mock_product_service.create_products.assert_not_called()
+
+    def test_update_products_batch(self, client, mock_product_service, sample_product_data):
+        """Test batch update endpoint is not shadowed by the product id route"""
+        mock_product_service.update_products.return_value = ProductBatchResponse(
+            results=[ProductBatchItemResult(index=0, id=5, status="updated")],
+            rows=1, elapsed_ms=1.0, rows_per_second=1000.0
+        )
+        
+        response = client.put("/api/products/batch", json=[dict(sample_product_data, id=5)])
+        
+        assert response.status_code == 200
+        assert response.json()["results"][0]["id"] == 5
+
     def test_get_all_products(self, client, mock_product_service):
-        """Test get all products endpoint"""
+        """Test get all products endpoint returns the first page"""
         mock_products = [
             ProductResponse(id=1, name="Product 1", serving_size=100, energy_kcal=200, 
                           fats=5, carbohydrates=20, sugars=10, fibers=3, proteins=15),
             ProductResponse(id=2, name="Product 2", serving_size=150, energy_kcal=250,
                           fats=8, carbohydrates=25, sugars=12, fibers=4, proteins=18)
         ]
-        mock_product_service.get_all_products.return_value = mock_products
+        mock_product_service.get_products_page.return_value = ProductPage(
+            items=mock_products, next_cursor="abc"
+        )
         
         response = client.get("/api/products/")
         
         assert response.status_code == 200
         data = response.json()
-        assert len(data) == 2
-        assert data[0]["name"] == "Product 1"
-        mock_product_service.get_all_products.assert_called_once()
+        assert len(data["items"]) == 2
+        assert data["items"][0]["name"] == "Product 1"
+        assert data["next_cursor"] == "abc"
+        mock_product_service.get_products_page.assert_called_once()
+
+    def test_get_all_products_with_filters(self, client, mock_product_service):
+        """Test that paging and filter query parameters reach the service"""
+        mock_product_service.get_products_page.return_value = ProductPage()
+        
+        response = client.get(
+            "/api/products/?limit=10&cursor=xyz&sort=name&name_prefix=app&min_proteins=5"
+        )
+        
+        assert response.status_code == 200
+        args, kwargs = mock_product_service.get_products_page.call_args
+        assert args == (10,)
+        assert kwargs["cursor"] == "xyz"
+        assert kwargs["sort"] == "name"
+        assert kwargs["filters"].name_prefix == "app"
+        assert kwargs["filters"].min_proteins == 5
+
+    def test_get_all_products_limit_too_large(self, client, mock_product_service):
+        """Test that page size is capped"""
+        response = client.get("/api/products/?limit=10000")
+        
+        assert response.status_code == 422
+        mock_product_service.get_products_page.assert_not_called()
+
+    def test_get_all_products_invalid_cursor(self, client, mock_product_service):
+        """Test invalid cursor returns 400"""
+        mock_product_service.get_products_page.side_effect = ValueError("Invalid cursor")
+        
+        response = client.get("/api/products/?cursor=bogus")
+        
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
+
+    def test_search_products(self, client, mock_product_service):
+        """Test search endpoint is not shadowed by the product id route"""
+        mock_product_service.search_products.return_value = [
+            ProductSearchResult(id=3, name="Appel", score=1.5)
+        ]
+        
+        response = client.get("/api/products/search?q=apel&limit=5")
+        
+        assert response.status_code == 200
+        assert response.json() == [{"id": 3, "name": "Appel", "score": 1.5}]
+        mock_product_service.search_products.assert_called_once_with("apel", 5)
+
+    def test_search_products_requires_query(self, client, mock_product_service):
+        """Test search without q is rejected"""
+        response = client.get("/api/products/search")
+        
+        assert response.status_code == 422
 
     def test_get_product_exists(self, client, mock_product_service, sample_product_data):
         """Test get product by ID when it exists"""
@@ -1,6 +1,6 @@
 import pytest
 from unittest.mock import Mock, patch
-from models.product import ProductCreate, ProductResponse, ProductDB
+from models.product import ProductCreate, ProductResponse, ProductDB, ProductPage, ProductBatchUpdate
 from services.product_service import ProductService
 
 
@@ -28,6 +28,49 @@ class TestProductService:
         assert len(products) == 1
         assert isinstance(products[0], ProductResponse)
 
+    def test_get_products_page(self, product_service, sample_product_data):
+        """Test getting a page of products"""
+        for name in ["A", "B", "C"]:
+            product_service.create_product(ProductCreate(**dict(sample_product_data, name=name)))
+
+        page = product_service.get_products_page(2)
+        assert isinstance(page, ProductPage)
+        assert [p.name for p in page.items] == ["A", "B"]
+        assert page.next_cursor is not None
+
+        page = product_service.get_products_page(2, cursor=page.next_cursor)
+        assert [p.name for p in page.items] == ["C"]
+        assert page.next_cursor is None
+
+    def test_create_products_batch(self, product_service, sample_product_data):
+        """Test batch creation reports per-item results and throughput"""
+        products = [ProductCreate(**dict(sample_product_data, name=n)) for n in "ABC"]
+        result = product_service.create_products(products)
+
+        assert result.rows == 3
+        assert [item.status for item in result.results] == ["created"] * 3
+        assert [item.index for item in result.results] == [0, 1, 2]
+        assert result.rows_per_second > 0
+
+    def test_update_products_batch(self, product_service, sample_product_data):
+        """Test batch update marks unknown ids as not_found"""
+        created = product_service.create_product(ProductCreate(**sample_product_data))
+        result = product_service.update_products([
+            ProductBatchUpdate(id=created.id, **sample_product_data),
+            ProductBatchUpdate(id=999, **sample_product_data),
+        ])
+
+        assert [item.status for item in result.results] == ["updated", "not_found"]
+        assert result.rows == 1
+
+    def test_update_products_batch_duplicate_ids(self, product_service, sample_product_data):
+        """Test batch update rejects duplicate ids"""
+        with pytest.raises(ValueError):
+            product_service.update_products([
+                ProductBatchUpdate(id=1, **sample_product_data),
+                ProductBatchUpdate(id=1, **sample_product_data),
+            ])
+
     def test_get_product_by_id_exists(self, product_service, sample_product_data):
         """Test getting product by ID when it exists"""
         product_create = ProductCreate(**sample_product_data)
@@ -0,0 +1,103 @@
+import pytest
+from datetime import date, timedelta
+from sqlalchemy import text
+from models.recipe import RecipeCreate
+from models.weekmenu import WeekMenuCreate
+from repositories.weekmenu_repository import WeekMenuRepository
+from services.weekmenu_service import WeekMenuService
+from utils.query_stats import QueryStats, statement_shape, track_queries
+
+
+@pytest.fixture
+def weekmenu_service(test_db):
+    return WeekMenuService(WeekMenuRepository(test_db))
+
+
+@pytest.fixture
+def week_menu(test_db, recipe_repo, sample_recipe_data, minimal_recipe_data):
+    """A week menu with a different recipe on every day"""
+    recipes = [recipe_repo.create_recipe(RecipeCreate(**sample_recipe_data))]
+    for i in range(6):
+        minimal_recipe_data['name'] = f'Recipe {i}'
+        recipes.append(recipe_repo.create_recipe(RecipeCreate(**minimal_recipe_data)))
+    start = date(2024, 1, 15)
+    return WeekMenuCreate(start_date=start, end_date=start + timedelta(days=6), days=[
+        {'date': start + timedelta(days=i), 'recipe_id': recipe.id, 'servings': 2}
+        for i, recipe in enumerate(recipes)
+    ])
+
+
+class TestQueryStats:
+    def test_statement_shape_folds_literals(self):
+        """Test statements differing only in literals share a shape"""
+        assert statement_shape("SELECT * FROM t WHERE id = 1") == statement_shape(
+            "SELECT *\n  FROM t WHERE id = 42"
+        )
+        assert statement_shape("x IN (1, 2, 3)") == statement_shape("x IN (4)")
+
+    def test_repeated_shapes(self):
+        """Test shapes at or above the threshold are reported as N+1"""
+        stats = QueryStats()
+        for product_id in range(3):
+            stats.record(f"SELECT name FROM products WHERE id = {product_id}", 1, 0.001)
+        stats.record("SELECT 1", -1, 0.001)
+
+        assert stats.statements == 4
+        assert stats.rows == 3
+        assert stats.repeated() == [("SELECT name FROM products WHERE id = ?", 3)]
+        assert stats.headers()['X-DB-N-Plus-One'] == '1'
+
+    def test_track_queries_counts_statements(self, test_db, query_budget):
+        """Test only statements inside the tracked block are counted"""
+        test_db.execute(text("SELECT 1"))
+        with track_queries() as stats:
+            test_db.execute(text("SELECT 2"))
+
+        assert stats.statements == 1
+        assert stats.db_time > 0
+
+    def test_query_budget_fails_when_exceeded(self, test_db, query_budget):
+        """Test the fixture fails a test that runs more statements than declared"""
+        with pytest.raises(pytest.fail.Exception, match="Query budget of 1 exceeded"):
+            with query_budget(1):
+                test_db.execute(text("SELECT 1"))
+                test_db.execute(text("SELECT 2"))
+
+    def test_query_budget_fails_on_repeated_statements(self, test_db, query_budget):
+        """Test the fixture fails on N+1 patterns within the budget"""
+        with pytest.raises(pytest.fail.Exception, match="N\\+1"):
+            with query_budget(10):
+                for i in range(3):
+                    test_db.execute(text("SELECT :i"), {"i": i})
+
+
+class TestQueryBudgets:
+    def test_get_all_recipes(self, recipe_service, sample_recipe_data, query_budget, test_db):
+        """Test listing recipes with ingredients does not load per recipe"""
+        for _ in range(5):
+            recipe_service.create_recipe(RecipeCreate(**sample_recipe_data))
+        test_db.expire_all()
+
+        # Recipes, then all their ingredients in one IN query
+        with query_budget(2):
+            recipe_service.get_all_recipes()
+
+    def test_get_week_menu(self, weekmenu_service, week_menu, query_budget, test_db):
+        """Test formatting a week menu does not load recipes per day"""
+        created = weekmenu_service.create_week_menu(week_menu)
+        test_db.expire_all()
+
+        with query_budget(1):
+            weekmenu_service.get_week_menu_by_id(created.id)
+
+    def test_create_week_menu(self, weekmenu_service, week_menu, query_budget):
+        """Test the created menu is formatted without lazy loads per day"""
+        with query_budget(6):
+            weekmenu_service.create_week_menu(week_menu)
+
+    def test_delete_week_menu(self, weekmenu_service, week_menu, query_budget):
+        """Test deleting a menu does not load its days one by one"""
+        created = weekmenu_service.create_week_menu(week_menu)
+
+        with query_budget(6):
+            weekmenu_service.delete_week_menu(created.id)
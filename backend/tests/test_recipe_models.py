@@ -151,6 +151,16 @@ class TestRecipeModels:
         assert response.name == 'Pannenkoeken'
         assert len(response.ingredients) == 3
 
+    def test_recipe_response_nutrition_is_typed(self):
+        """Test the cached nutrition is documented as the six nutrients"""
+        schema = RecipeResponse.model_json_schema()
+
+        nutrition = schema['properties']['nutrition']['anyOf'][0]
+        assert nutrition == {'$ref': '#/$defs/NutritionValues'}
+        assert set(schema['$defs']['NutritionValues']['properties']) == {
+            'energy_kcal', 'fats', 'carbohydrates', 'sugars', 'fibers', 'proteins'
+        }
+
     def test_recipe_db_relationships(self, test_db, sample_products):
         """Test RecipeDB relationships"""
         # Create recipe
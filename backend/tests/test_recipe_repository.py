@@ -1,6 +1,7 @@
 import pytest
 from pytest import mark
-from models.recipe import RecipeCreate, RecipeDB, RecipeIngredientDB, RecipeIngredientCreate
+from models.recipe import RecipeCreate, RecipeDB, RecipeIngredientDB, RecipeIngredientCreate, RecipeNutritionDB, RecipePatch
+from models.product import ProductCreate, ProductDB
 from sqlalchemy import text
 
 class TestRecipeRepository:
@@ -245,4 +246,259 @@ class TestRecipeRepository:
 
         # This should raise an exception due to foreign key constraint
         with pytest.raises(Exception):
-            recipe_repo.create_recipe(recipe_create)
\ No newline at end of file
+            recipe_repo.create_recipe(recipe_create)
+
+class TestRecipeNutritionCache:
+    def test_create_recipe_fills_cache(self, recipe_repo, sample_recipe_data):
+        """Test the per-serving nutrition is cached when a recipe is created"""
+        result = recipe_repo.create_recipe(RecipeCreate(**sample_recipe_data))
+
+        # (364 * 2.5 + 155 * 0.03 + 42 * 5) / 4 servings
+        assert result.nutrition.energy_kcal == pytest.approx(281.1625)
+
+    def test_create_recipe_without_ingredients_caches_zero(self, recipe_repo):
+        """Test a recipe without ingredients gets an all-zero cache row"""
+        recipe_create = RecipeCreate(
+            name='Empty', servings=1, preparation_time=1, instructions='-', ingredients=[]
+        )
+        result = recipe_repo.create_recipe(recipe_create)
+
+        assert result.nutrition.energy_kcal == 0.0
+        assert result.nutrition.proteins == 0.0
+
+    def test_update_recipe_refreshes_cache(self, recipe_repo, minimal_recipe_data):
+        """Test the cache follows changed ingredients and servings"""
+        created = recipe_repo.create_recipe(RecipeCreate(**minimal_recipe_data))
+        assert created.nutrition.energy_kcal == pytest.approx(182.0)
+
+        minimal_recipe_data['servings'] = 1
+        minimal_recipe_data['ingredients'][0]['amount'] = 200.0
+        updated = recipe_repo.update_recipe(created.id, RecipeCreate(**minimal_recipe_data))
+
+        assert updated.nutrition.energy_kcal == pytest.approx(728.0)
+
+    def test_product_update_refreshes_recipes_using_it(
+        self, recipe_repo, product_repo, minimal_recipe_data, sample_products
+    ):
+        """Test changing a product recomputes the recipes that contain it"""
+        created = recipe_repo.create_recipe(RecipeCreate(**minimal_recipe_data))
+
+        bloem = sample_products[0]
+        product_repo.update_product(bloem.id, ProductCreate(
+            name=bloem.name, serving_size=100.0, energy_kcal=400.0, fats=1.0,
+            carbohydrates=76.0, sugars=0.3, fibers=2.7, proteins=10.3
+        ))
+
+        recipe = recipe_repo.get_recipe_by_id(created.id)
+        recipe_repo.db.refresh(recipe.nutrition)
+        assert recipe.nutrition.energy_kcal == pytest.approx(200.0)
+
+    def test_delete_recipe_removes_cache(self, recipe_repo, minimal_recipe_data, test_db):
+        """Test the cache row is deleted together with the recipe"""
+        created = recipe_repo.create_recipe(RecipeCreate(**minimal_recipe_data))
+
+        recipe_repo.delete_recipe(created.id)
+
+        assert test_db.query(RecipeNutritionDB).count() == 0
+
+
+class TestRecipePages:
+    @pytest.fixture
+    def many_recipes(self, recipe_repo, minimal_recipe_data, sample_recipe_data, test_db):
+        recipes = [recipe_repo.create_recipe(RecipeCreate(**sample_recipe_data))]
+        for name in ['Stamppot', 'Appeltaart', 'Curry', 'Bami']:
+            minimal_recipe_data['name'] = name
+            recipes.append(recipe_repo.create_recipe(RecipeCreate(**minimal_recipe_data)))
+        test_db.expire_all()
+        return recipes
+
+    def test_page_by_name(self, recipe_repo, many_recipes):
+        """Test walking all pages ordered by name"""
+        names, cursor = [], None
+        while True:
+            recipes, cursor = recipe_repo.get_recipes_page(2, cursor=cursor, sort='name')
+            names += [recipe.name for recipe in recipes]
+            if cursor is None:
+                break
+        assert names == sorted(recipe.name for recipe in many_recipes)
+
+    def test_page_loads_ingredients_without_row_explosion(
+        self, recipe_repo, many_recipes, query_budget
+    ):
+        """Test a page costs one recipe query plus one ingredient query"""
+        with query_budget(2):
+            recipes, _ = recipe_repo.get_recipes_page(10)
+            counts = [len(recipe.ingredients) for recipe in recipes]
+            names = [i.product.name for recipe in recipes for i in recipe.ingredients]
+            nutrition = [recipe.nutrition for recipe in recipes]
+        assert counts == [3, 1, 1, 1, 1]
+        assert all(names) and all(nutrition)
+
+    def test_summaries(self, recipe_repo, many_recipes, query_budget):
+        """Test summaries count ingredients in a single narrow query"""
+        with query_budget(1):
+            rows, cursor = recipe_repo.get_recipe_summaries_page(3, sort='name')
+        assert [row.name for row in rows] == ['Appeltaart', 'Bami', 'Curry']
+        assert [row.ingredient_count for row in rows] == [1, 1, 1]
+        assert cursor is not None
+
+        rows, cursor = recipe_repo.get_recipe_summaries_page(3, cursor=cursor, sort='name')
+        assert [row.name for row in rows] == ['Pannenkoeken', 'Stamppot']
+        assert rows[0].ingredient_count == 3
+        assert cursor is None
+
+    def test_cursor_must_match_sort(self, recipe_repo, many_recipes):
+        """Test a cursor cannot be reused with another sort order"""
+        _, cursor = recipe_repo.get_recipes_page(2, sort='name')
+        with pytest.raises(ValueError):
+            recipe_repo.get_recipes_page(2, cursor=cursor, sort='id')
+
+
+class TestRecipeIngredientDiff:
+    @pytest.fixture
+    def recipe(self, recipe_repo, sample_recipe_data):
+        return recipe_repo.create_recipe(RecipeCreate(**sample_recipe_data))
+
+    def _ids(self, recipe):
+        return {i.product_id: i.id for i in recipe.ingredients}
+
+    @pytest.fixture
+    def extra_product(self, test_db):
+        product = ProductDB(name='Suiker', serving_size=100.0, energy_kcal=400.0, fats=0.0,
+                            carbohydrates=100.0, sugars=100.0, fibers=0.0, proteins=0.0)
+        test_db.add(product)
+        test_db.commit()
+        return product
+
+    def _writes(self, stats):
+        """Statement types written to recipe_ingredients"""
+        targets = ('UPDATE recipe_ingredients', 'INSERT INTO recipe_ingredients',
+                   'DELETE FROM recipe_ingredients')
+        return [
+            shape.split()[0]
+            for shape, count in stats.shapes.items()
+            for _ in range(count)
+            if shape.startswith(targets)
+        ]
+
+    def test_update_changes_only_changed_rows(
+        self, recipe_repo, recipe, sample_recipe_data, query_budget
+    ):
+        """Test a PUT with one changed amount keeps ids and writes one row"""
+        ids = self._ids(recipe)
+        sample_recipe_data['ingredients'][1]['amount'] = 4.0
+
+        with query_budget(20, allow_repeated=True) as stats:
+            result = recipe_repo.update_recipe(recipe.id, RecipeCreate(**sample_recipe_data))
+
+        assert self._ids(result) == ids
+        assert self._writes(stats) == ['UPDATE']
+        assert next(i for i in result.ingredients if i.amount == 4.0)
+
+    def test_update_without_changes_writes_no_ingredients(
+        self, recipe_repo, recipe, sample_recipe_data, query_budget
+    ):
+        """Test saving an unchanged recipe does not touch ingredient rows"""
+        with query_budget(20, allow_repeated=True) as stats:
+            recipe_repo.update_recipe(recipe.id, RecipeCreate(**sample_recipe_data))
+        assert self._writes(stats) == []
+
+    def test_update_inserts_and_deletes_the_difference(
+        self, recipe_repo, recipe, sample_recipe_data, sample_products, extra_product
+    ):
+        """Test removed lines are deleted and new lines inserted, others kept"""
+        ids = self._ids(recipe)
+        sample_recipe_data['ingredients'] = [
+            sample_recipe_data['ingredients'][0],
+            {'product_id': extra_product.id, 'amount': 10.0, 'unit': 'gram'},
+        ]
+
+        result = recipe_repo.update_recipe(recipe.id, RecipeCreate(**sample_recipe_data))
+
+        new_ids = self._ids(result)
+        assert set(new_ids) == {sample_products[0].id, extra_product.id}
+        assert new_ids[sample_products[0].id] == ids[sample_products[0].id]
+
+    def test_update_same_product_twice(self, recipe_repo, sample_products):
+        """Test repeated products are matched one to one"""
+        line = {'product_id': sample_products[0].id, 'amount': 100.0, 'unit': 'gram'}
+        data = {'name': 'Dubbel', 'servings': 1, 'preparation_time': 5,
+                'instructions': 'x', 'ingredients': [line, dict(line, amount=50.0)]}
+        recipe = recipe_repo.create_recipe(RecipeCreate(**data))
+
+        data['ingredients'] = [line, dict(line, amount=75.0), dict(line, amount=5.0)]
+        result = recipe_repo.update_recipe(recipe.id, RecipeCreate(**data))
+
+        assert sorted(i.amount for i in result.ingredients) == [5.0, 75.0, 100.0]
+
+    def test_patch_fields(self, recipe_repo, recipe):
+        """Test PATCH only changes the fields that are sent"""
+        result = recipe_repo.patch_recipe(recipe.id, RecipePatch(name='Flensjes', image_url=None))
+
+        assert result.name == 'Flensjes'
+        assert result.image_url is None
+        assert result.servings == 4
+        assert len(result.ingredients) == 3
+
+    def test_patch_rejects_clearing_required_fields(self, recipe_repo, recipe):
+        """Test required fields cannot be set to null"""
+        with pytest.raises(ValueError):
+            recipe_repo.patch_recipe(recipe.id, RecipePatch(name=None))
+
+    def test_patch_single_ingredient_operations(
+        self, recipe_repo, recipe, sample_products, extra_product, query_budget
+    ):
+        """Test add, update and remove each write a single row"""
+        ids = self._ids(recipe)
+        egg = ids[sample_products[1].id]
+        milk = ids[sample_products[2].id]
+
+        with query_budget(20, allow_repeated=True) as stats:
+            result = recipe_repo.patch_recipe(recipe.id, RecipePatch(ingredient_operations=[
+                {'op': 'update', 'id': egg, 'amount': 2.0},
+            ]))
+        assert self._writes(stats) == ['UPDATE']
+        assert next(i for i in result.ingredients if i.id == egg).amount == 2.0
+
+        result = recipe_repo.patch_recipe(recipe.id, RecipePatch(ingredient_operations=[
+            {'op': 'remove', 'id': milk},
+            {'op': 'add', 'product_id': extra_product.id, 'amount': 20.0},
+        ]))
+        assert self._ids(result) == {
+            sample_products[0].id: ids[sample_products[0].id],
+            sample_products[1].id: egg,
+            extra_product.id: result.ingredients[-1].id,
+        }
+        assert result.ingredients[-1].unit == 'gram'
+
+    def test_patch_refreshes_nutrition(self, recipe_repo, recipe, sample_products):
+        """Test ingredient operations and servings update the nutrition cache"""
+        flour = self._ids(recipe)[sample_products[0].id]
+        before = recipe.nutrition.energy_kcal
+
+        result = recipe_repo.patch_recipe(recipe.id, RecipePatch(ingredient_operations=[
+            {'op': 'update', 'id': flour, 'amount': 500.0},
+        ]))
+        after_amount = result.nutrition.energy_kcal
+        assert after_amount == pytest.approx(before + 364.0 * 250 / 100 / 4)
+
+        result = recipe_repo.patch_recipe(recipe.id, RecipePatch(servings=8))
+        assert result.nutrition.energy_kcal == pytest.approx(after_amount / 2)
+
+    def test_patch_unknown_ingredient(self, recipe_repo, recipe):
+        """Test operations on ingredients of another recipe are rejected"""
+        with pytest.raises(ValueError, match='not found'):
+            recipe_repo.patch_recipe(recipe.id, RecipePatch(ingredient_operations=[
+                {'op': 'remove', 'id': 999},
+            ]))
+
+    def test_patch_add_requires_product_and_amount(self, recipe_repo, recipe):
+        """Test add operations need a product and an amount"""
+        with pytest.raises(ValueError):
+            recipe_repo.patch_recipe(recipe.id, RecipePatch(ingredient_operations=[
+                {'op': 'add', 'amount': 10.0},
+            ]))
+
+    def test_patch_not_exists(self, recipe_repo):
+        """Test patching a missing recipe returns None"""
+        assert recipe_repo.patch_recipe(999, RecipePatch(name='x')) is None
@@ -1,12 +1,16 @@
+import hashlib
 import pytest
 from fastapi.testclient import TestClient
 from fastapi import FastAPI, UploadFile
-from unittest.mock import Mock, MagicMock, patch, mock_open
+from unittest.mock import AsyncMock, Mock, MagicMock, patch
 from io import BytesIO
 from pathlib import Path
 
-from routes.recipe_routes import router, get_recipe_service
-from models.recipe import RecipeCreate, RecipeResponse
+from routes.recipe_routes import router, get_recipe_service, get_nutrition_service
+from utils.http_cache import get_version_repository
+from utils.image_store import ImageStore
+from models.recipe import RecipeCreate, RecipePage, RecipeResponse, RecipeSummary, RecipeSummaryPage
+from models.nutrition import NutritionValues, RecipeNutritionResponse
 
 @pytest.fixture
 def app():
@@ -19,21 +23,32 @@ def app():
 def mock_recipe_service():
     """Mock recipe service fixture"""
     service = Mock()
-    service.create_recipe = Mock()
-    service.get_all_recipes = Mock()
-    service.get_recipe_by_id = Mock()
-    service.update_recipe = Mock()
-    service.delete_recipe = Mock()
-    service.update_recipe_image = Mock()
+    service.create_recipe = AsyncMock()
+    service.get_recipes_page = AsyncMock()
+    service.get_recipe_by_id = AsyncMock()
+    service.update_recipe = AsyncMock()
+    service.patch_recipe = AsyncMock()
+    service.delete_recipe = AsyncMock()
+    service.update_recipe_image = AsyncMock()
     return service
 
 @pytest.fixture
-def client(app, mock_recipe_service):
+def mock_nutrition_service():
+    """Mock nutrition service fixture"""
+    service = Mock()
+    service.get_recipe_nutrition = AsyncMock()
+    service.get_recipes_nutrition = AsyncMock()
+    return service
+
+@pytest.fixture
+def client(app, mock_recipe_service, mock_nutrition_service, mock_version_repo):
     """Test client fixture with mocked service"""
     def override_get_recipe_service():
         return mock_recipe_service
     
     app.dependency_overrides[get_recipe_service] = override_get_recipe_service
+    app.dependency_overrides[get_nutrition_service] = lambda: mock_nutrition_service
+    app.dependency_overrides[get_version_repository] = lambda: mock_version_repo
     client = TestClient(app)
     yield client
     app.dependency_overrides = {}
@@ -92,14 +107,15 @@ class TestRecipeRoutes:
 
     def test_get_all_recipes_empty(self, client, mock_recipe_service):
         """Test get all recipes when none exist"""
-        mock_recipe_service.get_all_recipes.return_value = []
+        mock_recipe_service.get_recipes_page.return_value = RecipePage()
 
         response = client.get('/api/recipes/')
 
         assert response.status_code == 200
-        data = response.json()
-        assert data == []
-        mock_recipe_service.get_all_recipes.assert_called_once()
+        assert response.json() == {"items": [], "next_cursor": None}
+        mock_recipe_service.get_recipes_page.assert_called_once_with(
+            50, cursor=None, sort="id", view="full"
+        )
 
     def test_get_all_recipes(self, client, mock_recipe_service):
         """Test get all recipes endpoint"""
@@ -112,15 +128,54 @@ class TestRecipeRoutes:
                 instructions="Instructions 2", ingredients = []
             )
         ]
-        mock_recipe_service.get_all_recipes.return_value = mock_recipes
+        mock_recipe_service.get_recipes_page.return_value = RecipePage(
+            items=mock_recipes, next_cursor="abc"
+        )
 
-        response = client.get("/api/recipes/")
+        response = client.get("/api/recipes/?limit=2&sort=name")
 
         assert response.status_code == 200
         data = response.json()
-        assert len(data) == 2
-        assert data[0]["name"] == "Recipe 1"
-        assert data[1]["name"] == "Recipe 2"
+        assert len(data["items"]) == 2
+        assert data["items"][0]["name"] == "Recipe 1"
+        assert data["items"][1]["name"] == "Recipe 2"
+        assert data["next_cursor"] == "abc"
+        mock_recipe_service.get_recipes_page.assert_called_once_with(
+            2, cursor=None, sort="name", view="full"
+        )
+
+    def test_get_recipe_summaries(self, client, mock_recipe_service):
+        """Test the summary view returns only the narrow columns"""
+        mock_recipe_service.get_recipes_page.return_value = RecipeSummaryPage(
+            items=[RecipeSummary(
+                id=1, name="Recipe 1", servings=2, preparation_time=15, ingredient_count=3
+            )]
+        )
+
+        response = client.get("/api/recipes/?view=summary")
+
+        assert response.status_code == 200
+        item = response.json()["items"][0]
+        assert item["ingredient_count"] == 3
+        assert "instructions" not in item
+        assert "ingredients" not in item
+        assert mock_recipe_service.get_recipes_page.call_args[1]["view"] == "summary"
+
+    def test_get_all_recipes_invalid_view(self, client, mock_recipe_service):
+        """Test unknown views are rejected before reaching the service"""
+        response = client.get("/api/recipes/?view=wide")
+
+        assert response.status_code == 422
+        mock_recipe_service.get_recipes_page.assert_not_called()
+
+    def test_get_all_recipes_invalid_cursor(self, client, mock_recipe_service):
+        """Test cursor errors from the service become 400"""
+        mock_recipe_service.get_recipes_page.side_effect = ValueError("Invalid cursor")
+
+        response = client.get("/api/recipes/?cursor=bad")
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
 
     def test_get_recipe_exists(self, client, mock_recipe_service, sample_recipe_response):
         """Test get recipe by ID when it exists"""
@@ -170,6 +225,50 @@ class TestRecipeRoutes:
         assert response.status_code == 400
         assert "Update error" in response.json()["detail"]
 
+    def test_patch_recipe_success(self, client, mock_recipe_service, sample_recipe_response):
+        """Test a partial update with a single ingredient operation"""
+        mock_recipe_service.patch_recipe.return_value = sample_recipe_response
+
+        response = client.patch("/api/recipes/1", json={
+            "name": "Test Recipe",
+            "ingredient_operations": [{"op": "update", "id": 1, "amount": 150.0}]
+        })
+
+        assert response.status_code == 200
+        recipe_id, patch = mock_recipe_service.patch_recipe.call_args[0]
+        assert recipe_id == 1
+        assert patch.dict(exclude_unset=True)["name"] == "Test Recipe"
+        assert "servings" not in patch.dict(exclude_unset=True)
+        assert patch.ingredient_operations[0].amount == 150.0
+
+    def test_patch_recipe_not_found(self, client, mock_recipe_service):
+        """Test patching a non-existing recipe"""
+        mock_recipe_service.patch_recipe.return_value = None
+
+        response = client.patch("/api/recipes/999", json={"name": "x"})
+
+        assert response.status_code == 404
+
+    def test_patch_recipe_error(self, client, mock_recipe_service):
+        """Test operation errors become 400"""
+        mock_recipe_service.patch_recipe.side_effect = ValueError("Ingredient 9 not found in this recipe")
+
+        response = client.patch("/api/recipes/1", json={
+            "ingredient_operations": [{"op": "remove", "id": 9}]
+        })
+
+        assert response.status_code == 400
+        assert "Ingredient 9" in response.json()["detail"]
+
+    def test_patch_recipe_invalid_operation(self, client, mock_recipe_service):
+        """Test unknown operations are rejected by validation"""
+        response = client.patch("/api/recipes/1", json={
+            "ingredient_operations": [{"op": "replace", "id": 1}]
+        })
+
+        assert response.status_code == 422
+        mock_recipe_service.patch_recipe.assert_not_called()
+
     def test_delete_recipe_success(self, client, mock_recipe_service):
         """Test successful recipe deletion"""
         mock_recipe_service.delete_recipe.return_value = True
@@ -198,29 +297,60 @@ class TestRecipeRoutes:
         assert response.status_code == 400
         assert "Delete error" in response.json()['detail']
 
+JPEG_HEAD = b"\xff\xd8\xff"
+
+
+@pytest.fixture
+def image_store(tmp_path):
+    """Image store in a temporary directory, rendering thumbnails inline"""
+    store = ImageStore(tmp_path)
+    store.generate_renditions = AsyncMock(return_value=[])
+    with patch("routes.recipe_routes.recipe_image_store", store):
+        yield store
+
 class TestRecipeImageRoutes:
-    @patch("routes.recipe_routes.UPLOAD_DIR", Path("/tmp/test_uploads"))
-    @patch("builtins.open", new_callable=mock_open)
-    @patch("routes.recipe_routes.uuid.uuid4")
-    def test_upload_recipe_image_success(self, mock_uuid, mock_file_open, client, mock_recipe_service, sample_recipe_response):
+    def test_upload_recipe_image_success(self, client, image_store, mock_recipe_service, sample_recipe_response):
         """Test successful recipe image upload"""
-        mock_uuid.return_value = Mock()
-        mock_uuid.return_value.__str__ = Mock(return_value="test-uui")
-
         mock_recipe_service.get_recipe_by_id.return_value = sample_recipe_response
         mock_recipe_service.update_recipe_image.return_value = sample_recipe_response
 
-        # Create mock image file
-        image_content = b"fake image data"
+        # Create mock image file, recognised by its JPEG signature
+        image_content = JPEG_HEAD + b"fake image data"
         files = {"file": ("test.jpg", BytesIO(image_content), "image/jpeg")}
         response = client.post('/api/recipes/1/image', files=files)
 
         assert response.status_code == 200
         data = response.json()
-        assert "image_url" in data
-        assert "/api/recipes/1/image/" in data["image_url"]
+        filename = f"{hashlib.sha256(image_content).hexdigest()}.jpg"
+        assert data["image_url"] == f"/api/recipes/1/image/{filename}"
+        assert (image_store.directory / filename).read_bytes() == image_content
         mock_recipe_service.get_recipe_by_id.assert_called_once_with(1)
-        mock_recipe_service.update_recipe_image.assert_called_once()
+        mock_recipe_service.update_recipe_image.assert_called_once_with(1, data["image_url"])
+        image_store.generate_renditions.assert_awaited_once_with(filename)
+
+    def test_upload_same_image_twice_is_stored_once(self, client, image_store, mock_recipe_service, sample_recipe_response):
+        """Test identical uploads map to the same content-addressed file"""
+        mock_recipe_service.get_recipe_by_id.return_value = sample_recipe_response
+
+        urls = [
+            client.post("/api/recipes/1/image", files={"file": ("a.jpg", BytesIO(JPEG_HEAD + b"same"), "image/jpeg")}).json()["image_url"]
+            for _ in range(2)
+        ]
+
+        assert urls[0] == urls[1]
+        assert len(list(image_store.directory.iterdir())) == 1
+
+    def test_upload_image_too_large(self, client, image_store, mock_recipe_service, sample_recipe_response):
+        """Test uploads over the size limit are rejected without leaving files"""
+        mock_recipe_service.get_recipe_by_id.return_value = sample_recipe_response
+
+        with patch("utils.image_store.MAX_IMAGE_BYTES", 4):
+            files = {"file": ("test.jpg", BytesIO(JPEG_HEAD + b"too large"), "image/jpeg")}
+            response = client.post("/api/recipes/1/image", files=files)
+
+        assert response.status_code == 400
+        assert list(image_store.directory.iterdir()) == []
+        mock_recipe_service.update_recipe_image.assert_not_called()
 
     def test_upload_image_recipe_not_found(self, client, mock_recipe_service):
         """Test uploading image for non-existing recipe"""
@@ -242,61 +372,151 @@ class TestRecipeImageRoutes:
         assert response.status_code == 400
         assert response.json()["detail"] == "File must be an image"
 
-    @patch("routes.recipe_routes.UPLOAD_DIR", Path("/tmp/test_uploads"))
-    @patch("routes.recipe_routes.FileResponse")
-    def test_get_recipe_image_exists(self, mock_file_response, client):
+    def test_get_recipe_image_exists(self, client, image_store):
         """Test getting recipe image when file exists"""
-        mock_file_response.return_value = "file_response"
+        (image_store.directory / "test.jpg").write_bytes(b"image")
 
-        with patch("pathlib.Path.exists", return_value=True):
-            response = client.get("/api/recipes/1/image/test.jpg")
+        response = client.get("/api/recipes/1/image/test.jpg")
 
-            # The actual response will be handled by FileResponse
-            # We just check that the endpoint is called correctly
-            mock_file_response.assert_called_once()
+        assert response.status_code == 200
+        assert response.content == b"image"
 
-    def test_get_recipe_image_not_found(self, client):
+    def test_get_recipe_image_not_found(self, client, image_store):
         """Test getting recipe image when file doesn't exist"""
-        with patch("pathlib.Path.exists", return_value=False):
-            response = client.get("/api/recipes/1/image/nonexistent.jpg")
+        response = client.get("/api/recipes/1/image/nonexistent.jpg")
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Image not found"
+
+    def test_get_recipe_image_rejects_path_names(self, client, image_store):
+        """Test names that are not plain file names are not served"""
+        response = client.get("/api/recipes/1/image/..%2Fsecret.jpg")
 
-            assert response.status_code == 404
-            assert response.json()["detail"] == "Image not found"
+        assert response.status_code == 404
+
+    def test_get_content_addressed_image_is_immutable(self, client, image_store):
+        """Test stored originals get a long immutable cache and a 304 on revalidation"""
+        filename = 'a' * 64 + '.jpg'
+        (image_store.directory / filename).write_bytes(b'image')
 
-    @patch("routes.recipe_routes.UPLOAD_DIR", Path("/tmp/test_uploads"))
-    @patch("builtins.open", new_callable = mock_open)
-    @patch("routes.recipe_routes.uuid.uuid4")
-    def test_upload_image_file_extension_handling(self, mock_uuid, mock_file_open, client, mock_recipe_service, sample_recipe_response):
-        """Test that file extension is handled correctly"""
-        mock_uuid.return_value = Mock()
-        mock_uuid.return_value.__str__ = Mock(return_value="test-uuid")
+        response = client.get(f'/api/recipes/1/image/{filename}')
 
+        assert response.status_code == 200
+        assert response.headers['cache-control'] == 'public, max-age=31536000, immutable'
+        assert response.headers['etag'] == f'"{filename}"'
+
+        response = client.get(f'/api/recipes/1/image/{filename}', headers={'If-None-Match': response.headers['etag']})
+        assert response.status_code == 304
+        assert response.content == b''
+
+    def test_get_image_width_variant(self, client, image_store):
+        """Test ?w= serves the smallest fitting rendition, WebP when accepted"""
+        stem = 'b' * 64
+        for name in [f'{stem}.jpg', f'{stem}_w320.jpg', f'{stem}_w320.webp', f'{stem}_w640.jpg']:
+            (image_store.directory / name).write_bytes(name.encode())
+
+        response = client.get(f'/api/recipes/1/image/{stem}.jpg?w=300', headers={'Accept': 'image/webp,*/*'})
+        assert response.content == f'{stem}_w320.webp'.encode()
+        assert response.headers['vary'] == 'Accept'
+
+        response = client.get(f'/api/recipes/1/image/{stem}.jpg?w=500', headers={'Accept': 'image/jpeg'})
+        assert response.content == f'{stem}_w640.jpg'.encode()
+        assert response.headers['etag'] == f'"{stem}_w640.jpg"'
+        assert 'immutable' in response.headers['cache-control']
+
+    def test_get_image_variant_falls_back_to_original(self, client, image_store):
+        """Test a missing rendition serves the original with a short cache"""
+        filename = 'c' * 64 + '.jpg'
+        (image_store.directory / filename).write_bytes(b'original')
+
+        response = client.get(f'/api/recipes/1/image/{filename}?w=320')
+
+        assert response.content == b'original'
+        assert response.headers['cache-control'] == 'public, max-age=300'
+
+    def test_get_image_variant_of_small_original_is_immutable(self, client, image_store):
+        """Test an original too narrow for any rendition is cached for good"""
+        pil_image = pytest.importorskip("PIL.Image")
+        buffer = BytesIO()
+        pil_image.new("RGB", (300, 200)).save(buffer, format="JPEG")
+        filename = 'f' * 64 + '.jpg'
+        (image_store.directory / filename).write_bytes(buffer.getvalue())
+
+        for width in (320, 2000):
+            response = client.get(f'/api/recipes/1/image/{filename}?w={width}')
+
+            assert response.content == buffer.getvalue()
+            assert response.headers['cache-control'] == 'public, max-age=31536000, immutable'
+
+    def test_upload_image_extension_follows_content(self, client, image_store, mock_recipe_service, sample_recipe_response):
+        """Test the stored extension comes from the bytes, not the file name"""
         mock_recipe_service.get_recipe_by_id.return_value = sample_recipe_response
         mock_recipe_service.update_recipe_image.return_value = sample_recipe_response
 
-        # Test with PNG file
-        files = {"file": ("test.png", BytesIO(b"fake png data"), "image/png")}
+        content = b"\x89PNG\r\n\x1a\nfake png data"
+        urls = [
+            client.post("/api/recipes/1/image", files={"file": (name, BytesIO(content), "image/png")}).json()["image_url"]
+            for name in ["test.jpeg", "test.JPG", "testfile"]
+        ]
+
+        assert urls[0].endswith(".png")
+        assert len(set(urls)) == 1
+        assert len(list(image_store.directory.iterdir())) == 1
+
+    def test_upload_image_unknown_format(self, client, image_store, mock_recipe_service, sample_recipe_response):
+        """Test bytes that are no supported image are rejected"""
+        mock_recipe_service.get_recipe_by_id.return_value = sample_recipe_response
+
+        files = {"file": ("test.jpg", BytesIO(b"fake data"), "image/jpeg")}
         response = client.post("/api/recipes/1/image", files=files)
 
+        assert response.status_code == 400
+        assert "Unsupported image format" in response.json()["detail"]
+        mock_recipe_service.update_recipe_image.assert_not_called()
+
+
+class TestRecipeNutritionRoutes:
+    def test_get_recipe_nutrition(self, client, mock_nutrition_service):
+        """Test single recipe nutrition endpoint"""
+        mock_nutrition_service.get_recipe_nutrition.return_value = RecipeNutritionResponse(
+            recipe_id=1, servings=2,
+            total=NutritionValues(energy_kcal=400), per_serving=NutritionValues(energy_kcal=200)
+        )
+
+        response = client.get("/api/recipes/1/nutrition")
+
         assert response.status_code == 200
-        data = response.json()
-        assert data["image_url"].endswith(".png")
+        assert response.json()["per_serving"]["energy_kcal"] == 200
+        mock_nutrition_service.get_recipe_nutrition.assert_called_once_with(1)
 
-    @patch("routes.recipe_routes.UPLOAD_DIR", Path("/tmp/test_uploads"))
-    @patch("builtins.open", new_callable=mock_open)
-    @patch("routes.recipe_routes.uuid.uuid4")
-    def test_upload_image_no_extension_fallback(self, mock_uuid, mock_file_open, client, mock_recipe_service, sample_recipe_response):
-        """Test fallback to jpg when no file extension"""
-        mock_uuid.return_value = Mock()
-        mock_uuid.return_value.__str__ = Mock(return_value = "test-uuid")
+    def test_get_recipe_nutrition_not_found(self, client, mock_nutrition_service):
+        """Test nutrition of unknown recipe returns 404"""
+        mock_nutrition_service.get_recipe_nutrition.return_value = None
 
-        mock_recipe_service.get_recipe_by_id.return_value = sample_recipe_response
-        mock_recipe_service.update_recipe_image.return_value = sample_recipe_response
+        response = client.get("/api/recipes/999/nutrition")
 
-        # File without extension
-        files = {"file": ("testfile", BytesIO(b"fake data"), "image/jpeg")}
-        response = client.post("/api/recipes/1/image", files=files)
+        assert response.status_code == 404
+
+    def test_batch_nutrition(self, client, mock_nutrition_service):
+        """Test batch nutrition endpoint passes ids and drafts"""
+        mock_nutrition_service.get_recipes_nutrition.return_value = []
+
+        response = client.post("/api/recipes/nutrition", json={
+            "recipe_ids": [1, 2],
+            "drafts": [{"servings": 1, "ingredients": [{"product_id": 3, "amount": 10, "unit": "gram"}]}]
+        })
 
         assert response.status_code == 200
-        data = response.json()
-        assert data["image_url"].endswith(".jpg")
\ No newline at end of file
+        recipe_ids, drafts = mock_nutrition_service.get_recipes_nutrition.call_args[0]
+        assert recipe_ids == [1, 2]
+        assert drafts[0].ingredients[0].product_id == 3
+
+    def test_batch_nutrition_error(self, client, mock_nutrition_service):
+        """Test batch nutrition errors return 400"""
+        mock_nutrition_service.get_recipes_nutrition.side_effect = ValueError("Recipes not found: [9]")
+
+        response = client.post("/api/recipes/nutrition", json={"recipe_ids": [9]})
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Recipes not found: [9]"
+
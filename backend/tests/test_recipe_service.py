@@ -1,6 +1,8 @@
+import asyncio
 import pytest
+from io import BytesIO
 from unittest.mock import Mock, patch
-from models.recipe import RecipeCreate, RecipeResponse, RecipeDB, RecipeIngredientDB
+from models.recipe import RecipeCreate, RecipeResponse, RecipeDB, RecipeIngredientDB, RecipePage, RecipePatch, RecipeSummaryPage
 from models.product import ProductDB
 from services.recipe_service import RecipeService
 
@@ -53,6 +55,35 @@ class TestRecipeService:
         assert len(recipes) == 2
         assert all(isinstance(recipe, RecipeResponse) for recipe in recipes)
 
+    def test_get_recipes_page(self, recipe_service, sample_recipe_data, minimal_recipe_data):
+        """Test a full page contains formatted recipes"""
+        recipe_service.create_recipe(RecipeCreate(**sample_recipe_data))
+        recipe_service.create_recipe(RecipeCreate(**minimal_recipe_data))
+
+        page = recipe_service.get_recipes_page(1)
+        assert isinstance(page, RecipePage)
+        assert len(page.items) == 1
+        assert page.items[0].ingredients[0].product['name']
+        assert page.next_cursor is not None
+
+        page = recipe_service.get_recipes_page(1, cursor=page.next_cursor)
+        assert page.items[0].name == 'Simple Recipe'
+        assert page.next_cursor is None
+
+    def test_get_recipes_page_summary(self, recipe_service, sample_recipe_data):
+        """Test the summary view returns ingredient counts instead of ingredients"""
+        recipe_service.create_recipe(RecipeCreate(**sample_recipe_data))
+
+        page = recipe_service.get_recipes_page(10, view='summary')
+        assert isinstance(page, RecipeSummaryPage)
+        assert page.items[0].name == 'Pannenkoeken'
+        assert page.items[0].ingredient_count == 3
+
+    def test_get_recipes_page_invalid_view(self, recipe_service):
+        """Test unknown views raise ValueError"""
+        with pytest.raises(ValueError):
+            recipe_service.get_recipes_page(10, view='wide')
+
     def test_get_recipe_by_id_exists(self, recipe_service, sample_recipe_data):
         """Test getting recipe by ID when it exists"""
         recipe_create = RecipeCreate(**sample_recipe_data)
@@ -89,6 +120,25 @@ class TestRecipeService:
         result = recipe_service.update_recipe(999, recipe_create)
         assert result is None
 
+    def test_patch_recipe(self, recipe_service, sample_recipe_data):
+        """Test patching returns the formatted recipe"""
+        created = recipe_service.create_recipe(RecipeCreate(**sample_recipe_data))
+        line = created.ingredients[0]
+
+        result = recipe_service.patch_recipe(created.id, RecipePatch(
+            preparation_time=40,
+            ingredient_operations=[{'op': 'update', 'id': line.id, 'amount': 125.0}],
+        ))
+
+        assert isinstance(result, RecipeResponse)
+        assert result.preparation_time == 40
+        assert result.ingredients[0].amount == 125.0
+        assert result.ingredients[0].product['name'] == line.product['name']
+
+    def test_patch_recipe_not_exists(self, recipe_service):
+        """Test patching a missing recipe returns None"""
+        assert recipe_service.patch_recipe(999, RecipePatch(name='x')) is None
+
     def test_delete_recipe_exists(self, recipe_service, sample_recipe_data):
         """Test deleting existing recipe"""
         recipe_create = RecipeCreate(**sample_recipe_data)
@@ -118,6 +168,54 @@ class TestRecipeService:
         result = recipe_service.update_recipe_image(999, "/some/image.jpg")
         assert result is None
 
+    def test_replaced_image_is_deleted(self, recipe_service, sample_recipe_data):
+        """Test the old image file and thumbnails go once no recipe uses them"""
+        store = recipe_service.image_store
+        store.directory.mkdir()
+        for name in ['old.jpg', 'old_w320.webp', 'new.jpg']:
+            (store.directory / name).write_bytes(b'x')
+        created = recipe_service.create_recipe(RecipeCreate(**sample_recipe_data))
+        recipe_service.update_recipe_image(created.id, f'/api/recipes/{created.id}/image/old.jpg')
+
+        recipe_service.update_recipe_image(created.id, f'/api/recipes/{created.id}/image/new.jpg')
+
+        assert sorted(p.name for p in store.directory.iterdir()) == ['new.jpg']
+
+    def test_shared_image_is_kept(self, recipe_service, sample_recipe_data, minimal_recipe_data):
+        """Test a deduplicated image stays while another recipe refers to it"""
+        store = recipe_service.image_store
+        store.directory.mkdir()
+        (store.directory / 'shared.jpg').write_bytes(b'x')
+        first = recipe_service.create_recipe(RecipeCreate(**sample_recipe_data))
+        second = recipe_service.create_recipe(RecipeCreate(**minimal_recipe_data))
+        recipe_service.update_recipe_image(first.id, f'/api/recipes/{first.id}/image/shared.jpg')
+        recipe_service.update_recipe_image(second.id, f'/api/recipes/{second.id}/image/shared.jpg')
+
+        recipe_service.delete_recipe(first.id)
+        assert (store.directory / 'shared.jpg').exists()
+
+        recipe_service.delete_recipe(second.id)
+        assert not (store.directory / 'shared.jpg').exists()
+
+    def test_release_racing_deduplicated_upload(self, recipe_service, sample_recipe_data, minimal_recipe_data):
+        """Test an upload of the same bytes keeps the file its only other referrer releases"""
+        store = recipe_service.image_store
+        content = b'\xff\xd8\xff same photo'
+        first = recipe_service.create_recipe(RecipeCreate(**sample_recipe_data))
+        second = recipe_service.create_recipe(RecipeCreate(**minimal_recipe_data))
+
+        async def upload_to_both():
+            async with store.save(BytesIO(content)) as filename:
+                recipe_service.update_recipe_image(first.id, f'/api/recipes/{first.id}/image/{filename}')
+            async with store.save(BytesIO(content)) as uploaded:
+                recipe_service.delete_recipe(first.id)
+                recipe_service.update_recipe_image(second.id, f'/api/recipes/{second.id}/image/{uploaded}')
+            return filename
+
+        filename = asyncio.run(upload_to_both())
+
+        assert store.path(filename).read_bytes() == content
+
     def test_format_recipe_response_with_complex_ingredients(self, recipe_service, test_db, sample_products):
         """Test _format_recipe_response with complex ingredient structure"""
         # Create a mock recipe with ingredients manually
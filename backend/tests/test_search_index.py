@@ -0,0 +1,65 @@
+import pytest
+from utils.search_index import SearchIndex, normalize, bigrams
+
+
+@pytest.fixture
+def index():
+    index = SearchIndex()
+    index.load([
+        (1, "Appel"),
+        (2, "Appelmoes"),
+        (3, "Crème fraîche"),
+        (4, "Volle yoghurt"),
+        (5, "Groene appel"),
+        (6, "Kaas"),
+    ])
+    return index
+
+
+class TestSearchIndex:
+    def test_normalize_strips_diacritics(self):
+        """Test that diacritics and case are removed"""
+        assert normalize("  Crème  Fraîche ") == "creme fraiche"
+
+    def test_bigrams_are_padded(self):
+        """Test that word boundaries are part of the bigrams"""
+        assert bigrams("ab") == {" a", "ab", "b "}
+
+    def test_prefix_ranks_first(self, index):
+        """Test that whole-name prefix matches rank above word matches"""
+        results = index.search("appel")
+        ids = [item_id for item_id, _, _ in results]
+        assert ids[:2] == [1, 2]
+        assert 5 in ids
+
+    def test_typo_tolerance(self, index):
+        """Test that a misspelled query still finds the product"""
+        results = index.search("yoghrt")
+        assert results[0][0] == 4
+
+    def test_diacritics_in_query(self, index):
+        """Test that queries without accents match accented names"""
+        results = index.search("creme")
+        assert results[0][1] == "Crème fraîche"
+
+    def test_no_match(self, index):
+        """Test unrelated queries return nothing"""
+        assert index.search("xyzzy") == []
+        assert index.search("   ") == []
+
+    def test_limit(self, index):
+        """Test the result limit"""
+        assert len(index.search("appel", limit=1)) == 1
+
+    def test_incremental_add_update_remove(self, index):
+        """Test that entries can be changed without a rebuild"""
+        index.add(7, "Appeltaart")
+        assert 7 in [item_id for item_id, _, _ in index.search("appelt")]
+
+        index.add(7, "Kersentaart")
+        assert 7 not in [item_id for item_id, _, _ in index.search("appelt")]
+        assert index.search("kersen")[0][0] == 7
+
+        index.remove(7)
+        assert index.search("kersen") == []
+        assert len(index) == 6
@@ -0,0 +1,62 @@
+import pytest
+from datetime import date
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, Mock
+
+from routes.shopping_list_routes import router, get_shopping_list_service
+
+@pytest.fixture
+def mock_shopping_service():
+    """Mock shopping list service fixture"""
+    service = Mock()
+    service.generate_shopping_list = AsyncMock()
+    service.generate_shopping_list_for_range = AsyncMock()
+    return service
+
+@pytest.fixture
+def client(mock_shopping_service):
+    """Test client fixture with mocked service"""
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_shopping_list_service] = lambda: mock_shopping_service
+    return TestClient(app)
+
+@pytest.fixture
+def shopping_list():
+    return [{
+        "product_id": 1, "product_name": "Bloem", "amount": 350.0,
+        "unit": "gram", "checked": False
+    }]
+
+
+class TestShoppingListRoutes:
+    def test_get_shopping_list(self, client, mock_shopping_service, shopping_list):
+        """Test getting the shopping list of one menu"""
+        mock_shopping_service.generate_shopping_list.return_value = shopping_list
+
+        response = client.get("/api/shopping-list/1")
+
+        assert response.status_code == 200
+        assert response.json() == shopping_list
+        mock_shopping_service.generate_shopping_list.assert_called_once_with(1)
+
+    def test_get_shopping_list_for_range(self, client, mock_shopping_service, shopping_list):
+        """Test getting one shopping list for a date range"""
+        mock_shopping_service.generate_shopping_list_for_range.return_value = shopping_list
+
+        response = client.get("/api/shopping-list/?from=2024-01-10&to=2024-01-20")
+
+        assert response.status_code == 200
+        assert response.json() == shopping_list
+        mock_shopping_service.generate_shopping_list_for_range.assert_called_once_with(
+            date(2024, 1, 10), date(2024, 1, 20)
+        )
+
+    def test_get_shopping_list_for_invalid_range(self, client, mock_shopping_service):
+        """Test service errors become 400 responses"""
+        mock_shopping_service.generate_shopping_list_for_range.side_effect = ValueError("from must not be after to")
+
+        response = client.get("/api/shopping-list/?from=2024-01-20&to=2024-01-10")
+
+        assert response.status_code == 400
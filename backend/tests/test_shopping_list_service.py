@@ -0,0 +1,114 @@
+import pytest
+from datetime import date
+from sqlalchemy import event
+from models.recipe import RecipeCreate
+from models.weekmenu import WeekMenuCreate
+from repositories.weekmenu_repository import WeekMenuRepository
+from repositories.product_repository import ProductRepository
+from services.shopping_list_service import ShoppingListService
+
+
+@pytest.fixture
+def shopping_list_service(test_db):
+    """Shopping list service fixture"""
+    return ShoppingListService(WeekMenuRepository(test_db), ProductRepository(test_db))
+
+
+@pytest.fixture
+def recipes(recipe_repo, sample_recipe_data, minimal_recipe_data):
+    """Pannenkoeken (4 servings) and Simple Recipe (2 servings, 100 g flour)"""
+    return [
+        recipe_repo.create_recipe(RecipeCreate(**sample_recipe_data)),
+        recipe_repo.create_recipe(RecipeCreate(**minimal_recipe_data)),
+    ]
+
+
+def create_menu(test_db, start, end, days):
+    return WeekMenuRepository(test_db).create_week_menu(
+        WeekMenuCreate(start_date=start, end_date=end, days=days)
+    )
+
+
+class TestShoppingListService:
+    def test_generate_shopping_list_scales_servings(self, shopping_list_service, test_db, recipes):
+        """Test amounts are multiplied by day servings / recipe servings and summed"""
+        pannenkoeken, simple = recipes
+        menu = create_menu(test_db, date(2024, 1, 15), date(2024, 1, 21), [
+            {'date': date(2024, 1, 15), 'recipe_id': pannenkoeken.id, 'servings': 2},
+            {'date': date(2024, 1, 16), 'recipe_id': simple.id, 'servings': 4},
+        ])
+
+        result = shopping_list_service.generate_shopping_list(menu.id)
+
+        assert [item['product_name'] for item in result] == ['Bloem', 'Eieren', 'Melk']
+        bloem = result[0]
+        # 250 g * 2/4 + 100 g * 4/2
+        assert bloem['amount'] == pytest.approx(325.0)
+        assert bloem['unit'] == 'gram'
+        assert bloem['checked'] is False
+
+    def test_generate_shopping_list_skips_unmarked_days(self, shopping_list_service, test_db, recipes):
+        """Test days without add_to_shopping_list or recipe are ignored"""
+        pannenkoeken, simple = recipes
+        menu = create_menu(test_db, date(2024, 1, 15), date(2024, 1, 21), [
+            {'date': date(2024, 1, 15), 'recipe_id': pannenkoeken.id, 'servings': 4,
+             'add_to_shopping_list': False},
+            {'date': date(2024, 1, 16), 'recipe_id': simple.id, 'servings': 2},
+            {'date': date(2024, 1, 17), 'recipe_id': None, 'servings': 2},
+        ])
+
+        result = shopping_list_service.generate_shopping_list(menu.id)
+
+        assert len(result) == 1
+        assert result[0]['amount'] == pytest.approx(100.0)
+
+    def test_generate_shopping_list_menu_not_found(self, shopping_list_service):
+        """Test an unknown menu gives an empty list"""
+        assert shopping_list_service.generate_shopping_list(999) == []
+
+    def test_generate_shopping_list_for_range_merges_menus(self, shopping_list_service, test_db, recipes):
+        """Test days of all menus inside the range are merged into one list"""
+        pannenkoeken, simple = recipes
+        create_menu(test_db, date(2024, 1, 8), date(2024, 1, 14), [
+            {'date': date(2024, 1, 8), 'recipe_id': simple.id, 'servings': 2},
+            {'date': date(2024, 1, 14), 'recipe_id': simple.id, 'servings': 2},
+        ])
+        create_menu(test_db, date(2024, 1, 15), date(2024, 1, 21), [
+            {'date': date(2024, 1, 15), 'recipe_id': pannenkoeken.id, 'servings': 4},
+        ])
+
+        result = shopping_list_service.generate_shopping_list_for_range(
+            date(2024, 1, 10), date(2024, 1, 20)
+        )
+
+        amounts = {item['product_name']: item['amount'] for item in result}
+        assert amounts == pytest.approx({'Bloem': 350.0, 'Eieren': 3.0, 'Melk': 500.0})
+
+    def test_generate_shopping_list_uses_one_query(self, shopping_list_service, test_db, recipes):
+        """Test the number of queries does not grow with days or recipes"""
+        pannenkoeken, simple = recipes
+        days = [
+            {'date': date(2024, 1, day), 'recipe_id': recipe.id, 'servings': 2}
+            for day in range(1, 29) for recipe in recipes
+        ]
+        create_menu(test_db, date(2024, 1, 1), date(2024, 1, 28), days)
+        test_db.expire_all()
+
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(test_db.get_bind(), "before_cursor_execute", listener)
+        try:
+            shopping_list_service.generate_shopping_list_for_range(
+                date(2024, 1, 1), date(2024, 1, 31)
+            )
+        finally:
+            event.remove(test_db.get_bind(), "before_cursor_execute", listener)
+
+        assert len(statements) == 1
+
+    def test_generate_shopping_list_for_invalid_range(self, shopping_list_service):
+        """Test a reversed range is rejected"""
+        with pytest.raises(ValueError):
+            shopping_list_service.generate_shopping_list_for_range(
+                date(2024, 2, 1), date(2024, 1, 1)
+            )
@@ -0,0 +1,238 @@
+import pytest
+from datetime import date, timedelta
+from models.recipe import RecipeCreate
+from models.weekmenu import MenuDayCreate, MenuDayDB, MenuDayPatch, WeekMenuCreate
+from repositories.weekmenu_repository import WeekMenuRepository
+
+START = date(2024, 1, 15)
+
+
+@pytest.fixture
+def weekmenu_repo(test_db):
+    return WeekMenuRepository(test_db)
+
+
+@pytest.fixture
+def recipes(recipe_repo, sample_recipe_data, minimal_recipe_data):
+    return [
+        recipe_repo.create_recipe(RecipeCreate(**sample_recipe_data)),
+        recipe_repo.create_recipe(RecipeCreate(**minimal_recipe_data)),
+    ]
+
+
+@pytest.fixture
+def days(recipes):
+    return [
+        {'date': START + timedelta(days=i), 'recipe_id': recipes[i % 2].id, 'servings': 2}
+        for i in range(7)
+    ]
+
+
+@pytest.fixture
+def menu(weekmenu_repo, days):
+    return weekmenu_repo.create_week_menu(
+        WeekMenuCreate(start_date=START, end_date=START + timedelta(days=6), days=days)
+    )
+
+
+def day_writes(stats):
+    """Statement types written to menu_days"""
+    targets = ('UPDATE menu_days', 'INSERT INTO menu_days', 'DELETE FROM menu_days')
+    return [
+        shape.split()[0]
+        for shape, count in stats.shapes.items()
+        for _ in range(count)
+        if shape.startswith(targets)
+    ]
+
+
+class TestWeekMenuDayDiff:
+    def test_update_keeps_unchanged_days(self, weekmenu_repo, menu, days, query_budget):
+        """Test a full update with one changed day writes only that day"""
+        ids = {day.date: day.id for day in menu.days}
+        days[3]['servings'] = 4
+
+        with query_budget(20, allow_repeated=True) as stats:
+            result = weekmenu_repo.update_week_menu(menu.id, WeekMenuCreate(
+                start_date=menu.start_date, end_date=menu.end_date, days=days
+            ))
+
+        assert {day.date: day.id for day in result.days} == ids
+        assert day_writes(stats) == ['UPDATE']
+        assert next(d for d in result.days if d.date == days[3]['date']).servings == 4
+
+    def test_update_days_returns_only_changes(self, weekmenu_repo, menu, days, recipes):
+        """Test changed, added and removed days are reported separately"""
+        removed = days.pop(0)['date']
+        days[0]['recipe_id'] = recipes[1].id if days[0]['recipe_id'] == recipes[0].id else recipes[0].id
+
+        changed, removed_dates = weekmenu_repo.update_week_menu_days(
+            menu.id, [MenuDayCreate(**day) for day in days]
+        )
+
+        assert [day.date for day in changed] == [days[0]['date']]
+        assert changed[0].recipe.name
+        assert removed_dates == [removed]
+
+    def test_update_days_without_changes(self, weekmenu_repo, menu, days, query_budget):
+        """Test resending the same days writes nothing"""
+        with query_budget(20, allow_repeated=True) as stats:
+            changed, removed = weekmenu_repo.update_week_menu_days(
+                menu.id, [MenuDayCreate(**day) for day in days]
+            )
+        assert (changed, removed) == ([], [])
+        assert day_writes(stats) == []
+
+    def test_update_days_outside_menu(self, weekmenu_repo, menu, days, test_db):
+        """Test days outside the menu are rejected without writing anything"""
+        days.append({'date': START + timedelta(days=7), 'recipe_id': None, 'servings': 2})
+
+        with pytest.raises(ValueError, match='outside the week menu'):
+            weekmenu_repo.update_week_menu_days(menu.id, [MenuDayCreate(**day) for day in days])
+
+        test_db.rollback()
+        assert test_db.query(MenuDayDB).filter(MenuDayDB.week_menu_id == menu.id).count() == 7
+
+    def test_update_days_not_exists(self, weekmenu_repo):
+        """Test updating the days of a missing menu returns None"""
+        assert weekmenu_repo.update_week_menu_days(999, []) is None
+
+
+class TestPatchDay:
+    def test_patch_existing_day(self, weekmenu_repo, menu, recipes, query_budget):
+        """Test patching a day writes one row and returns just that day"""
+        day_date = START + timedelta(days=2)
+
+        with query_budget(20, allow_repeated=True) as stats:
+            day = weekmenu_repo.patch_day(menu.id, day_date, MenuDayPatch(servings=5))
+
+        assert day_writes(stats) == ['UPDATE']
+        assert day.date == day_date
+        assert day.servings == 5
+        assert day.recipe_id == recipes[0].id
+
+    def test_patch_adds_missing_day(self, weekmenu_repo, recipes, test_db):
+        """Test patching a date without a day creates it"""
+        menu = weekmenu_repo.create_week_menu(
+            WeekMenuCreate(start_date=START, end_date=START + timedelta(days=6))
+        )
+
+        day = weekmenu_repo.patch_day(menu.id, START, MenuDayPatch(recipe_id=recipes[1].id, servings=3))
+
+        assert day.id is not None
+        assert day.add_to_shopping_list is True
+        assert test_db.query(MenuDayDB).count() == 1
+
+    def test_patch_clears_recipe(self, weekmenu_repo, menu):
+        """Test an explicit null recipe_id removes the recipe"""
+        day = weekmenu_repo.patch_day(menu.id, START, MenuDayPatch(recipe_id=None))
+        assert day.recipe_id is None
+        assert day.recipe is None
+
+    def test_patch_outside_menu(self, weekmenu_repo, menu):
+        """Test dates outside the menu are rejected"""
+        with pytest.raises(ValueError):
+            weekmenu_repo.patch_day(menu.id, START - timedelta(days=1), MenuDayPatch(servings=2))
+
+    def test_patch_new_day_requires_servings(self, weekmenu_repo, recipes):
+        """Test a new day needs servings"""
+        menu = weekmenu_repo.create_week_menu(
+            WeekMenuCreate(start_date=START, end_date=START + timedelta(days=6))
+        )
+        with pytest.raises(ValueError):
+            weekmenu_repo.patch_day(menu.id, START, MenuDayPatch(recipe_id=recipes[0].id))
+
+    def test_patch_not_exists(self, weekmenu_repo):
+        """Test patching a missing menu returns None"""
+        assert weekmenu_repo.patch_day(999, START, MenuDayPatch(servings=2)) is None
+
+
+class TestWeekMenuRanges:
+    @pytest.fixture
+    def weeks(self, weekmenu_repo, recipes):
+        """Three consecutive weekly menus starting on START, each planning its first day"""
+        return [
+            weekmenu_repo.create_week_menu(WeekMenuCreate(
+                start_date=START + timedelta(weeks=i),
+                end_date=START + timedelta(weeks=i, days=6),
+                days=[{'date': START + timedelta(weeks=i), 'recipe_id': recipes[0].id, 'servings': 2}],
+            ))
+            for i in range(3)
+        ]
+
+    def test_overlapping_menus(self, weekmenu_repo, weeks, query_budget):
+        """Test menus partly inside the window are included, newest first"""
+        with query_budget(1):
+            result = weekmenu_repo.get_all_week_menus(START + timedelta(days=10), START + timedelta(days=16))
+
+        assert [menu.id for menu in result] == [weeks[2].id, weeks[1].id]
+        assert result[0].days[0].recipe.name == 'Pannenkoeken'
+
+    def test_window_inside_one_menu(self, weekmenu_repo, weeks):
+        """Test a window within a week finds the menu covering it"""
+        result = weekmenu_repo.get_all_week_menus(START + timedelta(days=2), START + timedelta(days=3))
+
+        assert [menu.id for menu in result] == [weeks[0].id]
+
+    def test_open_bounds(self, weekmenu_repo, weeks):
+        """Test a missing bound leaves that side of the window open"""
+        assert len(weekmenu_repo.get_all_week_menus(date_from=START + timedelta(days=7))) == 2
+        assert len(weekmenu_repo.get_all_week_menus(date_to=START)) == 1
+        assert len(weekmenu_repo.get_all_week_menus()) == 3
+
+    def test_days_on(self, weekmenu_repo, weeks, query_budget):
+        """Test the planned days of one date come with their recipe"""
+        with query_budget(1):
+            result = weekmenu_repo.get_days_on(START + timedelta(weeks=1))
+
+        assert [day.week_menu_id for day in result] == [weeks[1].id]
+        assert result[0].recipe.name == 'Pannenkoeken'
+        assert weekmenu_repo.get_days_on(START + timedelta(days=1)) == []
+
+
+class TestWeekMenuChangeEvents:
+    def test_create_publishes_menu_and_days(self, weekmenu_repo, days, published_events):
+        """Test a new menu is announced with each of its days"""
+        menu = weekmenu_repo.create_week_menu(
+            WeekMenuCreate(start_date=START, end_date=START + timedelta(days=6), days=days)
+        )
+
+        assert published_events[0] == {
+            'type': 'week_menu.changed', 'week_menu_id': menu.id,
+            'start_date': '2024-01-15', 'end_date': '2024-01-21',
+        }
+        day_events = published_events[1:]
+        assert [event['date'] for event in day_events] == [day['date'].isoformat() for day in days]
+        assert {event['day']['id'] for event in day_events} == {day.id for day in menu.days}
+        assert day_events[0]['day']['servings'] == 2
+
+    def test_update_days_publishes_only_changes(self, weekmenu_repo, menu, days, published_events):
+        """Test unchanged days are not announced"""
+        removed = days.pop(0)['date']
+        days[2]['servings'] = 6
+        published_events.clear()
+
+        weekmenu_repo.update_week_menu_days(menu.id, [MenuDayCreate(**day) for day in days])
+
+        assert published_events == [
+            {
+                'type': 'menu_day.changed', 'week_menu_id': menu.id,
+                'date': days[2]['date'].isoformat(),
+                'day': {
+                    'id': next(d.id for d in menu.days if d.date == days[2]['date']),
+                    'recipe_id': days[2]['recipe_id'], 'servings': 6, 'add_to_shopping_list': True,
+                },
+            },
+            {'type': 'menu_day.removed', 'week_menu_id': menu.id, 'date': removed.isoformat()},
+        ]
+
+    def test_patch_and_delete(self, weekmenu_repo, menu, published_events):
+        """Test a patched day and a deleted menu are announced"""
+        published_events.clear()
+
+        weekmenu_repo.patch_day(menu.id, START, MenuDayPatch(servings=5))
+        weekmenu_repo.delete_week_menu(menu.id)
+
+        assert published_events[0]['type'] == 'menu_day.changed'
+        assert published_events[0]['day']['servings'] == 5
+        assert published_events[1] == {'type': 'week_menu.removed', 'week_menu_id': menu.id}
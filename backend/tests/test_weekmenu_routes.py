@@ -0,0 +1,154 @@
+import pytest
+from datetime import date
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, Mock
+
+from models.nutrition import NutritionValues
+from models.weekmenu import MenuDayResponse, PlannedDayResponse, WeekMenuDayChanges
+from routes.weekmenu_routes import router, get_weekmenu_service
+from utils.http_cache import get_version_repository
+
+@pytest.fixture
+def mock_weekmenu_service():
+    """Mock week menu service fixture"""
+    service = Mock()
+    service.update_week_menu_days = AsyncMock()
+    service.patch_day = AsyncMock()
+    service.get_all_week_menus = AsyncMock(return_value=[])
+    service.get_planned_days = AsyncMock()
+    return service
+
+@pytest.fixture
+def client(mock_weekmenu_service, mock_version_repo):
+    """Test client fixture with mocked service"""
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_weekmenu_service] = lambda: mock_weekmenu_service
+    app.dependency_overrides[get_version_repository] = lambda: mock_version_repo
+    return TestClient(app)
+
+@pytest.fixture
+def menu_day():
+    return MenuDayResponse(
+        id=3, date=date(2024, 1, 17), recipe_id=1, servings=4, add_to_shopping_list=True,
+        recipe={"id": 1, "name": "Pannenkoeken", "servings": 4, "preparation_time": 30}
+    )
+
+
+class TestWeekMenuDayRoutes:
+    def test_patch_day(self, client, mock_weekmenu_service, menu_day):
+        """Test patching one day returns only that day"""
+        mock_weekmenu_service.patch_day.return_value = menu_day
+
+        response = client.patch("/api/weekmenus/1/days/2024-01-17", json={"servings": 4})
+
+        assert response.status_code == 200
+        assert response.json()["id"] == 3
+        assert response.json()["recipe"]["name"] == "Pannenkoeken"
+        menu_id, day_date, patch = mock_weekmenu_service.patch_day.call_args[0]
+        assert (menu_id, day_date) == (1, date(2024, 1, 17))
+        assert patch.dict(exclude_unset=True) == {"servings": 4}
+
+    def test_patch_day_with_recipe_nutrition(self, client, mock_weekmenu_service, menu_day):
+        """Test the recipe's per-serving nutrition is sent with the day"""
+        menu_day.recipe["nutrition"] = NutritionValues(energy_kcal=350.0, proteins=12.5)
+        mock_weekmenu_service.patch_day.return_value = menu_day
+
+        response = client.patch("/api/weekmenus/1/days/2024-01-17", json={"servings": 4})
+
+        assert response.status_code == 200
+        assert response.json()["recipe"]["nutrition"] == {
+            "energy_kcal": 350.0, "fats": 0.0, "carbohydrates": 0.0,
+            "sugars": 0.0, "fibers": 0.0, "proteins": 12.5,
+        }
+
+    def test_patch_day_not_found(self, client, mock_weekmenu_service):
+        """Test patching a day of a missing menu"""
+        mock_weekmenu_service.patch_day.return_value = None
+
+        response = client.patch("/api/weekmenus/9/days/2024-01-17", json={"servings": 4})
+
+        assert response.status_code == 404
+
+    def test_patch_day_outside_menu(self, client, mock_weekmenu_service):
+        """Test service errors become 400"""
+        mock_weekmenu_service.patch_day.side_effect = ValueError("2024-02-01 is outside the week menu")
+
+        response = client.patch("/api/weekmenus/1/days/2024-02-01", json={"servings": 4})
+
+        assert response.status_code == 400
+        assert "outside" in response.json()["detail"]
+
+    def test_update_days(self, client, mock_weekmenu_service, menu_day):
+        """Test a full days update returns the changed and removed days"""
+        mock_weekmenu_service.update_week_menu_days.return_value = WeekMenuDayChanges(
+            changed=[menu_day], removed=[date(2024, 1, 15)]
+        )
+
+        response = client.put("/api/weekmenus/1/days", json=[
+            {"date": "2024-01-16", "recipe_id": 1, "servings": 2},
+            {"date": "2024-01-17", "recipe_id": 1, "servings": 4},
+        ])
+
+        assert response.status_code == 200
+        assert [day["id"] for day in response.json()["changed"]] == [3]
+        assert response.json()["removed"] == ["2024-01-15"]
+        menu_id, days = mock_weekmenu_service.update_week_menu_days.call_args[0]
+        assert menu_id == 1 and len(days) == 2
+
+    def test_update_days_outside_menu(self, client, mock_weekmenu_service):
+        """Test days outside the menu are rejected with 400"""
+        mock_weekmenu_service.update_week_menu_days.side_effect = ValueError("2024-02-01 is outside the week menu")
+
+        response = client.put("/api/weekmenus/1/days", json=[
+            {"date": "2024-02-01", "recipe_id": 1, "servings": 2},
+        ])
+
+        assert response.status_code == 400
+        assert "outside" in response.json()["detail"]
+
+    def test_update_days_not_found(self, client, mock_weekmenu_service):
+        """Test updating the days of a missing menu"""
+        mock_weekmenu_service.update_week_menu_days.return_value = None
+
+        response = client.put("/api/weekmenus/9/days", json=[])
+
+        assert response.status_code == 404
+
+
+class TestWeekMenuRangeRoutes:
+    def test_get_menus_in_window(self, client, mock_weekmenu_service):
+        """Test from/to are passed on as the overlap window"""
+        response = client.get("/api/weekmenus/?from=2024-01-15&to=2024-01-21")
+
+        assert response.status_code == 200
+        mock_weekmenu_service.get_all_week_menus.assert_called_once_with(date(2024, 1, 15), date(2024, 1, 21))
+
+    def test_get_all_menus_without_window(self, client, mock_weekmenu_service):
+        """Test the listing without a window still returns every menu"""
+        response = client.get("/api/weekmenus/")
+
+        assert response.status_code == 200
+        mock_weekmenu_service.get_all_week_menus.assert_called_once_with(None, None)
+
+    def test_get_menus_invalid_window(self, client, mock_weekmenu_service):
+        """Test an inverted window is a 400"""
+        mock_weekmenu_service.get_all_week_menus.side_effect = ValueError("from must not be after to")
+
+        response = client.get("/api/weekmenus/?from=2024-01-21&to=2024-01-15")
+
+        assert response.status_code == 400
+
+    def test_get_planned_days(self, client, mock_weekmenu_service, menu_day):
+        """Test the planned days of a date include their menu id"""
+        mock_weekmenu_service.get_planned_days.return_value = [
+            PlannedDayResponse(week_menu_id=1, **menu_day.model_dump())
+        ]
+
+        response = client.get("/api/weekmenus/days/2024-01-17")
+
+        assert response.status_code == 200
+        assert response.json()[0]["week_menu_id"] == 1
+        assert response.json()[0]["recipe"]["name"] == "Pannenkoeken"
+        mock_weekmenu_service.get_planned_days.assert_called_once_with(date(2024, 1, 17))
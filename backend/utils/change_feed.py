@@ -0,0 +1,217 @@
+import asyncio
+import contextlib
+import json
+import logging
+import signal
+import threading
+from typing import AsyncIterator, Iterator, Set
+
+# PostgreSQL NOTIFY channel the write paths publish on
+CHANNEL = "nutrition_changes"
+QUEUE_SIZE = 256
+HEARTBEAT_SECONDS = 15.0
+RECONNECT_SECONDS = 5.0
+# Streams end after this long and the browser reconnects, so no connection
+# lives on indefinitely behind proxies or across deploys
+STREAM_LIFETIME_SECONDS = 600.0
+EXIT_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+# Tells clients to refetch: events may have been missed
+RESYNC = {"type": "resync"}
+
+
+def encode_event(event: dict) -> str:
+    return json.dumps(event, separators=(",", ":"))
+
+
+class Subscription:
+    """Events waiting for one open stream, bound to the loop it runs on"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+        self.closed = False
+
+    def put(self, event: dict) -> None:
+        # A client that stops reading is cut off instead of buffering forever
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def close(self) -> None:
+        self.closed = True
+        # Wakes a stream waiting for its next event
+        with contextlib.suppress(asyncio.QueueFull):
+            self.queue.put_nowait(RESYNC)
+
+
+class ChangeBroker:
+    """In-process fan-out of change events to the open event streams.
+
+    publish() can be called from any thread, e.g. from sync repository code
+    after a commit or from the LISTEN connection; every subscriber gets the
+    event on its own event loop.
+    """
+
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscriptions: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self.closed = False
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[Subscription]:
+        subscription = Subscription(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            subscription.closed = self.closed
+            self._subscriptions.add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                self._subscriptions.discard(subscription)
+
+    def publish(self, event: dict) -> None:
+        self._call_subscribers("put", event)
+
+    def close(self) -> None:
+        """End every open stream and every stream opened from now on"""
+        with self._lock:
+            self.closed = True
+        self._call_subscribers("close")
+
+    def _call_subscribers(self, method: str, *args) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    getattr(subscription, method), *args
+                )
+            except RuntimeError:
+                # The loop of a stream that is shutting down is already closed
+                pass
+
+
+async def event_stream(
+    broker: ChangeBroker,
+    heartbeat: float = HEARTBEAT_SECONDS,
+    lifetime: float = STREAM_LIFETIME_SECONDS,
+) -> AsyncIterator[str]:
+    """Server-sent events for everything published on the broker.
+
+    The event name is the event type and the data its compact JSON. A comment
+    line goes out when nothing happened for `heartbeat` seconds, so proxies
+    keep the connection open. A subscriber that falls behind gets a final
+    resync event and the stream ends. Streams also end after `lifetime`
+    seconds and when the broker is closed; the browser reconnects by itself.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + lifetime
+    async with broker.subscribe() as subscription:
+        if subscription.closed:
+            return
+        yield f"retry: {int(RECONNECT_SECONDS * 1000)}\n\n"
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            try:
+                event = await asyncio.wait_for(
+                    subscription.queue.get(), min(heartbeat, remaining)
+                )
+            except asyncio.TimeoutError:
+                if loop.time() < deadline:
+                    yield ": keepalive\n\n"
+                continue
+            if subscription.closed:
+                return
+            if subscription.overflowed:
+                event = RESYNC
+            yield f"event: {event['type']}\ndata: {encode_event(event)}\n\n"
+            if event is RESYNC:
+                return
+
+
+@contextlib.contextmanager
+def close_on_exit_signals(broker: ChangeBroker) -> Iterator[None]:
+    """Close the broker as soon as the server is told to stop.
+
+    uvicorn waits for open connections to finish before it runs the lifespan
+    shutdown, and an event stream does not finish by itself. Entered from the
+    lifespan startup, i.e. after uvicorn installed its SIGINT/SIGTERM
+    handlers, this puts a handler in front of them that ends the streams
+    first. Signal handlers can only be set from the main thread; elsewhere,
+    e.g. under a test client, this does nothing.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    loop = asyncio.get_running_loop()
+    previous = {}
+
+    def handle_exit(signum, frame):
+        # The handler may interrupt code holding the broker's lock, so the
+        # close itself runs as a regular callback on the loop
+        loop.call_soon_threadsafe(broker.close)
+        handler = previous[signum]
+        if callable(handler):
+            handler(signum, frame)
+        elif handler == signal.SIG_DFL:
+            signal.signal(signum, signal.SIG_DFL)
+            signal.raise_signal(signum)
+
+    for exit_signal in EXIT_SIGNALS:
+        previous[exit_signal] = signal.signal(exit_signal, handle_exit)
+    try:
+        yield
+    finally:
+        for exit_signal, handler in previous.items():
+            signal.signal(exit_signal, handler)
+
+
+async def listen(broker: ChangeBroker, dsn: str) -> None:
+    """Forward NOTIFY payloads on CHANNEL to the broker until cancelled.
+
+    Every API worker runs one listener, so a change committed by any worker
+    reaches the streams of all of them. The connection is reopened after
+    errors, after which subscribers get a resync event for what they missed.
+    """
+    import asyncpg
+
+    logger = logging.getLogger(__name__)
+
+    def forward(connection, pid, channel, payload):
+        try:
+            broker.publish(json.loads(payload))
+        except ValueError:
+            logger.warning("Ignoring malformed change event %r", payload)
+
+    connected_before = False
+    while True:
+        try:
+            connection = await asyncpg.connect(dsn)
+        except Exception:
+            logger.exception("Could not open the %s listener connection", CHANNEL)
+            await asyncio.sleep(RECONNECT_SECONDS)
+            continue
+
+        closed = asyncio.Event()
+        connection.add_termination_listener(lambda _: closed.set())
+        try:
+            await connection.add_listener(CHANNEL, forward)
+            if connected_before:
+                broker.publish(RESYNC)
+            connected_before = True
+            await closed.wait()
+            logger.warning("The %s listener connection was closed", CHANNEL)
+        except Exception:
+            logger.exception("The %s listener failed", CHANNEL)
+        finally:
+            await connection.close()
+        await asyncio.sleep(RECONNECT_SECONDS)
+
+
+change_broker = ChangeBroker()
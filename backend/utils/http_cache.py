@@ -0,0 +1,75 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Optional, Sequence
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.database import get_async_db
+from repositories.async_repositories import AsyncSessionProxy
+from repositories.version_repository import VersionRepository
+
+# Tables whose changes affect the responses of a resource; recipes embed
+# product data and week menus embed recipe data.
+RESOURCE_TABLES = {
+    "products": ["products"],
+    "recipes": ["recipes", "products"],
+    "weekmenus": ["week_menus", "recipes", "products"],
+}
+
+
+def get_version_repository(
+    db: AsyncSession = Depends(get_async_db),
+) -> AsyncSessionProxy:
+    return AsyncSessionProxy(db, VersionRepository)
+
+
+def make_etag(versions: Sequence[int]) -> str:
+    return '"v' + ".".join(str(version) for version in versions) + '"'
+
+
+def is_not_modified(
+    request: Request, etag: str, last_modified: Optional[datetime]
+) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no ETag was sent"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip() for tag in if_none_match.split(",")]
+        return "*" in tags or etag in [tag.removeprefix("W/") for tag in tags]
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def conditional_get(resource: str) -> Callable:
+    """Route dependency adding ETag/Last-Modified to a GET response.
+
+    The validators come from the table version counters, so a matching
+    If-None-Match is answered with 304 before the route queries any rows.
+    """
+    tables = RESOURCE_TABLES[resource]
+
+    async def check(
+        request: Request,
+        response: Response,
+        version_repo: AsyncSessionProxy = Depends(get_version_repository),
+    ) -> None:
+        versions, last_modified = await version_repo.get_versions(tables)
+        headers = {"ETag": make_etag(versions), "Cache-Control": "no-cache"}
+        if last_modified:
+            if last_modified.tzinfo is None:
+                last_modified = last_modified.replace(tzinfo=timezone.utc)
+            last_modified = last_modified.astimezone(timezone.utc)
+            headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+        if is_not_modified(request, headers["ETag"], last_modified):
+            raise HTTPException(status_code=304, headers=headers)
+        response.headers.update(headers)
+
+    return check
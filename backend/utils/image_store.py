@@ -0,0 +1,295 @@
+import asyncio
+import contextlib
+import functools
+import hashlib
+import logging
+import os
+import re
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import (
+    AsyncIterator,
+    BinaryIO,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
+
+from starlette.concurrency import run_in_threadpool
+
+CHUNK_SIZE = 1024 * 1024
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+RENDITION_WIDTHS = (320, 640, 1280)
+# Originals whose width is remembered, per process
+WIDTH_CACHE_SIZE = 1024
+# File extension -> (Pillow format, save options)
+RENDITION_FORMATS: Dict[str, Tuple[str, dict]] = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+# Leading bytes -> stored extension. The extension follows from the content,
+# so equal bytes always get one name and one set of renditions.
+IMAGE_SIGNATURES: Tuple[Tuple[bytes, str], ...] = (
+    (b"\xff\xd8\xff", "jpg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+)
+# Stored names are plain file names: sha256 originals and their renditions,
+# plus the uuid names of images uploaded before content addressing
+FILENAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]+\.[A-Za-z0-9]+$")
+CONTENT_ADDRESSED_PATTERN = re.compile(r"^[0-9a-f]{64}(_w[0-9]+)?\.[a-z0-9]+$")
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=2)
+    return _process_pool
+
+
+def detect_extension(head: bytes) -> str:
+    """File extension for the image format the first bytes belong to"""
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    for signature, extension in IMAGE_SIGNATURES:
+        if head.startswith(signature):
+            return extension
+    raise ValueError("Unsupported image format, use JPEG, PNG, GIF or WebP")
+
+
+@functools.lru_cache(maxsize=WIDTH_CACHE_SIZE)
+def read_display_width(source: str) -> int:
+    """Width of an image as render_renditions sees it.
+
+    Stored files never change, so widths are cached; failures are not.
+    """
+    from PIL import Image
+
+    with Image.open(source) as image:
+        width, height = image.size
+        # EXIF orientations 5-8 are rotated by 90 degrees, as
+        # render_renditions applies them
+        if image.getexif().get(0x0112) in (5, 6, 7, 8):
+            return height
+        return width
+
+
+def render_renditions(source: str, widths: Iterable[int]) -> List[str]:
+    """Write resized WebP and JPEG copies of an image next to it.
+
+    Runs in a worker process. Widths at or above the original width are
+    skipped, as are renditions that already exist. Returns the file names
+    that were written.
+    """
+    from PIL import Image, ImageOps
+
+    source_path = Path(source)
+    written = []
+    with Image.open(source_path) as opened:
+        image = ImageOps.exif_transpose(opened).convert("RGB")
+        for width in widths:
+            if width >= image.width:
+                continue
+            height = max(1, round(image.height * width / image.width))
+            resized = None
+            for extension, (image_format, options) in RENDITION_FORMATS.items():
+                target = source_path.with_name(
+                    f"{source_path.stem}_w{width}.{extension}"
+                )
+                if target.exists():
+                    continue
+                if resized is None:
+                    resized = image.resize((width, height), Image.LANCZOS)
+                partial = target.with_name(f".{target.name}.{uuid.uuid4().hex}.part")
+                resized.save(partial, format=image_format, **options)
+                os.replace(partial, target)
+                written.append(target.name)
+    return written
+
+
+class ImageStore:
+    """Content-addressed image files in one directory.
+
+    Originals are named after the sha256 of their bytes plus the extension
+    of their detected format, so uploading the same photo twice stores it
+    once, whatever the client called it. Renditions are named
+    <hash>_w<width>.<webp|jpg> and generated in a process pool. Callers
+    release an image once no recipe refers to it any more.
+    """
+
+    def __init__(self, directory: Path, executor: Optional[Executor] = None):
+        self.directory = Path(directory)
+        self.executor = executor
+
+    def path(self, filename: str) -> Path:
+        """Path of a stored file, raising ValueError for anything but a plain name"""
+        if not FILENAME_PATTERN.match(filename):
+            raise ValueError("Invalid image name")
+        return self.directory / filename
+
+    def variant(
+        self, filename: str, width: Optional[int] = None, webp: bool = False
+    ) -> Tuple[Path, bool]:
+        """The file to serve for a requested display width.
+
+        Picks the smallest rendition at least `width` wide, WebP when the
+        client accepts it. Returns the path and whether it is the final answer
+        for this request. The original is final when no such rendition can
+        exist: `width` is above the largest rendition width, or the original
+        is not wider than the rendition that would fit. It is not final while
+        that rendition has yet to be rendered.
+        """
+        original = self.path(filename)
+        if width is None:
+            return original, True
+
+        extensions = ["webp", "jpg"] if webp else ["jpg"]
+        candidates = [w for w in RENDITION_WIDTHS if w >= width]
+        for candidate in candidates:
+            for extension in extensions:
+                rendition = self.directory / f"{original.stem}_w{candidate}.{extension}"
+                if rendition.exists():
+                    return rendition, True
+        if not candidates:
+            return original, True
+        original_width = self.original_width(filename)
+        return original, original_width is not None and original_width <= candidates[0]
+
+    def original_width(self, filename: str) -> Optional[int]:
+        """Display width of a stored original, None when it cannot be read"""
+        try:
+            return read_display_width(str(self.path(filename)))
+        except Exception:
+            return None
+
+    @staticmethod
+    def is_content_addressed(filename: str) -> bool:
+        """Whether a stored name is derived from the file's bytes"""
+        return bool(CONTENT_ADDRESSED_PATTERN.match(filename))
+
+    @staticmethod
+    def filename_from_url(image_url: Optional[str]) -> Optional[str]:
+        """The stored file name an image URL points to"""
+        if not image_url:
+            return None
+        filename = image_url.rsplit("/", 1)[-1].split("?", 1)[0]
+        return filename if FILENAME_PATTERN.match(filename) else None
+
+    @contextlib.asynccontextmanager
+    async def save(self, upload: BinaryIO) -> AsyncIterator[str]:
+        """Stream an upload to disk off the event loop and yield its file name.
+
+        Commit the recipe that refers to the file inside the block. When the
+        same bytes were stored before, a release of the last other recipe
+        using them may delete the file before that commit; a hard link to
+        the upload is held until the block ends and puts the file back then.
+        """
+        filename, kept = await run_in_threadpool(self._store_upload, upload)
+        try:
+            yield filename
+            self._link(kept, self.directory / filename)
+        finally:
+            kept.unlink(missing_ok=True)
+
+    @staticmethod
+    def _link(source: Path, target: Path) -> None:
+        # Creates target only when it is missing; equal names hold equal bytes
+        try:
+            os.link(source, target)
+        except FileExistsError:
+            pass
+
+    def _store_upload(self, upload: BinaryIO) -> Tuple[str, Path]:
+        """Write an upload under its content name; returns the name and a
+        second link to the bytes that the caller removes"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        digest = hashlib.sha256()
+        size = 0
+        extension = None
+        partial = self.directory / f".upload-{uuid.uuid4().hex}.part"
+        try:
+            with open(partial, "wb") as out:
+                while chunk := upload.read(CHUNK_SIZE):
+                    if extension is None:
+                        extension = detect_extension(chunk)
+                    size += len(chunk)
+                    if size > MAX_IMAGE_BYTES:
+                        raise ValueError(
+                            f"Image is larger than {MAX_IMAGE_BYTES // (1024 * 1024)} MB"
+                        )
+                    digest.update(chunk)
+                    out.write(chunk)
+
+            if extension is None:
+                raise ValueError("The uploaded file is empty")
+            filename = f"{digest.hexdigest()}.{extension}"
+            # Same content uploaded before: the existing file stays
+            self._link(partial, self.directory / filename)
+            return filename, partial
+        except BaseException:
+            partial.unlink(missing_ok=True)
+            raise
+
+    async def generate_renditions(self, filename: str) -> List[str]:
+        """Render the thumbnails of a stored image in the process pool.
+
+        Meant to run as a background task: failures, e.g. an upload that is
+        not a readable image, are logged and the original keeps being served.
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self.executor or _get_process_pool(),
+                render_renditions,
+                str(self.path(filename)),
+                RENDITION_WIDTHS,
+            )
+        except Exception:
+            logging.getLogger(__name__).exception(
+                "Could not render thumbnails of %s", filename
+            )
+            return []
+
+    def release(self, filename: str, in_use: Callable[[], bool]) -> bool:
+        """Delete an original and its renditions unless in_use() is true.
+
+        A deduplicated upload can start referring to the file at any moment,
+        so the original is moved aside and in_use() asked again before it is
+        really deleted. A referrer that committed in between gets the file
+        back; one that commits later restores it from its upload (see save).
+        Returns whether the image was deleted.
+        """
+        if in_use():
+            return False
+        original = self.path(filename)
+        aside = self.directory / f".{filename}.{uuid.uuid4().hex}.deleted"
+        try:
+            os.replace(original, aside)
+        except FileNotFoundError:
+            aside = None
+
+        try:
+            if in_use():
+                if aside:
+                    self._link(aside, original)
+                return False
+        finally:
+            if aside:
+                aside.unlink()
+
+        # Renditions belong to the original, unless an upload just put it back
+        if not original.exists():
+            for path in self.directory.glob(f"{original.stem}_w*"):
+                path.unlink(missing_ok=True)
+        return True
+
+
+recipe_image_store = ImageStore(Path("uploads/recipes"))
@@ -0,0 +1,122 @@
+import threading
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+NUTRIENTS = ["energy_kcal", "fats", "carbohydrates", "sugars", "fibers", "proteins"]
+
+
+class NutritionMatrix:
+    """Product macros per unit of serving_size as a dense NumPy matrix.
+
+    Row i holds the nutrients of one product divided by its serving_size, so
+    an ingredient contributes `amount * row`. A batch of recipes is then a
+    sparse (recipes x products) matrix of amounts multiplied with this
+    matrix. Rows are updated in place when a product changes, and the
+    matrix is local to the worker process that owns it.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._lock = threading.RLock()
+        self._matrix = np.zeros((capacity, len(NUTRIENTS)))
+        self._row_of: Dict[int, int] = {}
+        self._free_rows: List[int] = []
+        self._next_row = 0
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._row_of)
+
+    def __contains__(self, product_id: int) -> bool:
+        return product_id in self._row_of
+
+    def load(self, rows: Iterable[Sequence]) -> None:
+        """Replace the contents with (id, serving_size, *NUTRIENTS) rows"""
+        rows = list(rows)
+        with self._lock:
+            capacity = max(len(rows) * 2, 1024)
+            self._matrix = np.zeros((capacity, len(NUTRIENTS)))
+            self._row_of = {}
+            self._free_rows = []
+            self._next_row = 0
+            for product_id, serving_size, *values in rows:
+                self._set(product_id, serving_size, values)
+            self.loaded = True
+
+    def clear(self) -> None:
+        self.load([])
+        self.loaded = False
+
+    def upsert(
+        self, product_id: int, serving_size: float, values: Sequence[float]
+    ) -> None:
+        """Add or replace one product; values are in NUTRIENTS order"""
+        with self._lock:
+            self._set(product_id, serving_size, values)
+
+    def remove(self, product_id: int) -> None:
+        with self._lock:
+            row = self._row_of.pop(product_id, None)
+            if row is not None:
+                self._matrix[row] = 0.0
+                self._free_rows.append(row)
+
+    def compute(self, recipes: Sequence[Sequence[Tuple[int, float]]]) -> np.ndarray:
+        """Total nutrients per recipe for lists of (product_id, amount).
+
+        Returns a (len(recipes), len(NUTRIENTS)) array. Raises KeyError with
+        the unknown product ids when an ingredient is not in the matrix.
+        """
+        if not recipes:
+            return np.zeros((0, len(NUTRIENTS)))
+
+        counts = np.fromiter((len(items) for items in recipes), dtype=np.intp)
+        recipe_index = np.repeat(np.arange(len(recipes)), counts)
+        product_ids = [product_id for items in recipes for product_id, _ in items]
+        amounts = np.fromiter(
+            (amount for items in recipes for _, amount in items),
+            dtype=float,
+            count=len(product_ids),
+        )
+
+        with self._lock:
+            missing = sorted({pid for pid in product_ids if pid not in self._row_of})
+            if missing:
+                raise KeyError(missing)
+            rows = np.fromiter(
+                (self._row_of[pid] for pid in product_ids),
+                dtype=np.intp,
+                count=len(product_ids),
+            )
+            contributions = self._matrix[rows] * amounts[:, None]
+
+        # Sum the ingredient rows per recipe: the sparse product done with bincount
+        return np.column_stack(
+            [
+                np.bincount(
+                    recipe_index, weights=contributions[:, k], minlength=len(recipes)
+                )
+                for k in range(len(NUTRIENTS))
+            ]
+        )
+
+    def _set(
+        self, product_id: int, serving_size: float, values: Sequence[float]
+    ) -> None:
+        row = self._row_of.get(product_id)
+        if row is None:
+            row = self._allocate_row()
+            self._row_of[product_id] = row
+        per_unit = np.asarray(values, dtype=float) / (serving_size or 1.0)
+        self._matrix[row] = per_unit
+
+    def _allocate_row(self) -> int:
+        if self._free_rows:
+            return self._free_rows.pop()
+        if self._next_row == len(self._matrix):
+            grown = np.zeros((len(self._matrix) * 2, len(NUTRIENTS)))
+            grown[: len(self._matrix)] = self._matrix
+            self._matrix = grown
+        row = self._next_row
+        self._next_row += 1
+        return row
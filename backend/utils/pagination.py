@@ -0,0 +1,86 @@
+import base64
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(data: Dict[str, Any]) -> str:
+    """Encode the keyset position of the last row into an opaque token"""
+    raw = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Dict[str, Any]:
+    """Decode a token created by encode_cursor, raising ValueError when invalid"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+    if not isinstance(data, dict):
+        raise ValueError("Invalid cursor")
+    return data
+
+
+def keyset_page(
+    query,
+    id_column,
+    sort_columns: Dict[str, Any],
+    sort: str,
+    limit: int,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Any], Optional[str]]:
+    """One keyset page of query plus the cursor for the next page.
+
+    Rows are ordered by sort_columns[sort] with id_column as tie-breaker.
+    They may be entities or named rows, as long as they have an id attribute
+    and an attribute named after the sort key.
+    """
+    if sort not in sort_columns:
+        raise ValueError(f"Invalid sort. Must be one of: {list(sort_columns)}")
+    sort_column = sort_columns[sort]
+
+    if cursor:
+        position = decode_cursor(cursor)
+        if position.get("sort") != sort or "id" not in position:
+            raise ValueError("Cursor does not match the requested sort order")
+        # Anything but a scalar of the column's type never came from us
+        if not _fits_column(position["id"], id_column) or (
+            sort != "id" and not _fits_column(position.get("value"), sort_column)
+        ):
+            raise ValueError("Invalid cursor")
+        if sort == "id":
+            query = query.filter(id_column > position["id"])
+        else:
+            query = query.filter(
+                tuple_(sort_column, id_column)
+                > tuple_(position["value"], position["id"])
+            )
+
+    order = [sort_column] if sort == "id" else [sort_column, id_column]
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        position = {"sort": sort, "id": last.id}
+        if sort != "id":
+            position["value"] = getattr(last, sort)
+        next_cursor = encode_cursor(position)
+    return rows, next_cursor
+
+
+def _fits_column(value: Any, column) -> bool:
+    python_type = column.type.python_type
+    if isinstance(value, bool):
+        # An int subclass, but never a key or sort value
+        return python_type is bool
+    if python_type is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, python_type)
@@ -0,0 +1,101 @@
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# A statement shape executed this often within one request is reported as N+1
+N_PLUS_ONE_THRESHOLD = 3
+
+_current_stats: ContextVar[Optional["QueryStats"]] = ContextVar(
+    "query_stats", default=None
+)
+
+
+def statement_shape(statement: str) -> str:
+    """Statement text with literals and whitespace normalized.
+
+    Parameters are already bound separately, so the text mostly is the
+    shape; numbers and IN lists are folded for statements that inline them.
+    """
+    shape = re.sub(r"\s+", " ", statement).strip()
+    shape = re.sub(r"\b\d+\b", "?", shape)
+    return re.sub(r"IN \([^()]*\)", "IN (...)", shape)
+
+
+class QueryStats:
+    """Statements, rows and database time collected during one request"""
+
+    def __init__(self):
+        self.statements = 0
+        self.rows = 0
+        self.db_time = 0.0  # seconds
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, rowcount: int, elapsed: float) -> None:
+        self.statements += 1
+        # Drivers report -1 when the row count is unknown, e.g. SQLite SELECTs
+        self.rows += max(rowcount, 0)
+        self.db_time += elapsed
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> List[Tuple[str, int]]:
+        """Statement shapes executed at least threshold times, most frequent first"""
+        return [
+            (shape, count)
+            for shape, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+    def headers(self) -> dict:
+        headers = {
+            "X-DB-Statements": str(self.statements),
+            "X-DB-Rows": str(self.rows),
+            "X-DB-Time-Ms": f"{self.db_time * 1000:.2f}",
+        }
+        repeated = self.repeated()
+        if repeated:
+            headers["X-DB-N-Plus-One"] = str(len(repeated))
+        return headers
+
+    def report(self) -> str:
+        lines = [f"{self.statements} statements, {self.rows} rows"]
+        lines += [f"  {count}x {shape}" for shape, count in self.shapes.most_common()]
+        return "\n".join(lines)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is not None:
+        elapsed = time.perf_counter() - context._query_start_time
+        stats.record(statement, cursor.rowcount, elapsed)
+
+
+def instrument(engine: Engine) -> None:
+    """Attach the statement listeners to an engine.
+
+    Pass engine.sync_engine for an AsyncEngine. Statements are only recorded
+    inside track_queries, so an instrumented engine costs little otherwise.
+    """
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Collect the statements executed in the current context"""
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
@@ -0,0 +1,230 @@
+import bisect
+import heapq
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from itertools import groupby
+from typing import Dict, Iterable, List, Set, Tuple
+
+MIN_SIMILARITY = 0.3
+MAX_PREFIX_WORDS = 200
+PREFIX_BONUS = 0.5
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip diacritics, so 'crème' matches 'creme'"""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.lower().split())
+
+
+def bigrams(word: str) -> Set[str]:
+    """Padded character bigrams of an already normalized word"""
+    padded = f" {word} "
+    return {padded[i : i + 2] for i in range(len(padded) - 1)}
+
+
+class SearchIndex:
+    """In-memory word index over (id, name) pairs.
+
+    Names are split into normalized words. Query words are matched against
+    the word vocabulary by prefix and by bigram similarity (which tolerates
+    typos, including swapped letters), so matching cost depends on the
+    vocabulary rather than on the number of names. Every word keeps its
+    items sorted by name, which lets a search stop after the first `limit`
+    results instead of ranking every match.
+
+    The index is kept current with add/remove instead of being rebuilt, and
+    is local to the worker process that owns it.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._names: Dict[int, Tuple[str, str]] = {}
+        self._sorted_names: List[Tuple[str, int]] = []
+        self._word_items: Dict[str, List[Tuple[str, int]]] = {}
+        self._word_gram_counts: Dict[str, int] = {}
+        self._gram_words: Dict[str, Set[str]] = defaultdict(set)
+        self._sorted_words: List[str] = []
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def load(self, rows: Iterable[Tuple[int, str]]) -> None:
+        """Replace the index contents with the given (id, name) rows"""
+        with self._lock:
+            self.clear()
+            for item_id, name in rows:
+                self._add(item_id, name, keep_sorted=False)
+            self._sorted_names.sort()
+            self._sorted_words.sort()
+            for items in self._word_items.values():
+                items.sort()
+            self.loaded = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._names.clear()
+            self._sorted_names.clear()
+            self._word_items.clear()
+            self._word_gram_counts.clear()
+            self._gram_words.clear()
+            self._sorted_words.clear()
+            self.loaded = False
+
+    def add(self, item_id: int, name: str) -> None:
+        """Add or replace a single entry"""
+        with self._lock:
+            self._remove(item_id)
+            self._add(item_id, name, keep_sorted=True)
+
+    def remove(self, item_id: int) -> None:
+        with self._lock:
+            self._remove(item_id)
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[int, str, float]]:
+        """Return up to limit (id, name, score) tuples, best match first.
+
+        Every query word has to match a word of the name. The score is the
+        mean word similarity, plus a bonus when the whole name starts with
+        the query. Ties are broken by name.
+        """
+        normalized = normalize(query)
+        if not normalized:
+            return []
+
+        with self._lock:
+            query_words = normalized.split()
+            matches = [self._match_words(word) for word in query_words]
+            if not all(matches):
+                return []
+
+            results: List[Tuple[int, float]] = []
+            seen: Set[int] = set()
+
+            # Names starting with the whole query rank first
+            start = bisect.bisect_left(self._sorted_names, (normalized, -1))
+            for name, item_id in self._sorted_names[start : start + limit]:
+                if not name.startswith(normalized):
+                    break
+                results.append((item_id, 1.0 + PREFIX_BONUS))
+                seen.add(item_id)
+
+            remaining = limit - len(results)
+            if remaining > 0:
+                if len(query_words) == 1:
+                    results.extend(self._rank_single(matches[0], seen, remaining))
+                else:
+                    results.extend(self._rank_multi(matches, seen, remaining))
+
+            return [
+                (item_id, self._names[item_id][0], round(score, 4))
+                for item_id, score in results
+            ]
+
+    def _rank_single(
+        self, word_scores: Dict[str, float], seen: Set[int], limit: int
+    ) -> List[Tuple[int, float]]:
+        """Walk matched words from best to worst similarity, in name order"""
+        results = []
+        ranked = sorted(word_scores.items(), key=lambda ws: -ws[1])
+        for similarity, tier in groupby(ranked, key=lambda ws: ws[1]):
+            merged = heapq.merge(*(self._word_items[word] for word, _ in tier))
+            for _, item_id in merged:
+                if item_id in seen:
+                    continue
+                seen.add(item_id)
+                results.append((item_id, similarity))
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def _rank_multi(
+        self, matches: List[Dict[str, float]], seen: Set[int], limit: int
+    ) -> List[Tuple[int, float]]:
+        """Score the items of the most selective query word against the others"""
+        pivot = min(
+            matches,
+            key=lambda word_scores: sum(
+                len(self._word_items[word]) for word in word_scores
+            ),
+        )
+        scored = []
+        for word in pivot:
+            for name, item_id in self._word_items[word]:
+                if item_id in seen:
+                    continue
+                seen.add(item_id)
+                item_words = name.split()
+                total = 0.0
+                for word_scores in matches:
+                    best = max(word_scores.get(w, 0.0) for w in item_words)
+                    if not best:
+                        break
+                    total += best
+                else:
+                    scored.append((-total / len(matches), name, item_id))
+
+        return [
+            (item_id, -score) for score, _, item_id in heapq.nsmallest(limit, scored)
+        ]
+
+    def _match_words(self, query_word: str) -> Dict[str, float]:
+        """Map vocabulary words to their similarity with one query word"""
+        word_scores: Dict[str, float] = {}
+
+        # Words starting with the query word count as a full match
+        start = bisect.bisect_left(self._sorted_words, query_word)
+        for word in self._sorted_words[start : start + MAX_PREFIX_WORDS]:
+            if not word.startswith(query_word):
+                break
+            word_scores[word] = 1.0
+
+        # Bigram similarity catches typos
+        query_grams = bigrams(query_word)
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self._gram_words.get(gram, ()))
+        gram_counts = self._word_gram_counts
+        for word, count in shared.items():
+            similarity = count / (len(query_grams) + gram_counts[word] - count)
+            if similarity >= MIN_SIMILARITY and similarity > word_scores.get(word, 0.0):
+                word_scores[word] = similarity
+
+        return word_scores
+
+    def _add(self, item_id: int, name: str, keep_sorted: bool) -> None:
+        normalized = normalize(name)
+        self._names[item_id] = (name, normalized)
+        insert = bisect.insort if keep_sorted else list.append
+        insert(self._sorted_names, (normalized, item_id))
+        for word in set(normalized.split()):
+            if word not in self._word_items:
+                grams = bigrams(word)
+                for gram in grams:
+                    self._gram_words[gram].add(word)
+                self._word_gram_counts[word] = len(grams)
+                self._word_items[word] = []
+                insert(self._sorted_words, word)
+            insert(self._word_items[word], (normalized, item_id))
+
+    def _remove(self, item_id: int) -> None:
+        if item_id not in self._names:
+            return
+        _, normalized = self._names.pop(item_id)
+        entry = (normalized, item_id)
+        self._sorted_names.pop(bisect.bisect_left(self._sorted_names, entry))
+        for word in set(normalized.split()):
+            items = self._word_items[word]
+            items.pop(bisect.bisect_left(items, entry))
+            if items:
+                continue
+            del self._word_items[word]
+            del self._word_gram_counts[word]
+            for gram in bigrams(word):
+                words = self._gram_words[gram]
+                words.discard(word)
+                if not words:
+                    del self._gram_words[gram]
+            self._sorted_words.pop(bisect.bisect_left(self._sorted_words, word))
@@ -10,6 +10,43 @@ export class DailyFoodLog {
     return new DailyFoodLog(apiData);
   }
 
+  upsertEntries(entries) {
+    entries.forEach(entry => {
+      const index = this.entries.findIndex(existing => existing.id === entry.id);
+      if (index !== -1) {
+        this.entries[index] = entry;
+      } else {
+        this.entries.push(entry);
+      }
+    });
+  }
+
+  removeEntry(entryId) {
+    this.entries = this.entries.filter(entry => entry.id !== entryId);
+  }
+
+  // Applies an entry change event; returns false when the product or recipe
+  // details of the entry are not known here and the log has to be refetched
+  applyChange(event, products = []) {
+    if (event.type === 'entry.removed') {
+      this.removeEntry(event.entry_id);
+      return true;
+    }
+
+    const change = event.entry;
+    const current = this.entries.find(entry => entry.id === change.id);
+    const sameItem = current && current.product_id === change.product_id && current.recipe_id === change.recipe_id;
+    const product = change.product_id ? products.find(p => p.id === change.product_id) : null;
+    if (!sameItem && !product) return false;
+
+    this.upsertEntries([new DailyFoodEntry({
+      ...change,
+      product: sameItem ? current.product : product,
+      recipe: sameItem ? current.recipe : null
+    })]);
+    return true;
+  }
+
   calculateTotalNutrition() {
     if (this.entries.length === 0) {
       return {
@@ -29,6 +29,35 @@ export class WeekMenu {
     getDayByDate(dateStr) {
       return this.days.find(day => day.date === dateStr);
     }
+
+    // Applies a menu_day change event of this menu; the recipe is looked up
+    // in the given recipes when the day got another one
+    applyChange(event, recipes = []) {
+      if (event.type === 'menu_day.removed') {
+        this.applyDayChanges([], [event.date]);
+      } else if (event.type === 'menu_day.changed') {
+        const current = this.getDayByDate(event.date);
+        const recipe = current && current.recipe_id === event.day.recipe_id
+          ? current.recipe
+          : recipes.find(r => r.id === event.day.recipe_id) || null;
+        this.applyDayChanges([new MenuDay({ ...event.day, date: event.date, recipe })]);
+      } else if (event.type === 'week_menu.changed') {
+        this.start_date = event.start_date;
+        this.end_date = event.end_date;
+      }
+    }
+
+    applyDayChanges(changed, removed = []) {
+      this.days = this.days.filter(day => !removed.includes(day.date));
+      changed.forEach(changedDay => {
+        const index = this.days.findIndex(day => day.date === changedDay.date);
+        if (index !== -1) {
+          this.days[index] = changedDay;
+        } else {
+          this.days.push(changedDay);
+        }
+      });
+    }
   }
   
   export class MenuDay {
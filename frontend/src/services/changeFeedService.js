@@ -0,0 +1,57 @@
+const API_BASE_URL = 'http://localhost:8000/api';
+
+const EVENT_TYPES = [
+  'entry.added',
+  'entry.updated',
+  'entry.removed',
+  'menu_day.changed',
+  'menu_day.removed',
+  'week_menu.changed',
+  'week_menu.removed',
+  'resync'
+];
+
+// One shared EventSource for all views; it is opened by the first subscriber
+// and closed when the last one leaves
+class ChangeFeedService {
+  constructor() {
+    this.source = null;
+    this.listeners = new Set();
+    this.connectedBefore = false;
+  }
+
+  // Returns the function that unsubscribes the listener again
+  subscribe(listener) {
+    this.listeners.add(listener);
+    this.connect();
+    return () => {
+      this.listeners.delete(listener);
+      if (this.listeners.size === 0) this.close();
+    };
+  }
+
+  connect() {
+    if (this.source) return;
+    this.source = new EventSource(`${API_BASE_URL}/events/`);
+    this.source.onopen = () => {
+      // Changes made while the connection was down were missed
+      if (this.connectedBefore) this.dispatch({ type: 'resync' });
+      this.connectedBefore = true;
+    };
+    EVENT_TYPES.forEach(type => {
+      this.source.addEventListener(type, message => this.dispatch(JSON.parse(message.data)));
+    });
+  }
+
+  close() {
+    if (this.source) this.source.close();
+    this.source = null;
+    this.connectedBefore = false;
+  }
+
+  dispatch(event) {
+    this.listeners.forEach(listener => listener(event));
+  }
+}
+
+export default new ChangeFeedService();
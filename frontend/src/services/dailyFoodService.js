@@ -9,11 +9,39 @@ class DailyFoodService {
     return DailyFoodLog.fromAPI(response.data);
   }
 
+  async getDailySummary(date) {
+    const response = await axios.get(`${API_BASE_URL}/daily-food/${date}/summary`);
+    return response.data;
+  }
+
+  async getEntries(from, to) {
+    const response = await axios.get(`${API_BASE_URL}/daily-food/`, { params: { from, to } });
+    return response.data;
+  }
+
+  async getTotals(from, to, group = 'day') {
+    const response = await axios.get(`${API_BASE_URL}/daily-food/totals`, { params: { from, to, group } });
+    return response.data;
+  }
+
   async addEntry(date, entryData) {
     const response = await axios.post(`${API_BASE_URL}/daily-food/${date}/entries`, entryData);
     return DailyFoodEntry.fromAPI(response.data);
   }
 
+  async addEntries(date, entries) {
+    const response = await axios.post(`${API_BASE_URL}/daily-food/${date}/entries/batch`, { entries });
+    return response.data.map(entry => DailyFoodEntry.fromAPI(entry));
+  }
+
+  // Copies the entries of another day (optionally one meal type) server-side
+  async copyEntries(date, fromDate, mealType = null) {
+    const params = { from: fromDate };
+    if (mealType) params.meal_type = mealType;
+    const response = await axios.post(`${API_BASE_URL}/daily-food/${date}/copy`, null, { params });
+    return response.data.map(entry => DailyFoodEntry.fromAPI(entry));
+  }
+
   async updateEntry(entryId, entryData) {
     const response = await axios.put(`${API_BASE_URL}/daily-food/entries/${entryId}`, entryData);
     return DailyFoodEntry.fromAPI(response.data);
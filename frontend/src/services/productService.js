@@ -9,9 +9,30 @@ class ProductService {
     return Product.fromAPI(response.data);
   }
 
-  async getAllProducts() {
-    const response = await axios.get(`${API_BASE_URL}/products/`);
-    return response.data.map(product => Product.fromAPI(product));
+  async getProductsPage(params = {}) {
+    const response = await axios.get(`${API_BASE_URL}/products/`, { params });
+    return {
+      items: response.data.items.map(product => Product.fromAPI(product)),
+      nextCursor: response.data.next_cursor
+    };
+  }
+
+  async getAllProducts(params = {}) {
+    const products = [];
+    let cursor = null;
+    do {
+      const page = await this.getProductsPage({ ...params, limit: 200, cursor });
+      products.push(...page.items);
+      cursor = page.nextCursor;
+    } while (cursor);
+    return products;
+  }
+
+  async searchProducts(query, limit = 10) {
+    const response = await axios.get(`${API_BASE_URL}/products/search`, {
+      params: { q: query, limit }
+    });
+    return response.data;
   }
 
   async getProductById(productId) {
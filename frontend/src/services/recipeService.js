@@ -16,9 +16,34 @@ class RecipeService {
     return recipe;
   }
 
-  async getAllRecipes() {
-    const response = await axios.get(`${API_BASE_URL}/recipes/`);
-    return response.data.map(recipe => Recipe.fromAPI(recipe));
+  async getRecipesPage(params = {}) {
+    const response = await axios.get(`${API_BASE_URL}/recipes/`, { params });
+    return {
+      items: response.data.items.map(recipe => Recipe.fromAPI(recipe)),
+      nextCursor: response.data.next_cursor
+    };
+  }
+
+  async getAllRecipes(params = {}) {
+    const recipes = [];
+    let cursor = null;
+    do {
+      const page = await this.getRecipesPage({ ...params, limit: 200, cursor });
+      recipes.push(...page.items);
+      cursor = page.nextCursor;
+    } while (cursor);
+    return recipes;
+  }
+
+  // Only id, name, servings, preparation_time, image_url and ingredient_count
+  async getRecipeSummariesPage(params = {}) {
+    const response = await axios.get(`${API_BASE_URL}/recipes/`, {
+      params: { ...params, view: 'summary' }
+    });
+    return {
+      items: response.data.items,
+      nextCursor: response.data.next_cursor
+    };
   }
 
   async getRecipeById(recipeId) {
@@ -37,6 +62,13 @@ class RecipeService {
     return recipe;
   }
 
+  // Partial update, e.g. { servings: 6 } or
+  // { ingredient_operations: [{ op: 'update', id: 12, amount: 150 }] }
+  async patchRecipe(recipeId, changes) {
+    const response = await axios.patch(`${API_BASE_URL}/recipes/${recipeId}`, changes);
+    return Recipe.fromAPI(response.data);
+  }
+
   async uploadRecipeImage(recipeId, imageFile) {
     const formData = new FormData();
     formData.append('file', imageFile);
@@ -57,6 +89,19 @@ class RecipeService {
     await axios.delete(`${API_BASE_URL}/recipes/${recipeId}`);
   }
 
+  async getRecipeNutrition(recipeId) {
+    const response = await axios.get(`${API_BASE_URL}/recipes/${recipeId}/nutrition`);
+    return response.data;
+  }
+
+  async getRecipesNutrition(recipeIds = [], drafts = []) {
+    const response = await axios.post(`${API_BASE_URL}/recipes/nutrition`, {
+      recipe_ids: recipeIds,
+      drafts
+    });
+    return response.data;
+  }
+
   calculateNutrition(recipe) {
     if (!recipe.ingredients || recipe.ingredients.length === 0) {
       return {
@@ -7,6 +7,11 @@ class ShoppingListService {
     const response = await axios.get(`${API_BASE_URL}/shopping-list/${menuId}`);
     return response.data;
   }
+
+  async getShoppingListForRange(from, to) {
+    const response = await axios.get(`${API_BASE_URL}/shopping-list/`, { params: { from, to } });
+    return response.data;
+  }
 }
 
 export default new ShoppingListService();
\ No newline at end of file
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { WeekMenu } from '../models/WeekMenu.js';
+import { WeekMenu, MenuDay } from '../models/WeekMenu.js';
 
 const API_BASE_URL = 'http://localhost:8000/api';
 
@@ -9,11 +9,21 @@ class WeekMenuService {
     return WeekMenu.fromAPI(response.data);
   }
 
-  async getAllWeekMenus() {
-    const response = await axios.get(`${API_BASE_URL}/weekmenus/`);
+  // Without from/to every menu is returned; with them only the menus overlapping that window
+  async getAllWeekMenus(from = null, to = null) {
+    const params = {};
+    if (from) params.from = from;
+    if (to) params.to = to;
+    const response = await axios.get(`${API_BASE_URL}/weekmenus/`, { params });
     return response.data.map(menu => WeekMenu.fromAPI(menu));
   }
 
+  async getPlannedDays(date) {
+    const response = await axios.get(`${API_BASE_URL}/weekmenus/days/${date}`);
+    // Plain objects: each day also carries the week_menu_id it belongs to
+    return response.data;
+  }
+
   async getWeekMenuById(menuId) {
     const response = await axios.get(`${API_BASE_URL}/weekmenus/${menuId}`);
     return WeekMenu.fromAPI(response.data);
@@ -31,6 +41,20 @@ class WeekMenuService {
     return WeekMenu.fromAPI(response.data);
   }
 
+  // Writes only the days that changed; returns those days and removed dates
+  async updateWeekMenuDays(menuId, days) {
+    const response = await axios.put(`${API_BASE_URL}/weekmenus/${menuId}/days`, days);
+    return {
+      changed: response.data.changed.map(day => MenuDay.fromAPI(day)),
+      removed: response.data.removed
+    };
+  }
+
+  async patchWeekMenuDay(menuId, date, changes) {
+    const response = await axios.patch(`${API_BASE_URL}/weekmenus/${menuId}/days/${date}`, changes);
+    return MenuDay.fromAPI(response.data);
+  }
+
   async deleteWeekMenu(menuId) {
     await axios.delete(`${API_BASE_URL}/weekmenus/${menuId}`);
   }
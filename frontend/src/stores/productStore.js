@@ -5,6 +5,7 @@ import { Product } from '../models/Product.js';
 export const useProductStore = defineStore('product', {
   state: () => ({
     products: [],
+    nextCursor: null,
     loading: false,
     error: null
   }),
@@ -32,6 +33,40 @@ export const useProductStore = defineStore('product', {
       
       try {
         this.products = await productService.getAllProducts();
+        this.nextCursor = null;
+      } catch (error) {
+        this.error = error.response?.data?.detail || 'Er is een fout opgetreden';
+        throw error;
+      } finally {
+        this.loading = false;
+      }
+    },
+
+    async fetchProductPage(params = {}) {
+      this.loading = true;
+      this.error = null;
+      
+      try {
+        const page = await productService.getProductsPage(params);
+        this.products = page.items;
+        this.nextCursor = page.nextCursor;
+      } catch (error) {
+        this.error = error.response?.data?.detail || 'Er is een fout opgetreden';
+        throw error;
+      } finally {
+        this.loading = false;
+      }
+    },
+
+    async fetchMoreProducts(params = {}) {
+      if (!this.nextCursor) return;
+      this.loading = true;
+      this.error = null;
+      
+      try {
+        const page = await productService.getProductsPage({ ...params, cursor: this.nextCursor });
+        this.products.push(...page.items);
+        this.nextCursor = page.nextCursor;
       } catch (error) {
         this.error = error.response?.data?.detail || 'Er is een fout opgetreden';
         throw error;
@@ -26,12 +26,12 @@ export const useWeekMenuStore = defineStore('weekMenu', {
       }
     },
 
-    async fetchWeekMenus() {
+    async fetchWeekMenus(from = null, to = null) {
       this.loading = true;
       this.error = null;
       
       try {
-        this.weekMenus = await weekMenuService.getAllWeekMenus();
+        this.weekMenus = await weekMenuService.getAllWeekMenus(from, to);
       } catch (error) {
         this.error = error.response?.data?.detail || 'Er is een fout opgetreden';
         throw error;
@@ -96,6 +96,35 @@ export const useWeekMenuStore = defineStore('weekMenu', {
       }
     },
 
+    async updateWeekMenuDays(menuId, days) {
+      this.loading = true;
+      this.error = null;
+      
+      try {
+        return await weekMenuService.updateWeekMenuDays(menuId, days);
+      } catch (error) {
+        this.error = error.response?.data?.detail || 'Er is een fout opgetreden';
+        throw error;
+      } finally {
+        this.loading = false;
+      }
+    },
+
+    // Keeps the loaded menus in step with change events from the server
+    applyChange(event, recipes = []) {
+      if (event.type === 'week_menu.removed') {
+        this.weekMenus = this.weekMenus.filter(m => m.id !== event.week_menu_id);
+        if (this.currentWeekMenu?.id === event.week_menu_id) {
+          this.currentWeekMenu = null;
+        }
+        return;
+      }
+
+      new Set([...this.weekMenus, this.currentWeekMenu]).forEach(menu => {
+        if (menu?.id === event.week_menu_id) menu.applyChange(event, recipes);
+      });
+    },
+
     async deleteWeekMenu(menuId) {
       this.loading = true;
       this.error = null;